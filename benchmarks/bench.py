@@ -0,0 +1,223 @@
+"""
+Benchmarks of the engine hot paths, on fixed seeded workloads.
+
+    python benchmarks/bench.py run -o baseline.json
+    python benchmarks/bench.py run -o current.json --compare baseline.json --threshold 0.1
+    python benchmarks/bench.py compare baseline.json current.json
+
+Throughputs are the best of `--repeat` runs. `compare` exits with status 1 when a result is worse than the
+baseline by more than the threshold (relative).
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+
+from uno.engine.context import Card, Context
+from uno.engine.game import Game
+from uno.engine.player import RandomPlayer
+from uno.rules import base
+
+PLAYER_COUNTS: tuple[int, ...] = (2, 4, 6)  # the standard deck cannot deal more hands
+
+type Workload = Callable[[], tuple[int, float]]  # returns (operations, seconds)
+
+
+def _timed(func: Callable[[], int]) -> tuple[int, float]:
+    started = time.perf_counter()
+    ops = func()
+    return ops, time.perf_counter() - started
+
+
+def _contexts(count: int, n_players: int = 4) -> list[Context]:
+    contexts = []
+    for seed in range(count):
+        ctx = Context(n_players, seed=seed)
+        base.init_game(ctx)
+        contexts.append(ctx)
+    return contexts
+
+
+def bench_step(turns: int = 50_000) -> tuple[int, float]:
+    ctx = _contexts(1)[0]
+
+    def run() -> int:
+        step, legal_moves = base.step, base.legal_moves
+        for _ in range(turns):
+            legal = legal_moves(ctx, ctx.current_round.current_player)
+            step(ctx, (legal[0], 'red') if legal else (None,))
+        return turns
+    return _timed(run)
+
+
+def bench_init_round(rounds: int = 5_000, lazy_shuffle: bool = False) -> tuple[int, float]:
+    ctx = _contexts(1)[0]
+    ctx.lazy_shuffle = lazy_shuffle
+
+    def run() -> int:
+        for _ in range(rounds):
+            base.init_round(ctx)
+        return rounds
+    return _timed(run)
+
+
+def bench_build_deck(decks: int = 20_000) -> tuple[int, float]:
+    def run() -> int:
+        for _ in range(decks):
+            base.build_deck()
+        return decks
+    return _timed(run)
+
+
+def bench_build_request(requests: int = 50_000) -> tuple[int, float]:
+    game = Game(base.rule, n_players=4, seed=0)
+    base.init_game(game.context)
+
+    def run() -> int:
+        for idx in range(requests):
+            game.build_request(idx % 4)
+        return requests
+    return _timed(run)
+
+
+def bench_is_playable(checks: int = 200_000) -> tuple[int, float]:
+    ctx = _contexts(1)[0]
+    cards = base.build_deck()
+    cards = (cards * (checks // len(cards) + 1))[:checks]
+
+    def run() -> int:
+        is_playable = base.is_playable
+        for card in cards:
+            is_playable(ctx, card)
+        return checks
+    return _timed(run)
+
+
+def bench_games(n_players: int, games: int = 30) -> tuple[int, float]:
+    def run() -> int:
+        for seed in range(games):
+            game = Game(base.rule, n_players=n_players, seed=seed)
+            game.players = [RandomPlayer(str(idx)) for idx in range(n_players)]
+            game.start()
+        return games
+    return _timed(run)
+
+
+def table_memory(n_players: int = 4) -> int:
+    """
+    :return: peak bytes allocated to create a table and play its first round
+    """
+    tracemalloc.start()
+    try:
+        game = Game(base.rule, n_players=n_players, seed=0)
+        game.players = [RandomPlayer(str(idx)) for idx in range(n_players)]
+        base.init_game(game.context)
+        while not base.round_is_over(game.context.current_round):
+            cur = game.context.current_round.current_player
+            move = game.players[cur].play(game.build_request(cur))
+            game.history.append(cur, game.context.rounds, base.step(game.context, move))
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+THROUGHPUTS: dict[str, tuple[Workload, str]] = {
+    'step': (bench_step, 'turns/s'),
+    'init_round': (bench_init_round, 'rounds/s'),
+    'init_round_lazy': ((lambda: bench_init_round(lazy_shuffle=True)), 'rounds/s'),
+    'build_deck': (bench_build_deck, 'decks/s'),
+    'build_request': (bench_build_request, 'requests/s'),
+    'is_playable': (bench_is_playable, 'checks/s'),
+    **{f'game_{n}p': ((lambda n=n: bench_games(n)), 'games/s') for n in PLAYER_COUNTS},
+}
+
+
+def run(repeat: int = 3, names: list[str] | None = None) -> dict:
+    """
+    run the benchmarks
+    :param repeat: runs per throughput benchmark, the best one is kept
+    :param names: benchmarks to run, None for all
+    :return: results by name, with value, unit and whether higher is better
+    """
+    results = {}
+    for name, (workload, unit) in THROUGHPUTS.items():
+        if names and name not in names:
+            continue
+        best = max(ops / seconds for ops, seconds in (workload() for _ in range(repeat)))
+        results[name] = {'value': best, 'unit': unit, 'higher_is_better': True}
+    for n_players in PLAYER_COUNTS:
+        name = f'memory_{n_players}p'
+        if names and name not in names:
+            continue
+        table_memory(n_players)  # warm up lazily created module state
+        results[name] = {'value': table_memory(n_players), 'unit': 'bytes/table', 'higher_is_better': False}
+    return results
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    """
+    :param baseline: results of `run`
+    :param current: results of `run`
+    :param threshold: relative change tolerated, e.g. 0.1 for 10%
+    :return: description of each regression
+    """
+    regressions = []
+    for name, result in current.items():
+        if name not in baseline:
+            continue
+        before, after = baseline[name]['value'], result['value']
+        change = (after - before) / before if before else 0.0
+        worse = -change if result['higher_is_better'] else change
+        status = 'REGRESSION' if worse > threshold else 'ok'
+        print(f'{name:16} {before:14.1f} -> {after:14.1f} {result["unit"]:12} {change:+7.1%}  {status}')
+        if worse > threshold:
+            regressions.append(f'{name}: {change:+.1%}')
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark the UNO engine.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='run the benchmarks')
+    run_parser.add_argument('-o', '--output', help='save results to this JSON file')
+    run_parser.add_argument('-r', '--repeat', type=int, default=3)
+    run_parser.add_argument('-b', '--bench', action='append', help='only run this benchmark, repeatable')
+    run_parser.add_argument('--compare', metavar='BASELINE', help='compare against a saved baseline')
+    run_parser.add_argument('-t', '--threshold', type=float, default=0.1)
+
+    compare_parser = commands.add_parser('compare', help='compare two saved results')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('-t', '--threshold', type=float, default=0.1)
+
+    args = parser.parse_args(argv)
+    if args.command == 'run':
+        results = run(args.repeat, args.bench)
+        if args.output:
+            with open(args.output, 'w') as file:
+                json.dump({'python': platform.python_version(), 'results': results}, file, indent=2)
+        if not args.compare:
+            for name, result in results.items():
+                print(f'{name:16} {result["value"]:14.1f} {result["unit"]}')
+            return 0
+        with open(args.compare) as file:
+            baseline = json.load(file)['results']
+    else:
+        with open(args.baseline) as file:
+            baseline = json.load(file)['results']
+        with open(args.current) as file:
+            results = json.load(file)['results']
+
+    regressions = compare(baseline, results, args.threshold)
+    if regressions:
+        print(f'{len(regressions)} regression(s) beyond {args.threshold:.0%}')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
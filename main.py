@@ -1,7 +1,6 @@
 import logging
 
 from uno.engine.game import Game
-from uno.engine.rule_old import ExampleRule
 from uno.rules.base import rule
 
 
@@ -1,11 +1,10 @@
 
+import argparse
 import sys
 import logging
+from uno import registry
 from uno.engine.game import Game
 from uno.engine.player import Player, Request, Move
-from uno.rules.base import rule as standard_rule
-
-from uno.engine.player import RandomPlayer
 
 # Configure logging to show game events
 logging.basicConfig(level=logging.INFO, format='%(message)s')
@@ -16,7 +15,8 @@ class HumanPlayer(Player):
         print(f"Top Card: {request.top_card}")
         print("Your Hand:")
         for idx, card in enumerate(request.hand):
-            print(f"  {idx}: {card}")
+            playable = request.legal_moves is not None and card in request.legal_moves
+            print(f"  {idx}: {card}{' *' if playable else ''}")
         
         while True:
             choice = input("Enter card index to play, or 'd' to draw: ").strip().lower()
@@ -27,6 +27,11 @@ class HumanPlayer(Player):
                 idx = int(choice)
                 if 0 <= idx < len(request.hand):
                     card = request.hand[idx]
+                    # The engine lists the playable cards when the rule can
+                    if request.legal_moves is not None and card not in request.legal_moves:
+                        print(f"Invalid move! Card {card} cannot be played now")
+                        continue
+
                     # Check if wild to ask for color
                     # Note: We are checking 'wild' string on the card object. 
                     # Assuming card has .color attribute or is accessible.
@@ -38,7 +43,6 @@ class HumanPlayer(Player):
                                 return (card, color)
                             print("Invalid color.")
                     
-                    # Basic client-side validation
                     top_card = request.top_card
                     if top_card and getattr(card, 'color', '') != 'wild':
                          # Check if matches top card
@@ -52,16 +56,31 @@ class HumanPlayer(Player):
             except ValueError:
                 print("Invalid input.")
 
-def main():
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description='Play UNO against bots in the terminal.')
+    parser.add_argument('--rule', default='standard', help='rule to play, see --list')
+    parser.add_argument('--bot', default='random', help='player of the other seats, see --list')
+    parser.add_argument('--list', action='store_true', help='list the available rules and bots, then exit')
+    args = parser.parse_args(argv)
+    if args.list:
+        print(f"rules: {', '.join(registry.names(registry.RULE_GROUP))}")
+        print(f"bots: {', '.join(registry.names(registry.PLAYER_GROUP))}")
+        return
+    # only the selected rule and bot are imported
+    try:
+        rule = registry.load_rule(args.rule)
+        bot = registry.load_player(args.bot, args.rule)
+    except ValueError as e:
+        parser.error(str(e))
+
     print("Welcome to UNO!")
     try:
         n_players = int(input("How many players (2-10)? ") or "4")
     except ValueError:
         n_players = 4
         
-    game = Game(standard_rule, n_players=n_players)
-    # Use RandomPlayer for bots
-    game.players = [RandomPlayer(str(i)) for i in range(n_players)]
+    game = Game(rule, n_players=n_players)
+    game.players = [bot(str(i), game.context) for i in range(n_players)]
     
     # Replace first player with Human
     game.players[0] = HumanPlayer("Human")
@@ -0,0 +1,455 @@
+"""
+Streaming analytics over game events.
+
+Sources turn live games, game records or NDJSON event logs into event streams, generator stages filter them, and
+`EventStats` folds them into online aggregators. Aggregators hold a bounded state whatever the number of games,
+and the stats of disjoint streams merge in any order, e.g. across worker processes.
+"""
+import bisect
+import json
+import math
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from os import PathLike
+
+from .engine.events import ALL_EVENTS, CARD_PLAYED, DECK_REPLENISHED, EVENT_NAMES, ROUND_SCORED, ROUND_STARTED
+from .engine.events import Event, Sink
+from .engine.game import Game
+from .engine.player import Player, RandomPlayer
+from .engine.rng import derive_seed
+from .engine.rule import Rule
+from .record import RecordReader, replay
+from .rules.base import rule as standard_rule
+
+type PlayerFactory = Callable[[str], Player]
+
+EVENT_KINDS: dict[str, int] = {name: kind for kind, name in EVENT_NAMES.items()}
+CHAIN_SYMBOLS: frozenset[str] = frozenset(('skip', 'reverse', 'draw_2', 'wild_draw_4'))  # cards passing on an effect
+CHUNK_SIZE: int = 64
+
+
+class Counts:
+    """
+    Occurrences per key, for a bounded set of keys
+    """
+    __slots__ = ('counts',)
+
+    counts: dict
+
+    def __init__(self):
+        self.counts = {}
+
+    def add(self, key, count: int = 1):
+        self.counts[key] = self.counts.get(key, 0) + count
+
+    def merge(self, other: 'Counts') -> 'Counts':
+        for key, count in other.counts.items():
+            self.add(key, count)
+        return self
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def most_common(self, n: int | None = None) -> list[tuple]:
+        ranked = sorted(self.counts.items(), key=lambda item: item[1], reverse=True)
+        return ranked if n is None else ranked[:n]
+
+    def __getitem__(self, key) -> int:
+        return self.counts.get(key, 0)
+
+
+class Mean:
+    """
+    Count, mean and variance updated one value at a time (Welford), merged with Chan's formula
+    """
+    __slots__ = ('count', 'mean', 'm2')
+
+    count: int
+    mean: float
+    m2: float  # sum of squared differences to the mean
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def merge(self, other: 'Mean') -> 'Mean':
+        count = self.count + other.count
+        if other.count:
+            delta = other.mean - self.mean
+            self.mean += delta * other.count / count
+            self.m2 += other.m2 + delta * delta * self.count * other.count / count
+            self.count = count
+        return self
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / self.count if self.count else 0.0
+
+
+class QuantileSketch:
+    """
+    Quantiles of non-negative values within a relative error, from counts per logarithmic bucket (as in DDSketch).
+    Buckets only depend on the value, so sketches merge exactly by adding counts, and their number grows with the
+    log of the value range, not with the number of values.
+    """
+    __slots__ = ('relative_error', 'gamma', 'log_gamma', 'buckets', 'zeros', 'count')
+
+    relative_error: float
+    gamma: float
+    log_gamma: float
+    buckets: dict[int, int]  # bucket index -> count, bucket i holds (gamma ** (i - 1), gamma ** i]
+    zeros: int
+    count: int
+
+    def __init__(self, relative_error: float = 0.01):
+        self.relative_error = relative_error
+        self.gamma = (1 + relative_error) / (1 - relative_error)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets = {}
+        self.zeros = 0
+        self.count = 0
+
+    def add(self, value: float):
+        if value < 0:
+            raise ValueError(f'Quantile sketches take non-negative values, got {value}')
+        self.count += 1
+        if value == 0:
+            self.zeros += 1
+            return
+        idx = math.ceil(math.log(value) / self.log_gamma)
+        self.buckets[idx] = self.buckets.get(idx, 0) + 1
+
+    def merge(self, other: 'QuantileSketch') -> 'QuantileSketch':
+        if other.relative_error != self.relative_error:
+            raise ValueError('Cannot merge sketches of different accuracies')
+        for idx, count in other.buckets.items():
+            self.buckets[idx] = self.buckets.get(idx, 0) + count
+        self.zeros += other.zeros
+        self.count += other.count
+        return self
+
+    def quantile(self, q: float) -> float:
+        """
+        :param q: in [0, 1]
+        :return: estimate of the q-quantile, 0 if no value was added
+        """
+        if not 0 <= q <= 1:
+            raise ValueError(f'Quantile {q} is not in [0, 1]')
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen or not self.buckets:
+            return 0.0
+        for idx in sorted(self.buckets):
+            seen += self.buckets[idx]
+            if rank < seen:
+                break
+        return 2 * self.gamma ** idx / (self.gamma + 1)
+
+
+class Histogram:
+    """
+    Counts per bin of fixed edges: bin 0 holds values below `edges[0]`, bin i values in [edges[i-1], edges[i]),
+    and the last bin values from `edges[-1]` on
+    """
+    __slots__ = ('edges', 'counts')
+
+    edges: tuple[float, ...]
+    counts: list[int]
+
+    def __init__(self, edges: Iterable[float]):
+        self.edges = tuple(edges)
+        self.counts = [0] * (len(self.edges) + 1)
+
+    def add(self, value: float):
+        self.counts[bisect.bisect_right(self.edges, value)] += 1
+
+    def merge(self, other: 'Histogram') -> 'Histogram':
+        if other.edges != self.edges:
+            raise ValueError('Cannot merge histograms with different edges')
+        for idx, count in enumerate(other.counts):
+            self.counts[idx] += count
+        return self
+
+
+class EventStats:
+    """
+    Aggregates of an event stream holding whole games, each starting with the `ROUND_STARTED` event of round 0.
+    A game's winner is known at the start of the next one, call `finish` (or use `collect`) after the last event.
+    """
+    n_players: int
+    games: int
+    rounds: int
+    game_wins: list[int]  # per seat
+    round_wins: list[int]  # per seat
+    turns: Mean  # per round
+    turns_quantiles: QuantileSketch
+    replenishes: int  # draw pile refills
+    chains: Histogram  # effect cards played in a row
+    chain_lengths: Mean
+    plays: Counts  # (color, symbol) -> times played
+
+    _points: list[int]  # scoreboard of the game in progress
+    _in_game: bool
+    _chain: int  # length of the chain in progress
+
+    def __init__(self, n_players: int):
+        self.n_players = n_players
+        self.games = 0
+        self.rounds = 0
+        self.game_wins = [0] * n_players
+        self.round_wins = [0] * n_players
+        self.turns = Mean()
+        self.turns_quantiles = QuantileSketch()
+        self.replenishes = 0
+        self.chains = Histogram(range(1, 9))
+        self.chain_lengths = Mean()
+        self.plays = Counts()
+        self._points = [0] * n_players
+        self._in_game = False
+        self._chain = 0
+
+    def add(self, event: Event):
+        kind = event.kind
+        if kind == CARD_PLAYED:
+            card = event.data[0]
+            self.plays.add(tuple(card))
+            if card[1] in CHAIN_SYMBOLS:
+                self._chain += 1
+            else:
+                self._end_chain()
+        elif kind == ROUND_STARTED:
+            if event.round == 0:
+                self.finish()
+                self._in_game = True
+            self._end_chain()
+        elif kind == ROUND_SCORED:
+            points, turns = event.data[:2]
+            self.rounds += 1
+            self.round_wins[event.player] += 1
+            self._points[event.player] += points
+            self.turns.add(turns)
+            self.turns_quantiles.add(turns)
+            self._end_chain()
+        elif kind == DECK_REPLENISHED:
+            self.replenishes += 1
+
+    def _end_chain(self):
+        if self._chain:
+            self.chains.add(self._chain)
+            self.chain_lengths.add(self._chain)
+            self._chain = 0
+
+    def finish(self):
+        """
+        account the game in progress, if any
+        """
+        if not self._in_game:
+            return
+        points = self._points
+        self.games += 1
+        self.game_wins[points.index(max(points))] += 1
+        self._points = [0] * self.n_players
+        self._in_game = False
+        self._end_chain()
+
+    def merge(self, other: 'EventStats') -> 'EventStats':
+        """
+        merge the stats of another stream, both must be finished
+        :param other:
+        :return: self
+        """
+        if other.n_players != self.n_players:
+            raise ValueError('Cannot merge stats of games with different player counts')
+        if self._in_game or other._in_game:
+            raise ValueError('Finish the streams before merging their stats')
+        self.games += other.games
+        self.rounds += other.rounds
+        for idx in range(self.n_players):
+            self.game_wins[idx] += other.game_wins[idx]
+            self.round_wins[idx] += other.round_wins[idx]
+        self.turns.merge(other.turns)
+        self.turns_quantiles.merge(other.turns_quantiles)
+        self.replenishes += other.replenishes
+        self.chains.merge(other.chains)
+        self.chain_lengths.merge(other.chain_lengths)
+        self.plays.merge(other.plays)
+        return self
+
+    @property
+    def win_rates(self) -> list[float]:
+        """
+        share of games won per seat
+        """
+        return [wins / self.games if self.games else 0.0 for wins in self.game_wins]
+
+    @property
+    def replenish_rate(self) -> float:
+        """
+        draw pile refills per round
+        """
+        return self.replenishes / self.rounds if self.rounds else 0.0
+
+    def summary(self) -> dict:
+        return {
+            'games': self.games,
+            'rounds': self.rounds,
+            'win_rates': self.win_rates,
+            'round_wins': self.round_wins,
+            'turns_per_round': self.turns.mean,
+            'turns_p50': self.turns_quantiles.quantile(0.5),
+            'turns_p95': self.turns_quantiles.quantile(0.95),
+            'replenish_rate': self.replenish_rate,
+            'chain_length': self.chain_lengths.mean,
+            'chains': self.chains.counts,
+            'top_plays': self.plays.most_common(10),
+        }
+
+
+class _QueueSink(Sink):
+    """
+    Buffers events until the source hands them on
+    """
+    events: deque
+
+    def __init__(self, kinds: int = ALL_EVENTS):
+        super().__init__(kinds)
+        self.events = deque()
+
+    def write(self, event: Event):
+        self.events.append(event)
+
+    def drain(self) -> Iterator[Event]:
+        events = self.events
+        while events:
+            yield events.popleft()
+
+
+def live_events(games: Iterable[Game], kinds: int = ALL_EVENTS) -> Iterator[Event]:
+    """
+    play the games one after the other, yielding their events as they happen. Pass a generator of games to keep
+    a single one in memory
+    :param games: games with their players set, not begun
+    :param kinds: bit mask of the event kinds to yield
+    """
+    for game in games:
+        sink = _QueueSink(kinds)
+        game.context.events.subscribe(sink)
+        ctx, rule = game.context, game.rule
+        game.begin()
+        try:
+            yield from sink.drain()
+            while not rule.is_over(ctx):
+                idx = ctx.current_round.current_player
+                game.apply(idx, game.players[idx].play(game.build_request(idx)))
+                yield from sink.drain()
+        finally:
+            game.end()
+            game.context.events.unsubscribe(sink)
+
+
+def seeded_games(n_games: int, n_players: int = 4, master_seed: int = 0, start: int = 0,
+                 rule: Rule = standard_rule, player_factory: PlayerFactory = RandomPlayer) -> Iterator[Game]:
+    """
+    games `start` to `start + n_games` of a run, seeded like `uno.sim`, built one at a time
+    """
+    for game_index in range(start, start + n_games):
+        game = Game(rule, n_players=n_players, seed=derive_seed(master_seed, game_index), history_window=1)
+        game.players = [player_factory(str(idx)) for idx in range(n_players)]
+        yield game
+
+
+def record_events(path: str | PathLike, rule: Rule = standard_rule, kinds: int = ALL_EVENTS) -> Iterator[Event]:
+    """
+    replay the games of a record file, yielding their events game by game
+    :param path: file written by `uno.record.RecordWriter`
+    :param rule: rule the games were played with
+    :param kinds: bit mask of the event kinds to yield
+    """
+    sink = _QueueSink(kinds)
+    with RecordReader(path) as reader:
+        records = iter(reader)
+        record = None
+        try:
+            for record in records:
+                replay(record, rule=rule, sinks=(sink,))
+                record = None  # records are views of the mapped file, released before it is closed
+                yield from sink.drain()
+        finally:
+            record = None
+            records.close()
+
+
+def ndjson_events(paths: Iterable[str | PathLike], kinds: int = ALL_EVENTS) -> Iterator[Event]:
+    """
+    read event logs written by `NDJSONSink`, line by line. Cards are read back as `[color, symbol]` lists
+    :param paths:
+    :param kinds: bit mask of the event kinds to yield
+    """
+    for path in paths:
+        with open(path, encoding='utf-8') as file:
+            for line in file:
+                if not line.strip():
+                    continue
+                name, round_, player, *data = json.loads(line)
+                kind = EVENT_KINDS[name]
+                if kind & kinds:
+                    yield Event(kind, round_, player, tuple(data))
+
+
+def only(events: Iterable[Event], kinds: int) -> Iterator[Event]:
+    """
+    stage keeping the events of the given kinds
+    """
+    return (event for event in events if event.kind & kinds)
+
+
+def collect(events: Iterable[Event], n_players: int) -> EventStats:
+    """
+    fold a stream of whole games into stats
+    """
+    stats = EventStats(n_players)
+    for event in events:
+        stats.add(event)
+    stats.finish()
+    return stats
+
+
+def analyze_chunk(rule: Rule, n_players: int, master_seed: int, start: int, stop: int,
+                  player_factory: PlayerFactory = RandomPlayer) -> EventStats:
+    """
+    play the games with index in [start, stop) and collect their stats. Runs inside a worker process
+    """
+    return collect(live_events(seeded_games(stop - start, n_players, master_seed, start, rule, player_factory)),
+                   n_players)
+
+
+def analyze(n_games: int, n_players: int = 4, master_seed: int = 0, workers: int | None = None,
+            chunk_size: int = CHUNK_SIZE, rule: Rule = standard_rule,
+            player_factory: PlayerFactory = RandomPlayer) -> EventStats:
+    """
+    play `n_games` seeded games over a process pool and merge the stats of each chunk
+    :param workers: number of worker processes, None for one per core. 1 plays in the current process
+    :param player_factory: must be picklable (e.g. a module-level class) when using more than one worker
+    """
+    stats = EventStats(n_players)
+    bounds = [(start, min(start + chunk_size, n_games)) for start in range(0, n_games, chunk_size)]
+    if workers == 1:
+        for start, stop in bounds:
+            stats.merge(analyze_chunk(rule, n_players, master_seed, start, stop, player_factory))
+        return stats
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(analyze_chunk, rule, n_players, master_seed, start, stop, player_factory)
+                   for start, stop in bounds]
+        for future in as_completed(futures):
+            stats.merge(future.result())
+    return stats
@@ -0,0 +1,7 @@
+from .analysis import Analysis, MoveAnalyzer, MoveEstimate
+from .endgame import EndgamePlayer, EndgameSolver, SolverStats, TranspositionTable
+from .ismcts import ISMCTSPlayer, SearchStats
+from .sampling import determinize
+
+__all__ = ['Analysis', 'EndgamePlayer', 'EndgameSolver', 'ISMCTSPlayer', 'MoveAnalyzer', 'MoveEstimate', 'SearchStats',
+           'SolverStats', 'TranspositionTable', 'determinize']
@@ -0,0 +1,246 @@
+"""
+Monte Carlo move evaluation: the chance the observer wins the round after each of its moves, for coaching.
+
+Each sampled world re-deals the cards the observer cannot see (`determinize`), then every candidate move is played
+in a copy of that same world and rolled out with the same rng, so that the moves are compared on the same deals
+and the difference between them has less variance than independent samples would give.
+Worlds can be spread over a process pool, the analysis stops at a time limit or when cancelled, and returns what
+was sampled so far.
+"""
+import math
+import multiprocessing
+import random
+import time
+from collections.abc import Callable, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from statistics import NormalDist
+from typing import Any, Protocol
+
+from ..engine.context import Context
+from ..engine.player import Move
+from ..engine.rng import derive_seed
+from ..rules import base
+from .ismcts import available_moves, rollout_move, round_winner
+from .sampling import determinize
+
+type RolloutPolicy = Callable[[Context, random.Random], Move]
+
+ROLLOUT_LIMIT: int = 300  # steps before a rollout is given up, counted as a loss
+BATCH: int = 8  # worlds per task sent to a worker
+
+
+class CancelToken(Protocol):
+    """
+    e.g. `threading.Event`, set from another thread to stop an analysis early
+    """
+    def is_set(self) -> bool:
+        ...
+
+
+def wilson_interval(wins: int, trials: int, confidence: float = 0.95) -> tuple[float, float]:
+    """
+    Wilson score interval of a win rate, well-behaved for few trials and rates close to 0 or 1
+    :param wins:
+    :param trials:
+    :param confidence:
+    :return: low and high bounds, (0, 1) without trials
+    """
+    if trials == 0:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    rate = wins / trials
+    scale = 1 + z * z / trials
+    center = (rate + z * z / (2 * trials)) / scale
+    half = z * math.sqrt(rate * (1 - rate) / trials + z * z / (4 * trials * trials)) / scale
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+@dataclass(slots=True)
+class MoveEstimate:
+    move: Move
+    wins: int = 0
+    rollouts: int = 0
+    low: float = 0.0  # bounds of the confidence interval of `win_rate`
+    high: float = 1.0
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.rollouts if self.rollouts else 0.0
+
+
+@dataclass(slots=True)
+class Analysis:
+    estimates: list[MoveEstimate] = field(default_factory=list)  # best win rate first
+    worlds: int = 0  # worlds sampled, each played out once per move
+    elapsed: float = 0.0  # seconds
+    complete: bool = False  # every requested world was sampled, not stopped by the time limit or a cancel
+
+    @property
+    def best(self) -> MoveEstimate | None:
+        return self.estimates[0] if self.estimates else None
+
+
+def play_out(world: Context, move: Move, observer: int, rng: random.Random, policy: RolloutPolicy = rollout_move,
+             rollout_limit: int = ROLLOUT_LIMIT) -> bool:
+    """
+    play the move, then the rest of the round with the policy for every player
+    :param world: stepped in place
+    :return: True if the observer won the round
+    """
+    step = base.step
+    step(world, move)
+    for _ in range(rollout_limit):
+        if base.round_is_over(world.current_round):
+            break
+        step(world, policy(world, rng))
+    return round_winner(world) == observer
+
+
+def sample_worlds(ctx: Context, observer: int, moves: Sequence[Move], seed: int, start: int, stop: int,
+                  policy: RolloutPolicy = rollout_move, rollout_limit: int = ROLLOUT_LIMIT,
+                  deadline: float | None = None, cancel: CancelToken | None = None) -> tuple[list[int], int]:
+    """
+    evaluate the moves in the worlds of index [start, stop). World `i` is drawn from the stream `seed, i`, so the
+    result does not depend on how worlds are split between workers
+    :param deadline: `time.monotonic()` value to stop at, shared by the processes of the machine
+    :return: wins of each move, worlds sampled
+    """
+    wins = [0] * len(moves)
+    done = 0
+    for world_index in range(start, stop):
+        if (deadline is not None and time.monotonic() >= deadline) or (cancel is not None and cancel.is_set()):
+            break
+        world_seed = derive_seed(seed, world_index)
+        world = determinize(ctx, observer, random.Random(world_seed))
+        shuffle_seed = derive_seed(world_seed, 'shuffle')
+        for idx, move in enumerate(moves):
+            # same world, same reshuffles and same rollout rng for every move: common random numbers.
+            # Seeding a new rng is faster than copying the state of one
+            copy = world.clone(random.Random(shuffle_seed))
+            if play_out(copy, move, observer, random.Random(world_seed), policy, rollout_limit):
+                wins[idx] += 1
+        done += 1
+    return wins, done
+
+
+_stop: Any = None  # event of the analyzer owning the pool, in worker processes
+
+
+def _init_worker(stop: Any):
+    global _stop
+    _stop = stop
+
+
+def _sample_worker(snapshot: bytes, observer: int, moves: list[Move], seed: int, start: int, stop: int,
+                   policy: RolloutPolicy, rollout_limit: int, deadline: float | None) -> tuple[list[int], int]:
+    return sample_worlds(Context.restore(snapshot), observer, moves, seed, start, stop, policy, rollout_limit,
+                         deadline, _stop)
+
+
+class MoveAnalyzer:
+    """
+    Estimates the win chance of each move of the player to move, as seen by that player.
+    With `workers > 1` worlds are sampled in a process pool kept between analyses, close the analyzer when done.
+    The policy must then be picklable (a module-level function or a `functools.partial` of one)
+    """
+    workers: int
+    policy: RolloutPolicy
+    rollout_limit: int
+    confidence: float
+    batch: int
+
+    def __init__(self, workers: int = 1, policy: RolloutPolicy = rollout_move, rollout_limit: int = ROLLOUT_LIMIT,
+                 confidence: float = 0.95, batch: int = BATCH):
+        """
+        :param workers: processes sampling worlds, 1 to sample in the calling thread
+        :param policy: picks the moves of every player during rollouts
+        :param rollout_limit: steps before a rollout is given up, counted as a loss
+        :param confidence: of the win rate intervals
+        :param batch: worlds per task sent to a worker, smaller stops sooner on cancel
+        """
+        self.workers = workers
+        self.policy = policy
+        self.rollout_limit = rollout_limit
+        self.confidence = confidence
+        self.batch = batch
+        self._executor: ProcessPoolExecutor | None = None
+        self._stop: Any = None  # tells the workers to drop the batches they are running
+
+    def analyze(self, ctx: Context, observer: int, worlds: int = 256, time_limit: float | None = None,
+                cancel: CancelToken | None = None, seed: int | None = None) -> Analysis:
+        """
+        :param ctx: the real context, only read. Hidden cards are re-dealt, only the observer's hand is kept
+        :param observer: the player to move
+        :param worlds: worlds to sample at most
+        :param time_limit: seconds, stop sampling after it
+        :param cancel: stop sampling once set, checked between worlds
+        :param seed: of the sampled worlds, None for a fresh one
+        :return: estimates of what was sampled until the end, the time limit or the cancel
+        """
+        round_ = ctx.current_round
+        if round_ is None or base.round_is_over(round_):
+            raise ValueError('The round is over')
+        if round_.current_player != observer:
+            raise ValueError(f'Player {observer} is not the one to move')
+        started = time.perf_counter()
+        deadline = None if time_limit is None else time.monotonic() + time_limit
+        seed = random.getrandbits(63) if seed is None else seed
+        moves = available_moves(ctx)
+        if self.workers > 1:
+            wins, done = self._analyze_parallel(ctx, observer, moves, seed, worlds, deadline, cancel)
+        else:
+            wins, done = sample_worlds(ctx, observer, moves, seed, 0, worlds, self.policy, self.rollout_limit,
+                                       deadline, cancel)
+        estimates = [MoveEstimate(move, move_wins, done, *wilson_interval(move_wins, done, self.confidence))
+                     for move, move_wins in zip(moves, wins)]
+        estimates.sort(key=lambda estimate: estimate.win_rate, reverse=True)
+        return Analysis(estimates, done, time.perf_counter() - started, done == worlds)
+
+    def _analyze_parallel(self, ctx: Context, observer: int, moves: list[Move], seed: int, worlds: int,
+                          deadline: float | None, cancel: CancelToken | None) -> tuple[list[int], int]:
+        if self._executor is None:
+            self._stop = multiprocessing.Event()
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                                 initargs=(self._stop,))
+        snapshot = ctx.snapshot()
+        bounds = [(start, min(start + self.batch, worlds)) for start in range(0, worlds, self.batch)]
+        bounds.reverse()  # popped from the end, in order
+        wins, done = [0] * len(moves), 0
+        pending: set[Future] = set()
+        while bounds or pending:
+            stopped = cancel is not None and cancel.is_set()
+            if stopped or (deadline is not None and time.monotonic() >= deadline):
+                stopped = True
+                self._stop.set()
+                bounds.clear()
+                for future in pending:
+                    future.cancel()
+            while bounds and len(pending) < 2 * self.workers:  # keep every worker busy
+                start, stop = bounds.pop()
+                pending.add(self._executor.submit(_sample_worker, snapshot, observer, moves, seed, start, stop,
+                                                  self.policy, self.rollout_limit, deadline))
+            finished, pending = wait(pending, timeout=None if stopped else 0.01, return_when=FIRST_COMPLETED)
+            for future in finished:
+                if future.cancelled():
+                    continue
+                batch_wins, batch_done = future.result()
+                for idx, count in enumerate(batch_wins):
+                    wins[idx] += count
+                done += batch_done
+        self._stop.clear()
+        return wins, done
+
+    def close(self):
+        """
+        shut down the worker pool
+        """
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def __enter__(self) -> 'MoveAnalyzer':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,406 @@
+"""
+Perfect-information endgame solver over `rules.base.step`: iterative deepening alpha-beta with a Zobrist hash of
+the round state and a bounded transposition table.
+
+Values are from the point of view of the player to move at the root: 1 if it wins the round, -1 if another player
+does. With more than two players the others are assumed to play against it (paranoid search).
+"""
+import random
+import time
+from dataclasses import dataclass
+
+from ..engine.context import Context, Round
+from ..engine.hand import CardIndex
+from ..engine.player import Move, Player, Request
+from ..rules import base
+from ..rules.effects import N_STATES
+from ..rules.journal import make_move, unmake_move
+from .ismcts import DRAW, ISMCTSPlayer, available_moves, round_winner
+from .sampling import determinize
+
+WIN: float = 1.0
+LOSS: float = -1.0
+EXACT, LOWER, UPPER = range(3)  # kind of value stored in the table
+DRAW_PREFIX: int = 16  # top cards of the draw pile in the hash, deeper cards are assumed not to matter
+MAX_DEPTH: int = 64
+TABLE_SIZE: int = 1 << 16
+CHECK_EVERY: int = 256  # nodes between two looks at the clock
+MASK64: int = (1 << 64) - 1
+
+
+@dataclass(slots=True)
+class SolverStats:
+    nodes: int = 0
+    elapsed: float = 0.0  # seconds
+    depth: int = 0  # deepest iteration completed
+    value: float = 0.0  # value of the best move, 1 or -1 when solved
+    solved: bool = False  # the value is exact, not bounded by the search depth
+    probes: int = 0  # transposition table lookups
+    hits: int = 0  # lookups finding the position
+
+    @property
+    def node_rate(self) -> float:
+        """
+        nodes per second
+        """
+        return self.nodes / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.probes if self.probes else 0.0
+
+
+class ZobristKeys:
+    """
+    Random 64-bit keys of the parts of a `Round`. A hand hashes to the sum of the keys of its cards (so copies of a
+    card do not cancel out), and the round to the xor of its hands and of the keys of the last card, current
+    player, effect state, draw pile length and top `draw_prefix` cards of the draw pile. Search positions also
+    xor the key of the searching player.
+    """
+    __slots__ = ('ids', 'hands', 'last_card', 'player', 'effects', 'draw', 'root')
+
+    ids: dict
+    hands: list[list[int]]  # seat -> card id -> key
+    last_card: list[int]
+    player: list[int]
+    effects: list[int]
+    draw: list[list[int]]  # position from the top -> card id -> key
+    root: list[int]  # seat of the searching player, values depend on whose point of view they are from
+
+    def __init__(self, n_players: int, index: CardIndex = base.CARD_INDEX, draw_prefix: int = DRAW_PREFIX,
+                 seed: int = 0):
+        rng = random.Random(seed)
+        n_cards = len(index)
+        self.ids = index.ids
+        self.hands = [[rng.getrandbits(64) for _ in range(n_cards)] for _ in range(n_players)]
+        self.last_card = [rng.getrandbits(64) for _ in range(n_cards)]
+        self.player = [rng.getrandbits(64) for _ in range(n_players)]
+        self.effects = [rng.getrandbits(64) for _ in range(N_STATES)]
+        self.draw = [[rng.getrandbits(64) for _ in range(n_cards)] for _ in range(draw_prefix)]
+        self.root = [rng.getrandbits(64) for _ in range(n_players)]
+
+    def hand(self, seat: int, hand) -> int:
+        keys, ids = self.hands[seat], self.ids
+        return sum(keys[ids[card]] for card in hand) & MASK64
+
+    def board(self, round_: Round) -> int:
+        """
+        :return: hash of everything but the hands
+        """
+        ids, draw = self.ids, round_.draw
+        key = (self.last_card[ids[round_.last_card]] ^ self.player[round_.current_player]
+               ^ self.effects[round_.effects] ^ (len(draw) * 0x9E3779B97F4A7C15 & MASK64))
+        for keys, card in zip(self.draw, reversed(draw)):
+            key ^= keys[ids[card]]
+        return key
+
+    def round(self, round_: Round) -> int:
+        key = self.board(round_)
+        for seat, hand in enumerate(round_.hands):
+            key ^= self.hand(seat, hand)
+        return key
+
+
+class TranspositionTable:
+    """
+    A fixed number of slots indexed by the low bits of the hash, each holding
+    (key, depth, value, kind, best move, generation).
+    A slot is replaced by a search at least as deep, or by any search once the entry is from an older generation:
+    deep results survive within a search, stale ones do not fill the table forever.
+    """
+    __slots__ = ('mask', 'slots', 'generation')
+
+    mask: int
+    slots: list[tuple | None]
+    generation: int
+
+    def __init__(self, size: int = TABLE_SIZE):
+        """
+        :param size: number of slots, rounded up to a power of two
+        """
+        size = 1 << max(0, size - 1).bit_length()
+        self.mask = size - 1
+        self.slots = [None] * size
+        self.generation = 0
+
+    def __len__(self) -> int:
+        return len(self.slots) - self.slots.count(None)
+
+    def new_search(self):
+        self.generation += 1
+
+    def probe(self, key: int) -> tuple | None:
+        entry = self.slots[key & self.mask]
+        return entry if entry is not None and entry[0] == key else None
+
+    def store(self, key: int, depth: int, value: float, kind: int, move: Move | None):
+        idx = key & self.mask
+        old = self.slots[idx]
+        if old is None or old[0] == key or old[5] != self.generation or depth >= old[1]:
+            self.slots[idx] = (key, depth, value, kind, move, self.generation)
+
+    def clear(self):
+        self.slots = [None] * len(self.slots)
+
+
+class _OutOfBudget(Exception):
+    pass
+
+
+class EndgameSolver:
+    """
+    Searches the rest of the round on a fully known state. The table and keys are kept from one `solve` to the
+    next, so positions met again, e.g. on the following move, are not searched twice.
+    """
+    keys: ZobristKeys
+    table: TranspositionTable
+
+    def __init__(self, n_players: int, table_size: int = TABLE_SIZE, draw_prefix: int = DRAW_PREFIX, seed: int = 0):
+        """
+        :param n_players:
+        :param table_size: transposition table slots
+        :param draw_prefix: top cards of the draw pile told apart by the hash
+        :param seed: seed of the Zobrist keys
+        """
+        self.keys = ZobristKeys(n_players, draw_prefix=draw_prefix, seed=seed)
+        self.table = TranspositionTable(table_size)
+        self._ctx: Context | None = None
+        self._player = 0
+        self._hand_keys: list[int] = []
+        self._stats = SolverStats()
+        self._node_budget: int | None = None
+        self._deadline: float | None = None
+        self._next_check = 0
+
+    def solve(self, ctx: Context, node_budget: int | None = 100_000, time_limit: float | None = None,
+              max_depth: int = MAX_DEPTH) -> tuple[Move | None, SolverStats]:
+        """
+        search the best move of the current player, deepening until the round is solved or a budget runs out.
+        The context is stepped and taken back, it is left as it was
+        :param ctx: a context whose round is not over, every card is known to the solver
+        :param node_budget: nodes to visit at most, None for no limit
+        :param time_limit: seconds, None for no limit
+        :param max_depth: plies searched at most
+        :return: best move of the deepest completed iteration (None if not even the first one completed), stats
+        """
+        round_ = ctx.current_round
+        if round_ is None or base.round_is_over(round_):
+            raise ValueError('The round is over')
+        started = time.perf_counter()
+        self._ctx = ctx
+        self._player = round_.current_player
+        self._hand_keys = [self.keys.hand(seat, hand) for seat, hand in enumerate(round_.hands)]
+        self._stats = stats = SolverStats()
+        self._node_budget = node_budget
+        self._deadline = None if time_limit is None else started + time_limit
+        self._next_check = CHECK_EVERY
+        self.table.new_search()
+
+        best = None
+        try:
+            for depth in range(1, max_depth + 1):
+                value, move = self._search_root(depth)
+                best, stats.value, stats.depth = move, value, depth
+                if abs(value) == WIN:
+                    stats.solved = True
+                    break
+        except _OutOfBudget:
+            pass
+        finally:
+            self._ctx = None
+        stats.elapsed = time.perf_counter() - started
+        return best, stats
+
+    def _key(self) -> int:
+        key = self.keys.board(self._ctx.current_round) ^ self.keys.root[self._player]
+        for hand_key in self._hand_keys:
+            key ^= hand_key
+        return key
+
+    def _ordered_moves(self, hint: Move | None) -> list[Move]:
+        """
+        plays first, drawing last, the best move of an earlier search of the position before all
+        """
+        moves = available_moves(self._ctx)
+        moves.append(moves.pop(0))  # `available_moves` lists the draw first
+        if hint is not None and hint in moves:
+            moves.remove(hint)
+            moves.insert(0, hint)
+        return moves
+
+    def _child_value(self, move: Move, depth: int, alpha: float, beta: float) -> float:
+        ctx = self._ctx
+        mover = ctx.current_round.current_player
+        _, journal = make_move(ctx, move)
+        hand_keys = self._hand_keys
+        saved = hand_keys[mover]
+        hand_keys[mover] = self.keys.hand(mover, ctx.current_round.hands[mover])  # only the mover's hand changes
+        try:
+            return self._alpha_beta(depth - 1, alpha, beta)
+        finally:
+            hand_keys[mover] = saved
+            unmake_move(ctx, journal)
+
+    def _search_root(self, depth: int) -> tuple[float, Move]:
+        entry = self.table.probe(self._key())
+        moves = self._ordered_moves(None if entry is None else entry[4])
+        alpha = LOSS
+        best_value, best_move = LOSS - 1, moves[0]
+        for move in moves:
+            value = self._child_value(move, depth, alpha, WIN)
+            if value > best_value:
+                best_value, best_move = value, move
+                alpha = max(alpha, value)
+                if value >= WIN:
+                    break
+        self.table.store(self._key(), depth, best_value, EXACT, best_move)
+        return best_value, best_move
+
+    def _alpha_beta(self, depth: int, alpha: float, beta: float) -> float:
+        ctx = self._ctx
+        winner = round_winner(ctx)
+        if winner is not None:
+            return WIN if winner == self._player else LOSS
+
+        stats = self._stats
+        stats.nodes += 1
+        if self._node_budget is not None and stats.nodes > self._node_budget:
+            raise _OutOfBudget
+        if stats.nodes >= self._next_check:
+            self._next_check += CHECK_EVERY
+            if self._deadline is not None and time.perf_counter() >= self._deadline:
+                raise _OutOfBudget
+        if depth == 0:
+            return self._evaluate()
+
+        key = self._key()
+        stats.probes += 1
+        entry = self.table.probe(key)
+        hint = None
+        if entry is not None:
+            stats.hits += 1
+            _, entry_depth, value, kind, hint, _ = entry
+            if entry_depth >= depth or abs(value) == WIN:  # won and lost positions stay so whatever the depth
+                if kind == EXACT:
+                    return value
+                if kind == LOWER:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value
+
+        maximizing = ctx.current_round.current_player == self._player
+        alpha0, beta0 = alpha, beta
+        best_value = LOSS - 1 if maximizing else WIN + 1
+        best_move = None
+        for move in self._ordered_moves(hint):
+            value = self._child_value(move, depth, alpha, beta)
+            if maximizing:
+                if value > best_value:
+                    best_value, best_move = value, move
+                    alpha = max(alpha, value)
+            elif value < best_value:
+                best_value, best_move = value, move
+                beta = min(beta, value)
+            if alpha >= beta:
+                break
+
+        if best_value <= alpha0:
+            kind = UPPER
+        elif best_value >= beta0:
+            kind = LOWER
+        else:
+            kind = EXACT
+        self.table.store(key, depth, best_value, kind, best_move)
+        return best_value
+
+    def _evaluate(self) -> float:
+        """
+        value of a position at the search horizon, strictly between a loss and a win: how far the root player is
+        ahead of its closest opponent in cards left
+        """
+        hands = self._ctx.current_round.hands
+        mine = len(hands[self._player])
+        closest = min(len(hand) for seat, hand in enumerate(hands) if seat != self._player)
+        return 0.5 * (closest - mine) / (closest + mine + 1)
+
+
+class EndgamePlayer(Player):
+    """
+    Plays like `fallback` until every hand holds at most `threshold` cards, then solves the end of the round.
+    The hidden cards are sampled `samples` times, each world is solved as if every card were known and the move
+    chosen in most worlds is played. `samples=0` solves the real state, for analysis of open-handed positions.
+    Every move is limited by `node_budget` and/or `time_limit` (seconds), shared by the worlds.
+    """
+    context: Context
+    fallback: Player
+    threshold: int
+    samples: int
+    node_budget: int | None
+    time_limit: float | None
+    solver: EndgameSolver
+    telemetry: list[SolverStats]
+
+    def __init__(self, name: str, context: Context, fallback: Player, threshold: int = 3, samples: int = 4,
+                 node_budget: int | None = 20_000, time_limit: float | None = None, table_size: int = TABLE_SIZE,
+                 seed: int | None = None):
+        super().__init__(name, seed)
+        if node_budget is None and time_limit is None:
+            raise ValueError('Need a node budget or a time limit')
+        self.context = context
+        self.fallback = fallback
+        self.threshold = threshold
+        self.samples = samples
+        self.node_budget = node_budget
+        self.time_limit = time_limit
+        self.solver = EndgameSolver(context.player_count, table_size)
+        self.telemetry = []
+
+    @property
+    def last_stats(self) -> SolverStats | None:
+        return self.telemetry[-1] if self.telemetry else None
+
+    def play(self, request: Request) -> Move:
+        round_ = self.context.current_round
+        if base.round_is_over(round_) or max(len(hand) for hand in round_.hands) > self.threshold:
+            return self.fallback.play(request)
+
+        started = time.perf_counter()
+        observer = round_.current_player
+        worlds = max(1, self.samples)
+        node_budget = None if self.node_budget is None else max(1, self.node_budget // worlds)
+        votes: dict[Move, list[float]] = {}  # move -> [worlds choosing it, sum of values]
+        total = SolverStats(solved=True)
+        for idx in range(worlds):
+            world = self.context if self.samples == 0 else determinize(self.context, observer, self.rng)
+            time_limit = None
+            if self.time_limit is not None:
+                time_limit = max(0.0, started + self.time_limit * (idx + 1) / worlds - time.perf_counter())
+            move, stats = self.solver.solve(world, node_budget, time_limit)
+            total.nodes += stats.nodes
+            total.probes += stats.probes
+            total.hits += stats.hits
+            total.depth = max(total.depth, stats.depth)
+            total.solved = total.solved and stats.solved
+            if move is not None:
+                vote = votes.setdefault(move, [0, 0.0])
+                vote[0] += 1
+                vote[1] += stats.value
+        if not votes:
+            return self.fallback.play(request)
+
+        move = max(votes, key=lambda m: (votes[m][0], votes[m][1]))
+        total.value = votes[move][1] / votes[move][0]
+        total.elapsed = time.perf_counter() - started
+        self.telemetry.append(total)
+        return move if move in available_moves(self.context) else DRAW
+
+
+def endgame_player(name: str, context: Context) -> EndgamePlayer:
+    """
+    the solver near the end of rounds and a light ISMCTS search before, as registered in `uno.registry`.
+    The search is not seated, it gets a stream of the game by name
+    """
+    fallback = ISMCTSPlayer(name, context, iterations=200, seed=context.streams.child('fallback', name).seed)
+    return EndgamePlayer(name, context, fallback)
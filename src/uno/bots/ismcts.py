@@ -0,0 +1,288 @@
+"""
+Information-set Monte Carlo Tree Search (single observer) over `rules.base.step`.
+"""
+import math
+import random
+import time
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+from ..engine.context import Context
+from ..engine.player import Move, Player, Request
+from ..rules import base
+from .sampling import determinize
+
+WILD_COLORS: tuple[str, ...] = base.COLORS[:-1]
+DRAW: Move = (None,)
+
+
+@dataclass(slots=True)
+class SearchStats:
+    iterations: int = 0
+    nodes: int = 0
+    elapsed: float = 0.0  # seconds
+    reused: bool = False  # the search started from the subtree kept from the previous move
+
+
+class Node:
+    """
+    A node reached by `move`, made by `player`. Edges are keyed by the move passed to `step`.
+    """
+    __slots__ = ('move', 'player', 'parent', 'children', 'visits', 'wins', 'avail')
+
+    move: Move | None
+    player: int
+    parent: 'Node | None'
+    children: dict[Move, 'Node']
+    visits: int
+    wins: float
+    avail: int  # number of times the node was available for selection
+
+    def __init__(self, move: Move | None = None, player: int = -1, parent: 'Node | None' = None):
+        self.move = move
+        self.player = player
+        self.parent = parent
+        self.children = {}
+        self.visits = 0
+        self.wins = 0.0
+        self.avail = 1
+
+    def ucb(self, exploration: float) -> float:
+        return self.wins / self.visits + exploration * math.sqrt(math.log(self.avail) / self.visits)
+
+
+def available_moves(ctx: Context) -> list[Move]:
+    """
+    moves of the current player: each playable card (wild cards once per color) and drawing
+    """
+    round_ = ctx.current_round
+    moves = [DRAW]
+    for card in base.legal_moves(ctx, round_.current_player):
+        if card.color == 'wild':
+            moves.extend((card, color) for color in WILD_COLORS)
+        else:
+            moves.append((card,))
+    return moves
+
+
+def rollout_move(ctx: Context, rng: random.Random) -> Move:
+    """
+    default rollout policy: a random playable card, drawing only when nothing can be played
+    """
+    round_ = ctx.current_round
+    legal = base.legal_moves(ctx, round_.current_player)
+    if not legal:
+        return DRAW
+    return rng.choice(legal), rng.choice(WILD_COLORS)
+
+
+def round_winner(ctx: Context) -> int | None:
+    for idx, hand in enumerate(ctx.current_round.hands):
+        if len(hand) == 0:
+            return idx
+    return None
+
+
+def search(root: Node, ctx: Context, observer: int, rng: random.Random, iterations: int | None,
+           deadline: float | None, exploration: float, rollout_limit: int,
+           rollout_policy: Callable[[Context, random.Random], Move] = rollout_move) -> SearchStats:
+    """
+    grow the tree under `root` until the iteration budget or the deadline is reached
+    :param root: node of the observer's information set
+    :param ctx: the real context, only read
+    :param observer: index of the searching player
+    :param rng:
+    :param iterations: iteration budget, None for no limit
+    :param deadline: `time.perf_counter()` value to stop at, None for no limit
+    :param exploration: UCB exploration constant
+    :param rollout_limit: max number of steps in a rollout
+    :param rollout_policy:
+    :return: stats of this search
+    """
+    stats = SearchStats()
+    started = time.perf_counter()
+    step = base.step
+    while (iterations is None or stats.iterations < iterations) and (
+            deadline is None or time.perf_counter() < deadline):
+        world = determinize(ctx, observer, rng)
+        node = root
+
+        # selection and expansion
+        while not base.round_is_over(world.current_round):
+            player = world.current_round.current_player
+            moves = available_moves(world)
+            untried = []
+            candidates = []
+            for move in moves:
+                child = node.children.get(move)
+                if child is None:
+                    untried.append(move)
+                else:
+                    child.avail += 1
+                    candidates.append(child)
+            if untried:
+                move = rng.choice(untried)
+                child = Node(move, player, node)
+                node.children[move] = child
+                stats.nodes += 1
+                step(world, move)
+                node = child
+                break
+            node = max(candidates, key=lambda c: c.ucb(exploration))
+            step(world, node.move)
+
+        # simulation
+        for _ in range(rollout_limit):
+            if base.round_is_over(world.current_round):
+                break
+            step(world, rollout_policy(world, rng))
+
+        # back propagation, each node is scored for the player who made its move
+        winner = round_winner(world)
+        while node is not None:
+            node.visits += 1
+            if node.player == winner:
+                node.wins += 1
+            node = node.parent
+        stats.iterations += 1
+    stats.elapsed = time.perf_counter() - started
+    return stats
+
+
+def _search_worker(ctx: Context, observer: int, seed: int, iterations: int | None, deadline: float | None,
+                   exploration: float, rollout_limit: int) -> tuple[dict[Move, int], SearchStats]:
+    """
+    root-parallel search in a worker process
+    :param deadline: `time.monotonic()` value to stop at, shared by all processes of the machine so the time spent
+        sending the work counts against the budget
+    :return: visits of each root move, stats
+    """
+    if deadline is not None:  # convert to this process' `perf_counter` clock used by `search`
+        deadline = time.perf_counter() + deadline - time.monotonic()
+    root = Node()
+    stats = search(root, ctx, observer, random.Random(seed), iterations, deadline, exploration, rollout_limit)
+    return {move: child.visits for move, child in root.children.items()}, stats
+
+
+class ISMCTSPlayer(Player):
+    """
+    Player searching with ISMCTS. Needs the game's context to read the public state, hidden cards are re-sampled
+    on every iteration. Every move is limited by `iterations` and/or `time_limit` (seconds).
+    """
+    context: Context
+    iterations: int | None
+    time_limit: float | None
+    exploration: float
+    rollout_limit: int
+    workers: int
+    reuse_tree: bool
+    telemetry: list[SearchStats]
+
+    def __init__(self, name: str, context: Context, iterations: int | None = 1000, time_limit: float | None = None,
+                 exploration: float = 0.7, rollout_limit: int = 300, workers: int = 1, reuse_tree: bool = True,
+                 seed: int | None = None):
+        super().__init__(name, seed)
+        if iterations is None and time_limit is None:
+            raise ValueError('Need an iteration budget or a time limit')
+        self.context = context
+        self.iterations = iterations
+        self.time_limit = time_limit
+        self.exploration = exploration
+        self.rollout_limit = rollout_limit
+        self.workers = workers
+        self.reuse_tree = reuse_tree
+        self.telemetry = []
+
+        self._executor: ProcessPoolExecutor | None = None
+        self._root: Node | None = None
+        self._round: Any = None  # round, round count and turn count when `_root` was kept
+        self._rounds: int = 0  # rounds can be reset in place, see `Context.reuse_rounds`
+        self._turns: int = 0
+        self._hand_sizes: list[int] = []  # when `_root` was kept, to tell plays from auto-played draws
+
+    @property
+    def last_stats(self) -> SearchStats | None:
+        return self.telemetry[-1] if self.telemetry else None
+
+    def play(self, request: Request) -> Move:
+        started = time.perf_counter()
+        deadline = None if self.time_limit is None else started + self.time_limit
+        round_ = self.context.current_round
+        observer = round_.current_player
+
+        if self.workers > 1:
+            wall_deadline = None if self.time_limit is None else time.monotonic() + self.time_limit
+            visits, stats = self._search_parallel(observer, wall_deadline)
+        else:
+            root, reused = self._reuse_root(request)
+            stats = search(root, self.context, observer, self.rng, self.iterations, deadline,
+                           self.exploration, self.rollout_limit)
+            stats.reused = reused
+            visits = {move: child.visits for move, child in root.children.items()}
+
+        legal = set(available_moves(self.context))
+        move = max((move for move in visits if move in legal), key=visits.get, default=DRAW)
+        if self.workers <= 1 and self.reuse_tree:
+            self._root = root.children.get(move)
+            if self._root is not None:
+                self._root.parent = None
+            self._round, self._rounds, self._turns = round_, self.context.rounds, round_.turns
+            self._hand_sizes = [len(hand) for hand in round_.hands]
+        stats.elapsed = time.perf_counter() - started
+        self.telemetry.append(stats)
+        return move
+
+    def _reuse_root(self, request: Request) -> tuple[Node, bool]:
+        """
+        follow the moves made since our last move down the kept subtree
+        :return: root for the search, whether it was reused
+        """
+        root, round_ = self._root, self.context.current_round
+        self._root = None
+        if root is None or round_ is not self._round or self.context.rounds != self._rounds:
+            return Node(), False
+        count = round_.turns - self._turns - 1  # moves of the other players
+        moves = request.latest_moves
+        if count < 0 or count > len(moves):
+            return Node(), False
+        hands = round_.hands
+        for entry in moves[len(moves) - count:] if count else ():
+            # history holds what `step` returned: a draw that was auto-played shows up as playing the drawn card,
+            # while the tree is keyed by requested moves. Only a real play shrinks the hand by one card
+            # (each opponent moves at most once between two of our moves)
+            if entry.move[0] is not None and len(hands[entry.player]) != self._hand_sizes[entry.player] - 1:
+                return Node(), False
+            root = root.children.get(entry.move)
+            if root is None:
+                return Node(), False
+        root.parent = None
+        return root, True
+
+    def _search_parallel(self, observer: int, deadline: float | None) -> tuple[dict[Move, int], SearchStats]:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        iterations = None if self.iterations is None else max(1, self.iterations // self.workers)
+        futures = [
+            self._executor.submit(_search_worker, self.context, observer, self.rng.getrandbits(64), iterations,
+                                  deadline, self.exploration, self.rollout_limit)
+            for _ in range(self.workers)
+        ]
+        visits: dict[Move, int] = {}
+        total = SearchStats()
+        for future in futures:
+            worker_visits, stats = future.result()
+            for move, count in worker_visits.items():
+                visits[move] = visits.get(move, 0) + count
+            total.iterations += stats.iterations
+            total.nodes += stats.nodes
+        return visits, total
+
+    def close(self):
+        """
+        shut down the worker pool of root-parallel search
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
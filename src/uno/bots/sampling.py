@@ -0,0 +1,43 @@
+"""
+Determinization: sample a full game state consistent with what one player can see.
+"""
+import random
+
+from ..engine.context import Context
+from ..rules import base
+
+
+def determinize(ctx: Context, observer: int, rng: random.Random) -> Context:
+    """
+    copy the context and redistribute the cards the observer cannot see.
+    The observer's hand, the discard pile, hand sizes, effects and scores are kept, the other hands and the draw
+    pile are re-dealt from the pool of unseen cards, and the copy gets a fresh rng for future shuffles.
+    :param ctx: the real context
+    :param observer: index of the player whose view is kept
+    :param rng: source of randomness of the sampling, the real context's rng is not touched
+    :return: a new context
+    """
+    world = ctx.clone(random.Random(rng.getrandbits(64)))
+    round_ = world.current_round
+    if round_ is None:
+        return world
+
+    hidden = round_.draw[:]
+    for idx, hand in enumerate(round_.hands):
+        if idx != observer:
+            hidden.extend(hand)
+    rng.shuffle(hidden)
+
+    pos = 0
+    for idx, hand in enumerate(round_.hands):
+        if idx == observer:
+            continue
+        size = len(hand)
+        hand.clear()
+        for card in hidden[pos:pos + size]:
+            hand.append(card)
+        pos += size
+    round_.draw = hidden[pos:]
+    round_.unshuffled = 0  # already shuffled
+    base.value_hands(round_)
+    return world
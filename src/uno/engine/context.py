@@ -1,7 +1,14 @@
-from dataclasses import dataclass, field, InitVar
+from collections.abc import Sequence
+from dataclasses import dataclass, field, fields, InitVar
 import random
 from typing import NamedTuple
 
+from .events import EventEmitter
+from .rng import RngStream
+
+ROUND_STREAMS: int = 1  # option flag: reseed the rng from the round's stream at the start of each round
+LAZY_SHUFFLE: int = 2  # option flag: shuffle the draw pile one card at a time as cards are drawn
+
 
 class Card(NamedTuple):
     color: str
@@ -16,24 +23,118 @@ class Round:
     """
     draw: list[Card] = field(default_factory=list)
     discard: list[Card] = field(default_factory=list)
-    hands: list[list[Card]] = field(default_factory=list)
+    hands: list[list[Card]] = field(default_factory=list)  # may hold `CompactHand`s instead of lists
 
     turns: int = field(init=False, default=0)
     last_card: Card | None = field(init=False, default=None)
     current_player: int = field(init=False, default=0)
-    active_effects: list[str] = field(init=False, default_factory=list)
+    effects: int = field(init=False, default=0)  # effect and direction state, encoded by the rule
+    unshuffled: int = field(init=False, default=0)  # bottom cards of the draw pile still in no particular order
+    hand_points: list[int] = field(init=False, default_factory=list)  # value of each hand, kept by the rule
+
+    def reset(self, deck: Sequence[Card] = ()):
+        """
+        empty the round in place for the next deal, keeping its lists and hands, with `deck` as the draw pile
+        :param deck: cards of the new draw pile, in order
+        """
+        self.draw[:] = deck
+        self.discard.clear()
+        for hand in self.hands:
+            hand.clear()
+        self.turns = 0
+        self.last_card = None
+        self.current_player = 0
+        self.effects = 0
+        self.unshuffled = 0
+        hand_points = self.hand_points
+        for idx in range(len(hand_points)):
+            hand_points[idx] = 0
+
+    def clone(self) -> 'Round':
+        """
+        copy the round so that stepping the copy leaves this one untouched.
+        Cards are immutable and shared, only the containers are copied.
+        """
+        round_ = Round(self.draw[:], self.discard[:], [hand.copy() for hand in self.hands])
+        round_.turns = self.turns
+        round_.last_card = self.last_card
+        round_.current_player = self.current_player
+        round_.effects = self.effects
+        round_.unshuffled = self.unshuffled
+        round_.hand_points = self.hand_points[:]
+        return round_
 
 
 @dataclass(slots=True)
 class Context:
     player_count: int
     seed: InitVar[int | None] = field(default=None, kw_only=True)
+    compact_hands: bool = field(default=False, kw_only=True)  # let rules store hands as `CompactHand`
+    round_streams: bool = field(default=False, kw_only=True)  # see `ROUND_STREAMS`
+    lazy_shuffle: bool = field(default=False, kw_only=True)  # see `LAZY_SHUFFLE`, changes the rng sequence
+    reuse_rounds: bool = field(default=False, kw_only=True)  # rules deal the next round into `current_round`
 
     scoreboard: list[int] | None = field(init=False, default=None)
     rounds: int = field(init=False, default=0)
     current_round: Round | None = field(init=False, default=None)
 
     rng: random.Random = field(init=False)
+    streams: RngStream = field(init=False)  # root of the game's streams, seeded by `seed`
+    events: EventEmitter = field(init=False, default_factory=EventEmitter)  # rules emit game events through it
 
     def __post_init__(self, seed: int | None):
         self.rng = random.Random(seed)
+        self.streams = RngStream(seed)
+
+    @property
+    def flags(self) -> int:
+        """
+        options changing how the rule plays out a seed, stored in game records
+        """
+        return (ROUND_STREAMS if self.round_streams else 0) | (LAZY_SHUFFLE if self.lazy_shuffle else 0)
+
+    def __getstate__(self) -> dict:
+        # sinks may hold files or sockets, and a copy sent to another process has nowhere to report events
+        return {f.name: getattr(self, f.name) for f in fields(self) if f.name != 'events'}
+
+    def __setstate__(self, state: dict):
+        for name, value in state.items():
+            setattr(self, name, value)
+        self.events = EventEmitter()
+
+    def snapshot(self) -> bytes:
+        """
+        compact binary copy of the state, see `uno.snapshot`. Event sinks are not included
+        """
+        from ..snapshot import snapshot  # the format depends on the rules' card ids, which depend on this module
+        return snapshot(self)
+
+    @staticmethod
+    def restore(data: bytes | memoryview) -> 'Context':
+        """
+        rebuild a context from `snapshot`, continuing exactly like the original
+        """
+        from ..snapshot import restore
+        return restore(data)
+
+    def clone(self, rng: random.Random | None = None) -> 'Context':
+        """
+        copy the context, including the rng state, for search and what-if analysis
+        :param rng: use this rng in the copy instead of copying the state of ours
+        """
+        ctx = Context.__new__(Context)
+        ctx.player_count = self.player_count
+        ctx.compact_hands = self.compact_hands
+        ctx.round_streams = self.round_streams
+        ctx.lazy_shuffle = self.lazy_shuffle
+        ctx.reuse_rounds = self.reuse_rounds
+        ctx.streams = self.streams
+        ctx.scoreboard = None if self.scoreboard is None else self.scoreboard[:]
+        ctx.rounds = self.rounds
+        ctx.current_round = None if self.current_round is None else self.current_round.clone()
+        if rng is None:
+            rng = random.Random.__new__(random.Random)
+            rng.setstate(self.rng.getstate())
+        ctx.rng = rng
+        ctx.events = EventEmitter()  # copies are for search, their events go nowhere
+        return ctx
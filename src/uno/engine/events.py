@@ -0,0 +1,202 @@
+"""
+Typed game events emitted by the engine and rules, and the sinks they go to.
+
+Event kinds are bit flags so the emitter keeps the union of what its sinks subscribed to, and rules test it before
+building an event: with no subscribed sink an event costs one attribute load and one `&`.
+Events are tuples, rendered to text only when a sink asks for it.
+"""
+import json
+import logging
+from collections import deque
+from collections.abc import Iterator
+from os import PathLike
+from typing import Any, NamedTuple, TextIO
+
+ROUND_STARTED: int = 1  # data: (top card,)
+CARD_PLAYED: int = 2  # data: (card, chosen color or None)
+CARD_DRAWN: int = 4  # data: (card,)
+EFFECT_APPLIED: int = 8  # data: (effect,), player is the one affected
+DECK_REPLENISHED: int = 16  # data: (size of the new draw pile,)
+ROUND_SCORED: int = 32  # data: (points, turns), player is the winner
+ALL_EVENTS: int = 63
+
+EVENT_NAMES: dict[int, str] = {
+    ROUND_STARTED: 'round_started',
+    CARD_PLAYED: 'card_played',
+    CARD_DRAWN: 'card_drawn',
+    EFFECT_APPLIED: 'effect_applied',
+    DECK_REPLENISHED: 'deck_replenished',
+    ROUND_SCORED: 'round_scored',
+}
+
+_TEMPLATES: dict[int, str] = {
+    ROUND_STARTED: 'Round {round} started with {0}',
+    CARD_PLAYED: 'Player {player} played {0}',
+    CARD_DRAWN: 'Player {player} drew {0}',
+    EFFECT_APPLIED: 'Player {player} took {0}',
+    DECK_REPLENISHED: 'Draw pile refilled with {0} cards',
+    ROUND_SCORED: 'Player {player} won round {round} for {0} points in {1} turns',
+}
+
+
+class Event(NamedTuple):
+    kind: int
+    round: int
+    player: int  # -1 when no player is involved
+    data: tuple
+
+    @property
+    def name(self) -> str:
+        return EVENT_NAMES[self.kind]
+
+    def render(self) -> str:
+        return _TEMPLATES[self.kind].format(*self.data, round=self.round, player=self.player)
+
+    def to_json(self) -> list:
+        return [self.name, self.round, self.player, *self.data]
+
+    def __str__(self) -> str:
+        return self.render()
+
+
+class Sink:
+    """
+    Receives the events of the kinds it subscribes to. Sinks may buffer, `flush` hands buffered events on
+    """
+    kinds: int
+
+    def __init__(self, kinds: int = ALL_EVENTS):
+        """
+        :param kinds: bit mask of the event kinds to receive
+        """
+        self.kinds = kinds
+
+    def write(self, event: Event):
+        raise NotImplementedError
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+
+class NullSink(Sink):
+    """
+    Discards events, to measure the cost of emitting them
+    """
+    def write(self, event: Event):
+        pass
+
+
+class RingSink(Sink):
+    """
+    Keeps the latest `capacity` events in memory
+    """
+    events: deque
+
+    def __init__(self, capacity: int | None = 1024, kinds: int = ALL_EVENTS):
+        super().__init__(kinds)
+        self.events = deque(maxlen=capacity)
+
+    def write(self, event: Event):
+        self.events.append(event)
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def __iter__(self) -> Iterator[Event]:
+        return iter(self.events)
+
+
+class NDJSONSink(Sink):
+    """
+    Appends events to a file, one JSON array `[name, round, player, *data]` per line, written in batches
+    """
+    batch_size: int
+
+    _buffer: list[Event]
+    _file: TextIO
+
+    def __init__(self, path: str | PathLike, kinds: int = ALL_EVENTS, batch_size: int = 512):
+        super().__init__(kinds)
+        self.batch_size = batch_size
+        self._buffer = []
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def write(self, event: Event):
+        self._buffer.append(event)
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self._file.write(''.join(json.dumps(event.to_json()) + '\n' for event in self._buffer))
+            self._buffer.clear()
+        self._file.flush()
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+
+class LoggingSink(Sink):
+    """
+    Passes events to a logger, rendered only if a handler formats the record
+    """
+    logger: logging.Logger
+    level: int
+
+    def __init__(self, logger: logging.Logger, level: int = logging.INFO, kinds: int = ALL_EVENTS):
+        super().__init__(kinds)
+        self.logger = logger
+        self.level = level
+
+    def write(self, event: Event):
+        self.logger.log(self.level, '%s', event)
+
+
+class EventEmitter:
+    """
+    Dispatches events to subscribed sinks. `mask` is the union of the sinks' kinds, check it before emitting:
+
+        if ctx.events.mask & CARD_DRAWN:
+            ctx.events.emit(CARD_DRAWN, ctx.rounds, player, card)
+    """
+    __slots__ = ('mask', 'sinks')
+
+    mask: int
+    sinks: list[Sink]
+
+    def __init__(self, sinks: Any = ()):
+        self.sinks = []
+        self.mask = 0
+        for sink in sinks:
+            self.subscribe(sink)
+
+    def subscribe(self, sink: Sink):
+        self.sinks.append(sink)
+        self.mask |= sink.kinds
+
+    def unsubscribe(self, sink: Sink):
+        self.sinks.remove(sink)
+        self.mask = 0
+        for other in self.sinks:
+            self.mask |= other.kinds
+
+    def emit(self, kind: int, round_: int, player: int, *data):
+        """
+        send an event to the sinks subscribed to its kind
+        :param kind: one of the event kind flags
+        :param round_: round number
+        :param player: player index, -1 if none
+        :param data: kind-specific fields
+        """
+        event = Event(kind, round_, player, data)
+        for sink in self.sinks:
+            if sink.kinds & kind:
+                sink.write(event)
+
+    def flush(self):
+        for sink in self.sinks:
+            sink.flush()
@@ -1,14 +1,61 @@
 import logging
-import datetime
+import time
+from collections.abc import Sequence
+from os import PathLike
 from typing import Any
 
-from .player import Player, Request, DrawPlayer
+from .player import Move, Player, Request, DrawPlayer
 from .rule import Rule
 from .context import Context
+from .history import DEFAULT_WINDOW, History, HistoryView
+from .events import ALL_EVENTS, LoggingSink, Sink
+from .instrument import Instrumentation
+from .rng import RngStream
 
 logger = logging.getLogger(__name__)
 
 
+class HandSizes(Sequence):
+    """
+    Read-only live view of the hand sizes of the current round
+    """
+    __slots__ = ('_context',)
+
+    def __init__(self, context: Context):
+        self._context = context
+
+    def __getitem__(self, idx):
+        hands = self._context.current_round.hands
+        if isinstance(idx, slice):
+            return [len(hand) for hand in hands[idx]]
+        return len(hands[idx])
+
+    def __len__(self) -> int:
+        return len(self._context.current_round.hands)
+
+    def __repr__(self) -> str:
+        return f'HandSizes({self[:]!r})'
+
+
+class HandPoints(Sequence):
+    """
+    Read-only live view of the hand values of the current round
+    """
+    __slots__ = ('_context',)
+
+    def __init__(self, context: Context):
+        self._context = context
+
+    def __getitem__(self, idx):
+        return self._context.current_round.hand_points[idx]
+
+    def __len__(self) -> int:
+        return len(self._context.current_round.hand_points)
+
+    def __repr__(self) -> str:
+        return f'HandPoints({self[:]!r})'
+
+
 class Game:
     """
     Root class, calling rule to play the game, interacting with players and keeping track of the game history
@@ -17,38 +64,235 @@ class Game:
     rule: Rule
     players: list[Player]
 
-    history: list[Any]
+    history: History
+    seed: int | None
+    recorder: Any  # e.g. `uno.record.RecordWriter`, told about the game and each move
+    instrumentation: Instrumentation | None
 
-    def __init__(self, rule: Rule, n_players: int = 4, seed: int | None = None):
-        self.context = Context(n_players, seed=seed)
+    def __init__(self, rule: Rule, n_players: int = 4, seed: int | None = None, compact_hands: bool = False,
+                 history_window: int | None = DEFAULT_WINDOW, archive: str | PathLike | None = None,
+                 recorder: Any = None, instrumentation: Instrumentation | None = None, sinks: Sequence[Sink] = (),
+                 round_streams: bool = False, lazy_shuffle: bool = False, reuse_rounds: bool = False,
+                 recycle_requests: bool = False):
+        """
+        :param rule:
+        :param n_players:
+        :param seed: seed of the context's rng and root of the players' streams
+        :param compact_hands: store hands as `CompactHand`s
+        :param history_window: number of latest moves kept in memory and shown to players, None for all
+        :param archive: file to append every move to, one JSON line each
+        :param recorder: object with `begin(seed, n_players, flags)`, `append(move)` and `end()` to record the game
+        :param instrumentation: collect timings and counters of the game loop, off when None
+        :param sinks: receive the game events emitted by the rule. Events are logged at INFO if the logger is
+            enabled when the game is created
+        :param round_streams: reseed the context's rng from the round's own stream at the start of each round
+        :param lazy_shuffle: shuffle draw piles as cards are drawn. Same deal distribution, different rng sequence
+        :param reuse_rounds: deal each round into the lists of the previous one. Code keeping a finished round
+            must copy it
+        :param recycle_requests: update one request per seat instead of building one each turn, see `Request`
+        """
+        self.seed = seed
+        self.recorder = recorder
+        self.instrumentation = instrumentation
+        self.context = Context(n_players, seed=seed, compact_hands=compact_hands, round_streams=round_streams,
+                               lazy_shuffle=lazy_shuffle, reuse_rounds=reuse_rounds)
         self.players = [DrawPlayer(str(i)) for i in range(n_players)]
-        self.history = []
+        self.history = History(history_window, archive=archive)
+        # views handed to players are built once and stay live
+        self._history_view: HistoryView = self.history.view()
+        self._hand_sizes = HandSizes(self.context)
+        self._hand_points = HandPoints(self.context)
+        self._requests: list[Request] | None = None
+        if recycle_requests:
+            self._requests = [Request([], self._hand_sizes, None, self._history_view, hand_points=self._hand_points)
+                              for _ in range(n_players)]
+        for sink in sinks:
+            self.context.events.subscribe(sink)
+        if logger.isEnabledFor(logging.INFO):
+            self.context.events.subscribe(LoggingSink(logger, logging.INFO, ALL_EVENTS))
 
         self.rule = rule
 
     def build_request(self, idx: int):
         hand = self.context.current_round.hands[idx]
-        hand_sizes = list(map(len, self.context.current_round.hands))
+        if not isinstance(hand, list):  # compact hands are converted back to cards for players
+            hand = hand.to_list()
         scores = self.context.scoreboard
-        latest_move = self.history  # survival is more important than efficiency
-        
+
         # Get top card (last_card) from current round
         top_card = None
         if self.context.current_round:
             top_card = self.context.current_round.last_card
 
-        return Request(hand, hand_sizes, scores, latest_move, top_card)
+        legal_moves = None
+        if self.rule.legal_moves is not None:
+            legal_moves = self.rule.legal_moves(self.context, idx)
+
+        if self._requests is None:
+            return Request(hand, self._hand_sizes, scores, self._history_view, top_card, legal_moves,
+                           self._hand_points, self.context.current_round.effects)
+        request = self._requests[idx]
+        request.hand = hand
+        request.scores = scores
+        request.top_card = top_card
+        request.legal_moves = legal_moves
+        request.effects = self.context.current_round.effects
+        return request
+
+    def reset(self, seed: int | None = None):
+        """
+        make the game ready to `begin` again with another seed, keeping its context, history, request slots and,
+        with `reuse_rounds`, its round. Players, recorder and event sinks stay; an archive closed by `end` stays
+        closed
+        :param seed: seed of the next game
+        """
+        self.seed = seed
+        ctx = self.context
+        ctx.rng.seed(seed)
+        ctx.streams = RngStream(seed)
+        ctx.scoreboard = None
+        ctx.rounds = 0
+        if not ctx.reuse_rounds:
+            ctx.current_round = None
+        self.history.clear()
 
     def start(self):
         """
         Main game loop, on each step, the rule is called to update the context and the current players are asked to play
         :return:
         """
+        self.begin()
+        try:
+            if self.instrumentation is not None:
+                self._run_instrumented(self.instrumentation)
+                return
+            while not self.rule.is_over(self.context):
+                cur_player = self.context.current_round.current_player
+                request = self.build_request(cur_player)
+                self.apply(cur_player, self.players[cur_player].play(request))
+        finally:
+            self.end()
+
+    def begin(self):
+        """
+        initialize the game and give each unseeded player the stream of its seat.
+        `start` runs the whole game, drivers with their own loop (e.g. async tables) call `begin`,
+        then `apply` for each move until the rule says the game is over, then `end`
+        """
         logger.info("Starting game")
+        streams = self.context.streams
+        for seat, player in enumerate(self.players):
+            if isinstance(player, Player) and not player.seeded:
+                player.rng = streams.player(seat).random()
+        if self.recorder is not None:
+            self.recorder.begin(self.seed, self.context.player_count, self.context.flags)
         self.rule.init_game(self.context)
-        while not self.rule.is_over(self.context):
-            cur_player = self.context.current_round.current_player
+
+    def apply(self, player: int, move: Move) -> Any:
+        """
+        play the move of the current player
+        :param player: index of the current player
+        :param move:
+        :return: what the rule returned
+        """
+        if self.recorder is not None:
+            self.recorder.append(move)
+        rounds = self.context.rounds
+        result = self.rule.step(self.context, move)
+        self.history.append(player, rounds, result)
+        return result
+
+    def end(self):
+        """
+        release what the game holds: history archive, recorder, and flush the event sinks
+        """
+        self.context.events.flush()
+        self.history.close()
+        if self.recorder is not None:
+            self.recorder.end()
+
+    def _run_instrumented(self, instrumentation: Instrumentation):
+        """
+        same loop as `start`, timing each phase and counting what the rule did from the context changes.
+        Moves go through `apply` like in the plain loop
+        :param instrumentation:
+        :return:
+        """
+        clock = time.perf_counter
+        phase_time, counters, hooks = instrumentation.phase_time, instrumentation.counters, instrumentation.hooks
+        ctx = self.context
+        for hook in hooks:
+            hook.on_start(self)
+        while not self.rule.is_over(ctx):
+            round_ = ctx.current_round
+            cur_player = round_.current_player
+            rounds, discard, hand_size = ctx.rounds, round_.discard, len(round_.hands[cur_player])
+
+            started = clock()
             request = self.build_request(cur_player)
+            requested = clock()
             move = self.players[cur_player].play(request)
-            self.history.append(self.rule.step(self.context, move))
-            logger.info(f"Player {cur_player} played {move}")
+            played = clock()
+            result = self.apply(cur_player, move)
+            applied = clock()
+
+            phase_time['build_request'] += requested - started
+            phase_time['play'] += played - requested
+            phase_time['apply'] += applied - played  # recording, step, events and history
+            latency = played - requested
+            instrumentation.player_latency(cur_player).add(latency)
+
+            if ctx.rounds != rounds:  # the step ended the round instead of playing a turn
+                counters['rounds'] += 1
+            else:
+                counters['turns'] += 1
+                card = result[0] if result else None
+                counters['draws'] += len(round_.hands[cur_player]) - hand_size + (card is not None)
+                if round_.discard is not discard:  # the draw pile was refilled from the discard pile
+                    counters['refills'] += 1
+                if move and move[0] is not None and card != move[0]:
+                    counters['invalid_moves'] += 1
+            for hook in hooks:
+                hook.on_turn(self, cur_player, move, result, latency)
+        for hook in hooks:
+            hook.on_finish(self, instrumentation)
+
+
+class GamePool:
+    """
+    Games kept for bulk simulation: `acquire` resets a released game for the new seed instead of building one.
+    Games reuse their rounds and recycle requests, so players must not keep requests after `play` returns
+    """
+    rule: Rule
+    n_players: int
+    options: dict[str, Any]  # passed to `Game`
+
+    _free: list[Game]
+
+    def __init__(self, rule: Rule, n_players: int = 4, **options):
+        """
+        :param rule:
+        :param n_players:
+        :param options: other `Game` arguments
+        """
+        self.rule = rule
+        self.n_players = n_players
+        self.options = {'reuse_rounds': True, 'recycle_requests': True, **options}
+        self._free = []
+
+    def acquire(self, seed: int | None = None) -> Game:
+        """
+        :param seed: seed of the game
+        :return: a game ready to begin, with the players of its previous use
+        """
+        if not self._free:
+            return Game(self.rule, self.n_players, seed=seed, **self.options)
+        game = self._free.pop()
+        game.reset(seed)
+        return game
+
+    def release(self, game: Game):
+        """
+        give back a finished game. It must not be used until acquired again
+        """
+        self._free.append(game)
@@ -0,0 +1,157 @@
+"""
+Compact card encoding: every distinct card of a rule gets a small integer id, and hands are stored as count arrays.
+"""
+from collections.abc import Iterable, Iterator
+
+from .context import Card
+
+
+class CardIndex:
+    """
+    A fixed id space for the cards built from `colors` x `symbols`.
+    Card id is `color_index * len(symbols) + symbol_index`, so ids of one color are contiguous.
+    """
+    __slots__ = ('colors', 'symbols', 'cards', 'ids')
+
+    colors: tuple[str, ...]
+    symbols: tuple[int | str, ...]
+    cards: tuple[Card, ...]  # id -> card
+    ids: dict[Card, int]  # card -> id
+
+    def __init__(self, colors: Iterable[str], symbols: Iterable[int | str]):
+        self.colors = tuple(colors)
+        self.symbols = tuple(symbols)
+        self.cards = tuple(Card(color, symbol) for color in self.colors for symbol in self.symbols)
+        self.ids = {card: idx for idx, card in enumerate(self.cards)}
+
+    def __len__(self) -> int:
+        return len(self.cards)
+
+    def encode(self, card: Card) -> int:
+        """
+        :param card:
+        :return: id of the card. Raises KeyError for cards outside the id space
+        """
+        return self.ids[card]
+
+    def decode(self, card_id: int) -> Card:
+        return self.cards[card_id]
+
+
+class CompactHand:
+    """
+    A hand stored as a count per card id, bucketed by color and by symbol.
+    Implements the subset of the list interface used by rules, so it can replace a `list[Card]` in `Round.hands`,
+    with O(1) `append`, `remove` and `len`.
+    """
+    __slots__ = ('index', 'counts', 'size', 'color_counts', 'symbol_counts')
+
+    index: CardIndex
+    counts: bytearray
+    size: int
+    color_counts: bytearray  # number of cards per color index
+    symbol_counts: bytearray  # number of cards per symbol index
+
+    def __init__(self, index: CardIndex, cards: Iterable[Card] = ()):
+        self.index = index
+        self.counts = bytearray(len(index))
+        self.size = 0
+        self.color_counts = bytearray(len(index.colors))
+        self.symbol_counts = bytearray(len(index.symbols))
+        for card in cards:
+            self.append(card)
+
+    def append(self, card: Card):
+        card_id = self.index.ids[card]
+        self.counts[card_id] += 1
+        self.size += 1
+        color, symbol = divmod(card_id, len(self.symbol_counts))
+        self.color_counts[color] += 1
+        self.symbol_counts[symbol] += 1
+
+    def extend(self, cards: Iterable[Card]):
+        for card in cards:
+            self.append(card)
+
+    def remove(self, card: Card):
+        """
+        remove one copy of the card, raise ValueError if not in hand, like `list.remove`
+        """
+        card_id = self.index.ids.get(card)
+        if card_id is None or self.counts[card_id] == 0:
+            raise ValueError(f'{card} not in hand')
+        self.counts[card_id] -= 1
+        self.size -= 1
+        color, symbol = divmod(card_id, len(self.symbol_counts))
+        self.color_counts[color] -= 1
+        self.symbol_counts[symbol] -= 1
+
+    def matching(self, color: str, symbol: int | str, *any_symbol_colors: str) -> list[Card]:
+        """
+        cards of the given color or symbol, plus all cards of `any_symbol_colors`. Empty buckets are skipped
+        :param color:
+        :param symbol:
+        :param any_symbol_colors: colors matching whatever the symbol, e.g. wild
+        :return: distinct cards, one entry per copy held
+        """
+        index, counts = self.index, self.counts
+        n_symbols = len(self.symbol_counts)
+        cards = []
+        colors = {index.colors.index(color), *(index.colors.index(extra) for extra in any_symbol_colors)}
+        for color_idx in colors:
+            if self.color_counts[color_idx]:
+                start = color_idx * n_symbols
+                for card_id in range(start, start + n_symbols):
+                    cards.extend([index.cards[card_id]] * counts[card_id])
+        symbol_idx = index.symbols.index(symbol)
+        if self.symbol_counts[symbol_idx]:
+            for color_idx in range(len(index.colors)):
+                card_id = color_idx * n_symbols + symbol_idx
+                if color_idx not in colors and counts[card_id]:
+                    cards.extend([index.cards[card_id]] * counts[card_id])
+        return cards
+
+    def clear(self):
+        self.counts[:] = bytes(len(self.counts))
+        self.color_counts[:] = bytes(len(self.color_counts))
+        self.symbol_counts[:] = bytes(len(self.symbol_counts))
+        self.size = 0
+
+    def count(self, card: Card) -> int:
+        card_id = self.index.ids.get(card)
+        return 0 if card_id is None else self.counts[card_id]
+
+    def __contains__(self, card: Card) -> bool:
+        return self.count(card) > 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self) -> Iterator[Card]:
+        cards = self.index.cards
+        for card_id, count in enumerate(self.counts):
+            for _ in range(count):
+                yield cards[card_id]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, CompactHand):
+            return self.index is other.index and self.counts == other.counts
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f'CompactHand({self.to_list()!r})'
+
+    def copy(self) -> 'CompactHand':
+        hand = CompactHand.__new__(CompactHand)
+        hand.index = self.index
+        hand.counts = self.counts[:]
+        hand.size = self.size
+        hand.color_counts = self.color_counts[:]
+        hand.symbol_counts = self.symbol_counts[:]
+        return hand
+
+    def to_list(self) -> list[Card]:
+        """
+        convert back to plain cards, ordered by card id
+        """
+        return list(self)
@@ -0,0 +1,107 @@
+"""
+Bounded move history of a game: a ring buffer of the latest events, with optional archival of every event to disk.
+"""
+import json
+from collections import deque
+from collections.abc import Iterator, Sequence
+from os import PathLike
+from typing import Any, NamedTuple, TextIO
+
+DEFAULT_WINDOW: int = 64
+
+
+class HistoryEntry(NamedTuple):
+    player: int
+    round: int
+    move: Any
+
+
+class HistoryView(Sequence):
+    """
+    Read-only live view of the latest events of a `History`, oldest first
+    """
+    __slots__ = ('_events',)
+
+    def __init__(self, events: deque):
+        self._events = events
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return list(self._events)[idx]
+        return self._events[idx]
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def __iter__(self) -> Iterator:
+        return iter(self._events)
+
+    def __repr__(self) -> str:
+        return f'HistoryView({list(self._events)!r})'
+
+
+class History:
+    """
+    Keeps the last `window` events of a game, so memory stays flat no matter how long the game runs.
+    Events are `HistoryEntry(player, round, move)` when `tagged`, else the bare moves.
+    """
+    window: int | None
+    tagged: bool
+    total: int  # number of events ever recorded
+
+    _events: deque
+    _archive: TextIO | None
+
+    def __init__(self, window: int | None = DEFAULT_WINDOW, tagged: bool = True,
+                 archive: str | PathLike | None = None):
+        """
+        :param window: number of events kept in memory, None for unbounded
+        :param tagged: tag events with the player index and round number
+        :param archive: if given, every event is also appended to this file, one JSON array per line
+        """
+        self.window = window
+        self.tagged = tagged
+        self.total = 0
+        self._events = deque(maxlen=window)
+        self._archive = None if archive is None else open(archive, 'a', encoding='utf-8')
+
+    def append(self, player: int, round_: int, move: Any):
+        """
+        record an event
+        :param player: index of the player who moved
+        :param round_: round number the move was made in
+        :param move: the move as returned by the rule
+        :return:
+        """
+        self._events.append(HistoryEntry(player, round_, move) if self.tagged else move)
+        self.total += 1
+        if self._archive is not None:
+            self._archive.write(json.dumps((player, round_, move)))
+            self._archive.write('\n')
+
+    def clear(self):
+        """
+        forget the events for a new game, the archive is left as is
+        """
+        self._events.clear()
+        self.total = 0
+
+    def view(self) -> HistoryView:
+        return HistoryView(self._events)
+
+    def close(self):
+        """
+        flush and close the archive, if any
+        """
+        if self._archive is not None:
+            self._archive.close()
+            self._archive = None
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def __iter__(self) -> Iterator:
+        return iter(self._events)
+
+    def __getitem__(self, idx):
+        return self._events[idx]
@@ -0,0 +1,138 @@
+"""
+Opt-in instrumentation of the game loop: per-phase timers, event counters, decision latency histograms and hooks.
+"""
+import cProfile
+import math
+from os import PathLike
+from typing import Any
+
+PHASES: tuple[str, ...] = ('build_request', 'play', 'apply')
+COUNTERS: tuple[str, ...] = ('turns', 'draws', 'refills', 'rounds', 'invalid_moves')
+
+
+class LatencyHistogram:
+    """
+    Histogram of durations with power-of-two buckets in microseconds: bucket `i` counts durations below `2 ** i` us
+    """
+    __slots__ = ('buckets', 'count', 'total', 'max')
+
+    N_BUCKETS = 32
+
+    buckets: list[int]
+    count: int
+    total: float  # seconds
+    max: float
+
+    def __init__(self):
+        self.buckets = [0] * self.N_BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float):
+        micros = int(seconds * 1e6)
+        self.buckets[min(micros.bit_length(), self.N_BUCKETS - 1)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        """
+        :param q: in [0, 1]
+        :return: upper bound of the bucket holding the quantile, in seconds
+        """
+        if self.count == 0:
+            return 0.0
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for idx, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank:
+                return (1 << idx) / 1e6
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class Hook:
+    """
+    Receives instrumentation events, override what is needed
+    """
+
+    def on_start(self, game: Any):
+        pass
+
+    def on_turn(self, game: Any, player: int, move: Any, result: Any, latency: float):
+        """
+        called after each step
+        :param game:
+        :param player: index of the player who moved
+        :param move: move returned by the player
+        :param result: what the rule returned
+        :param latency: time the player took to decide, in seconds
+        """
+        pass
+
+    def on_finish(self, game: Any, instrumentation: 'Instrumentation'):
+        pass
+
+
+class Instrumentation:
+    """
+    Measurements of one table, pass to `Game(instrumentation=...)`. Timers use `time.perf_counter`.
+    """
+    phase_time: dict[str, float]  # seconds
+    counters: dict[str, int]
+    latency: list[LatencyHistogram]  # per player
+    hooks: list[Hook]
+
+    def __init__(self, hooks: list[Hook] | None = None):
+        self.phase_time = dict.fromkeys(PHASES, 0.0)
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.latency = []
+        self.hooks = [] if hooks is None else hooks
+
+    def player_latency(self, player: int) -> LatencyHistogram:
+        while len(self.latency) <= player:
+            self.latency.append(LatencyHistogram())
+        return self.latency[player]
+
+    def summary(self) -> dict:
+        """
+        :return: plain data for export
+        """
+        return {
+            'phase_time': dict(self.phase_time),
+            'counters': dict(self.counters),
+            'latency': [
+                {'count': hist.count, 'mean': hist.mean, 'p50': hist.quantile(0.5), 'p99': hist.quantile(0.99),
+                 'max': hist.max}
+                for hist in self.latency
+            ],
+        }
+
+
+class ProfilerHook(Hook):
+    """
+    Profile a single table with cProfile, from start to finish
+    """
+    profile: cProfile.Profile
+    path: str | PathLike | None
+
+    def __init__(self, path: str | PathLike | None = None):
+        """
+        :param path: dump the stats there when the game finishes
+        """
+        self.profile = cProfile.Profile()
+        self.path = path
+
+    def on_start(self, game: Any):
+        self.profile.enable()
+
+    def on_finish(self, game: Any, instrumentation: Instrumentation):
+        self.profile.disable()
+        if self.path is not None:
+            self.profile.dump_stats(self.path)
@@ -1,13 +1,34 @@
+import random
+from collections.abc import Sequence
 from dataclasses import dataclass
 from typing import Any
 
-@dataclass
+@dataclass(slots=True)
 class Request:
+    """
+    What a player is shown on its turn. `hand_sizes`, `latest_moves` and `hand_points` may be live read-only views,
+    copy them if they are kept after `play` returns.
+
+    Games made with `recycle_requests` hand each seat the same request every turn, updated in place: the request
+    and what it holds belong to the game, read them during `play` and copy what is kept after it returns.
+    """
     hand: list[Any]
-    hand_sizes: list[int]
+    hand_sizes: Sequence[int]
     scores: list[int]
-    latest_moves: list[tuple[int, Any]]
+    latest_moves: Sequence[tuple[int, int, Any]]  # (player, round, move) entries, see `HistoryEntry`
     top_card: Any | None = None
+    legal_moves: list[Any] | None = None  # playable cards of the hand, None if the rule does not provide them
+    hand_points: Sequence[int] | None = None  # points each hand is worth, None if the rule does not keep them
+    effects: int | None = None  # pending effects and direction, encoded by the rule (see `uno.rules.effects`)
+
+    def projected_score(self, seat: int) -> int | None:
+        """
+        :param seat:
+        :return: points the player of `seat` would score by going out now, None if hand values are not known
+        """
+        if self.hand_points is None:
+            return None
+        return sum(self.hand_points) - self.hand_points[seat]
 
 
 type Move = tuple[Any, ...]
@@ -15,9 +36,17 @@ type Move = tuple[Any, ...]
 
 class Player:
     name: str
+    rng: random.Random  # unless seeded, replaced by the stream of the player's seat when a game begins
+    seeded: bool
 
-    def __init__(self, name: str):
+    def __init__(self, name: str, seed: int | None = None):
+        """
+        :param name:
+        :param seed: seed of the player's own rng, kept inside games. None to use the stream the game hands over
+        """
         self.name = name
+        self.rng = random.Random(seed)
+        self.seeded = seed is not None
 
     def play(self, request: Request) -> Move:
         """
@@ -35,20 +64,26 @@ class DrawPlayer(Player):
         return (None,)
 
 
-import random
-
 class RandomPlayer(Player):
     def play(self, request: Request) -> Move:
         top_card = request.top_card
         if top_card is None:
             return (None,)
 
+        if request.legal_moves is not None:
+            if not request.legal_moves:
+                return (None,)
+            card = request.legal_moves[0]
+            if getattr(card, 'color', '') == 'wild':
+                return (card, self.rng.choice(('red', 'blue', 'green', 'yellow')))
+            return (card,)
+
         # Try to find a playable card
         for card in request.hand:
             # Check for wild
             if getattr(card, 'color', '') == 'wild':
                 # Pick random color
-                color = random.choice(('red', 'blue', 'green', 'yellow'))
+                color = self.rng.choice(('red', 'blue', 'green', 'yellow'))
                 return (card, color)
             
             # Check matching color or symbol
@@ -58,3 +93,14 @@ class RandomPlayer(Player):
         
         # No playable card
         return (None,)
+
+
+def random_player(name: str, context: Any = None) -> Player:
+    """
+    factory of `RandomPlayer`s with the signature of registered players, see `uno.registry`
+    """
+    return RandomPlayer(name)
+
+
+def draw_player(name: str, context: Any = None) -> Player:
+    return DrawPlayer(name)
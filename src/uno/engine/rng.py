@@ -0,0 +1,62 @@
+"""
+Splittable random streams. A stream is a seed; child streams are derived by hashing the parent seed with a key,
+so any stream (game #N, round #R of it, the player of seat #S) is computed directly from the master seed
+without replaying the ones before it.
+"""
+import hashlib
+import random
+import secrets
+
+
+def derive_seed(master_seed: int, *path: int | str) -> int:
+    """
+    derive the seed of a sub-stream, e.g. `derive_seed(master, game_index)`
+    :param master_seed:
+    :param path: keys leading from the master seed to the stream
+    :return: a 63-bit seed
+    """
+    key = ':'.join(map(str, (master_seed, *path)))
+    digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+    return int.from_bytes(digest) >> 1
+
+
+class RngStream:
+    """
+    A node of the stream hierarchy: master -> game -> round / player
+    """
+    __slots__ = ('seed',)
+
+    seed: int
+
+    def __init__(self, seed: int | None = None):
+        """
+        :param seed: None for a fresh seed from the OS
+        """
+        self.seed = secrets.randbits(63) if seed is None else seed
+
+    def child(self, *key: int | str) -> 'RngStream':
+        return RngStream(derive_seed(self.seed, *key))
+
+    def game(self, game_index: int) -> 'RngStream':
+        return self.child(game_index)
+
+    def round(self, round_index: int) -> 'RngStream':
+        return self.child('round', round_index)
+
+    def player(self, seat: int) -> 'RngStream':
+        return self.child('player', seat)
+
+    def random(self) -> random.Random:
+        """
+        :return: a new generator seeded by this stream
+        """
+        return random.Random(self.seed)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, RngStream) and other.seed == self.seed
+
+    def __hash__(self) -> int:
+        return hash(self.seed)
+
+    def __repr__(self) -> str:
+        return f'RngStream({self.seed})'
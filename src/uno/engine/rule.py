@@ -9,3 +9,4 @@ class Rule(NamedTuple):
     init_game: Callable[[Context], ...]  # initialize the context on the start of the game
     step: Callable[[Context, Move], ...]  # handle the last action and wait for the next one
     is_over: Callable[[Context], bool]  # check if the game is finished
+    legal_moves: Callable[[Context, int], list] | None = None  # cards the given player can play now, optional
@@ -0,0 +1,4 @@
+from .encoding import DRAW_ACTION, N_ACTIONS, ObservationEncoder, decode_action, encode_action
+from .vector import VectorEnv
+
+__all__ = ['DRAW_ACTION', 'N_ACTIONS', 'ObservationEncoder', 'VectorEnv', 'decode_action', 'encode_action']
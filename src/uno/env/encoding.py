@@ -0,0 +1,176 @@
+"""
+Fixed-size observations of `Request`s for learned policies, written into preallocated NumPy buffers.
+
+Observation layout, for a table of `n_players`:
+    hand        card id -> copies held, ids of `base.CARD_INDEX`
+    top card    one-hot of the card id, recolored for wild cards
+    hand sizes  of the other players, in seat order starting after the observer
+    effects     a skip is pending, cards the next draw must take, play is reversed
+
+Actions are the card ids, then one action per wild symbol and chosen color (`WILD_MOVES`), then `DRAW_ACTION`.
+Requires NumPy.
+"""
+from collections.abc import Sequence
+
+import numpy as np
+
+from ..engine.context import Card
+from ..engine.player import Move, Request
+from ..rules.base import CARD_INDEX, COLORS
+from ..rules.effects import REVERSED, SKIP_PENDING, pending_draws
+
+N_CARDS: int = len(CARD_INDEX)
+WILD_COLORS: tuple[str, ...] = COLORS[:-1]
+WILD_SYMBOLS: tuple[str, ...] = ('wild', 'wild_draw_4')
+# playing a wild card and choosing a color, one action per symbol and color after the card ids
+WILD_MOVES: tuple[tuple[str, str], ...] = tuple((symbol, color) for symbol in WILD_SYMBOLS for color in WILD_COLORS)
+DRAW_ACTION: int = N_CARDS + len(WILD_MOVES)
+N_ACTIONS: int = DRAW_ACTION + 1
+
+_IDS: dict[Card, int] = CARD_INDEX.ids
+_WILD_ACTIONS: dict[tuple[str, str], int] = {move: N_CARDS + idx for idx, move in enumerate(WILD_MOVES)}
+# card id -> actions playing it
+_ACTIONS_OF_CARD: list[tuple[int, ...]] = [
+    tuple(_WILD_ACTIONS[card.symbol, color] for color in WILD_COLORS)
+    if card.color == 'wild' and card.symbol in WILD_SYMBOLS else (card_id,)
+    for card_id, card in enumerate(CARD_INDEX.cards)
+]
+
+
+def encode_action(move: Move) -> int:
+    """
+    :param move: a move of the standard rule
+    :return: its action id
+    """
+    card = move[0]
+    if card is None:
+        return DRAW_ACTION
+    if card.color == 'wild' and card.symbol in WILD_SYMBOLS:
+        color = move[1] if len(move) > 1 and move[1] in WILD_COLORS else WILD_COLORS[0]
+        return _WILD_ACTIONS[card.symbol, color]
+    return _IDS[card]
+
+
+def decode_action(action: int) -> Move:
+    """
+    :param action: an action id
+    :return: the move to pass to the rule
+    """
+    if action == DRAW_ACTION:
+        return (None,)
+    if action >= N_CARDS:
+        symbol, color = WILD_MOVES[action - N_CARDS]
+        return Card('wild', symbol), color
+    return (CARD_INDEX.cards[action],)
+
+
+class ObservationEncoder:
+    """
+    Encodes requests into `observations` and `masks`, buffers of `capacity` rows allocated once.
+    `encode_batch` returns views of the first rows, valid until the next call: copy them to keep them.
+    """
+    n_players: int
+    capacity: int
+    n_features: int
+    observations: np.ndarray  # (capacity, n_features) float32
+    masks: np.ndarray  # (capacity, N_ACTIONS) bool, legal actions
+
+    # feature offsets
+    hand: int
+    top_card: int
+    hand_sizes: int
+    skip: int
+    draws: int
+    reversed: int
+
+    def __init__(self, n_players: int, capacity: int = 1, observations: np.ndarray | None = None,
+                 masks: np.ndarray | None = None):
+        """
+        :param n_players:
+        :param capacity: rows of the buffers
+        :param observations: C-contiguous (capacity, n_features) float32 array to write into instead of allocating
+            one, e.g. in shared memory
+        :param masks: C-contiguous (capacity, N_ACTIONS) bool array, likewise
+        """
+        self.n_players = n_players
+        self.capacity = capacity
+        self.hand = 0
+        self.top_card = self.hand + N_CARDS
+        self.hand_sizes = self.top_card + N_CARDS
+        self.skip = self.hand_sizes + n_players - 1
+        self.draws = self.skip + 1
+        self.reversed = self.draws + 1
+        self.n_features = self.reversed + 1
+        if observations is None:
+            observations = np.zeros((capacity, self.n_features), dtype=np.float32)
+        if masks is None:
+            masks = np.zeros((capacity, N_ACTIONS), dtype=bool)
+        for array, shape, dtype in ((observations, (capacity, self.n_features), np.float32),
+                                    (masks, (capacity, N_ACTIONS), np.bool_)):
+            if array.shape != shape or array.dtype != dtype or not array.flags.c_contiguous:
+                raise ValueError(f'Need a C-contiguous {np.dtype(dtype)} buffer of shape {shape}')
+        self.observations = observations
+        self.masks = masks
+        self._flat_observations = self.observations.reshape(-1)
+        self._flat_masks = self.masks.reshape(-1)
+
+    def encode(self, request: Request, seat: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        :param request:
+        :param seat: seat of the player the request is for
+        :return: observation and legal action mask, views into the buffers
+        """
+        observations, masks = self.encode_batch((request,), (seat,))
+        return observations[0], masks[0]
+
+    def encode_batch(self, requests: Sequence[Request], seats: Sequence[int]) -> tuple[np.ndarray, np.ndarray]:
+        """
+        encode the requests of many tables at once. Indices of the features to set are gathered in two lists,
+        then written with one NumPy call per buffer
+        :param requests: at most `capacity`
+        :param seats: seat of the player each request is for
+        :return: (len(requests), n_features) observations and (len(requests), N_ACTIONS) masks, views into the
+            buffers
+        """
+        batch = len(requests)
+        if batch > self.capacity:
+            raise ValueError(f'Batch of {batch} requests over the capacity of {self.capacity}')
+        observations, masks = self.observations[:batch], self.masks[:batch]
+        observations.fill(0)
+        masks.fill(False)
+
+        ids, actions_of_card = _IDS, _ACTIONS_OF_CARD
+        n_features, n_players = self.n_features, self.n_players
+        counted: list[int] = []  # flat feature indices to increment, once per occurrence
+        positions: list[int] = []  # flat feature indices to set to the value at the same position in `values`
+        values: list[float] = []
+        legal: list[int] = []  # flat mask indices
+        for row, (request, seat) in enumerate(zip(requests, seats)):
+            offset = row * n_features
+            hand_offset = offset + self.hand
+            counted.extend([hand_offset + ids[card] for card in request.hand])
+            if request.top_card is not None:
+                positions.append(offset + self.top_card + ids[request.top_card])
+                values.append(1.0)
+            sizes = request.hand_sizes
+            size_offset = offset + self.hand_sizes
+            for rank in range(1, n_players):
+                positions.append(size_offset + rank - 1)
+                values.append(sizes[(seat + rank) % n_players])
+            effects = request.effects
+            if effects:
+                positions.extend((offset + self.skip, offset + self.draws, offset + self.reversed))
+                values.extend((1.0 if effects & SKIP_PENDING else 0.0, pending_draws(effects),
+                               1.0 if effects & REVERSED else 0.0))
+
+            mask_offset = row * N_ACTIONS
+            playable = request.hand if request.legal_moves is None else request.legal_moves
+            for card in playable:
+                legal.extend([mask_offset + action for action in actions_of_card[ids[card]]])
+            legal.append(mask_offset + DRAW_ACTION)
+
+        flat = self._flat_observations
+        np.add.at(flat, counted, 1.0)
+        flat[positions] = values
+        self._flat_masks[legal] = True
+        return observations, masks
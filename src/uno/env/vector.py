@@ -0,0 +1,294 @@
+"""
+Vectorized environment: one learner seat at each of N tables of the standard rule, tables sharded across worker
+processes. Observations, action masks, actions, rewards and done flags live in `multiprocessing.shared_memory`
+buffers, the pipes to the workers only carry short commands.
+
+An episode is a round. The learner gets 1 if it goes out first, -1 if another player does, and 0 if the round is
+cut after `max_turns` steps. Finished rounds are reset in place: the rule's `step` scores the round and deals the
+next one with `init_round`, and `init_game` starts a new game once the current one is over.
+Requires NumPy.
+"""
+import multiprocessing
+from collections.abc import Callable
+from dataclasses import dataclass
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from ..engine.context import Context
+from ..engine.game import Game
+from ..engine.player import DrawPlayer, Player, RandomPlayer
+from ..engine.rng import derive_seed
+from ..engine.rule import Rule
+from ..rules import base
+from .encoding import DRAW_ACTION, N_ACTIONS, ObservationEncoder, decode_action
+
+type OpponentFactory = Callable[[str, Context], Player]
+
+MAX_TURNS: int = 1000  # steps before a round is cut, some opponents can stall a round forever
+
+
+def random_opponent(name: str, context: Context) -> Player:
+    return RandomPlayer(name)
+
+
+@dataclass(slots=True)
+class EnvConfig:
+    """
+    What a worker needs to build its tables, sent once when it starts
+    """
+    n_tables: int
+    n_players: int
+    seat: int  # seat of the learner
+    opponent: OpponentFactory
+    seed: int
+    rule: Rule
+    max_turns: int
+    buffers: dict[str, str]  # buffer name -> shared memory block name
+
+
+def _buffer_specs(n_tables: int, n_features: int) -> dict[str, tuple[tuple[int, ...], type]]:
+    return {
+        'observations': ((n_tables, n_features), np.float32),
+        'masks': ((n_tables, N_ACTIONS), np.bool_),
+        'actions': ((n_tables,), np.int32),
+        'rewards': ((n_tables,), np.float32),
+        'dones': ((n_tables,), np.bool_),
+    }
+
+
+def _attach(config: EnvConfig, n_features: int) -> tuple[dict[str, SharedMemory], dict[str, np.ndarray]]:
+    blocks, arrays = {}, {}
+    for name, (shape, dtype) in _buffer_specs(config.n_tables, n_features).items():
+        blocks[name] = SharedMemory(config.buffers[name])
+        arrays[name] = np.ndarray(shape, dtype=dtype, buffer=blocks[name].buf)
+    return blocks, arrays
+
+
+class _Shard:
+    """
+    The tables of one worker, rows `start:stop` of the buffers
+    """
+    config: EnvConfig
+    start: int
+    stop: int
+    games: list[Game]
+    episodes: list[int]  # games started per table, to derive the seed of the next one
+
+    def __init__(self, config: EnvConfig, start: int, stop: int, arrays: dict[str, np.ndarray]):
+        self.config = config
+        self.start, self.stop = start, stop
+        self.arrays = {name: array[start:stop] for name, array in arrays.items()}
+        self.encoder = ObservationEncoder(config.n_players, stop - start, self.arrays['observations'],
+                                          self.arrays['masks'])
+        self.games = []
+        self.episodes = [0] * (stop - start)
+
+    def _new_game(self, row: int) -> Game:
+        config = self.config
+        seed = derive_seed(config.seed, self.start + row, self.episodes[row])
+        game = Game(config.rule, config.n_players, seed=seed, history_window=1)
+        game.players = [DrawPlayer(str(seat)) if seat == config.seat else config.opponent(str(seat), game.context)
+                        for seat in range(config.n_players)]  # the learner's seat is played from the actions
+        self.episodes[row] += 1
+        game.begin()
+        return game
+
+    def _advance(self, game: Game):
+        """
+        let the opponents play until it is the learner's turn or the round is over
+        """
+        ctx, seat = game.context, self.config.seat
+        while not base.round_is_over(ctx.current_round) and ctx.current_round.turns < self.config.max_turns:
+            idx = ctx.current_round.current_player
+            if idx == seat:
+                return
+            game.apply(idx, game.players[idx].play(game.build_request(idx)))
+
+    def _next_round(self, game: Game, scored: bool):
+        ctx, rule = game.context, game.rule
+        if scored:
+            rule.step(ctx, (None,))  # scores the round and deals the next one
+        else:
+            base.init_round(ctx)
+        if rule.is_over(ctx):
+            rule.init_game(ctx)
+
+    def _encode(self):
+        seat = self.config.seat
+        self.encoder.encode_batch([game.build_request(seat) for game in self.games], [seat] * len(self.games))
+
+    def reset(self):
+        for game in self.games:
+            game.end()
+        self.games = [self._new_game(row) for row in range(self.stop - self.start)]
+        for game in self.games:
+            self._advance(game)
+        self.arrays['rewards'].fill(0)
+        self.arrays['dones'].fill(False)
+        self._encode()
+
+    def step(self):
+        seat, max_turns = self.config.seat, self.config.max_turns
+        actions, masks = self.arrays['actions'], self.arrays['masks']
+        rewards, dones = self.arrays['rewards'], self.arrays['dones']
+        for row, game in enumerate(self.games):
+            action = int(actions[row])
+            legal = 0 <= action < N_ACTIONS and masks[row, action]
+            game.apply(seat, decode_action(action if legal else DRAW_ACTION))  # invalid actions draw
+            self._advance(game)
+            round_ = game.context.current_round
+            winner = next((idx for idx, hand in enumerate(round_.hands) if len(hand) == 0), None)
+            if winner is None and round_.turns < max_turns:
+                rewards[row], dones[row] = 0.0, False
+                continue
+            rewards[row] = 0.0 if winner is None else 1.0 if winner == seat else -1.0
+            dones[row] = True
+            self._next_round(game, winner is not None)
+            self._advance(game)
+        self._encode()
+
+    def close(self):
+        for game in self.games:
+            game.end()
+            for player in game.players:
+                if hasattr(player, 'close'):
+                    player.close()
+
+
+def _worker(conn: Connection, config: EnvConfig, n_features: int, start: int, stop: int):
+    blocks, arrays = _attach(config, n_features)
+    shard = _Shard(config, start, stop, arrays)
+    try:
+        while True:
+            command = conn.recv()
+            if command == 'close':
+                break
+            try:
+                getattr(shard, command)()
+            except Exception as e:
+                conn.send(f'{type(e).__name__}: {e}')
+            else:
+                conn.send(None)
+    finally:
+        shard.close()
+        del shard, arrays
+        for block in blocks.values():
+            block.close()
+        conn.close()
+
+
+class VectorEnv:
+    """
+    Gym-style vectorized environment over `n_tables` tables. `reset` and `step` return views of the shared
+    buffers, valid until the next call: copy them to keep them.
+
+    :param opponent: factory called with the seat name and the game's context, built inside the workers.
+        Must be picklable (module-level callables, `functools.partial`, `uno.sim.tournament.entrant(...)`)
+    """
+    n_tables: int
+    n_players: int
+    n_features: int
+    observations: np.ndarray  # (n_tables, n_features) float32, see `ObservationEncoder`
+    masks: np.ndarray  # (n_tables, N_ACTIONS) bool
+    actions: np.ndarray  # (n_tables,) int32
+    rewards: np.ndarray  # (n_tables,) float32
+    dones: np.ndarray  # (n_tables,) bool
+
+    def __init__(self, n_tables: int, n_players: int = 2, opponent: OpponentFactory = random_opponent,
+                 workers: int = 1, seed: int = 0, seat: int = 0, rule: Rule = base.rule, max_turns: int = MAX_TURNS):
+        """
+        :param n_tables:
+        :param n_players:
+        :param opponent:
+        :param workers: worker processes, tables are split evenly between them
+        :param seed: seeds of every game are derived from it, the table and the game count
+        :param seat: seat of the learner at every table
+        :param rule: the standard rule or a variant of it
+        :param max_turns: steps before a round is cut
+        """
+        if not 0 <= seat < n_players:
+            raise ValueError(f'Seat {seat} is not at a table of {n_players}')
+        workers = max(1, min(workers, n_tables))
+        self.n_tables = n_tables
+        self.n_players = n_players
+        self.n_features = ObservationEncoder(n_players, 0).n_features
+        self._blocks: dict[str, SharedMemory] = {}
+        for name, (shape, dtype) in _buffer_specs(n_tables, self.n_features).items():
+            size = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+            self._blocks[name] = SharedMemory(create=True, size=size)
+            setattr(self, name, np.ndarray(shape, dtype=dtype, buffer=self._blocks[name].buf))
+        config = EnvConfig(n_tables, n_players, seat, opponent, seed, rule, max_turns,
+                           {name: block.name for name, block in self._blocks.items()})
+
+        self._conns: list[Connection] = []
+        self._processes: list[multiprocessing.Process] = []
+        bounds = [n_tables * idx // workers for idx in range(workers + 1)]
+        for start, stop in zip(bounds, bounds[1:]):
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_worker, args=(child, config, self.n_features, start, stop),
+                                              daemon=True)
+            process.start()
+            child.close()
+            self._conns.append(parent)
+            self._processes.append(process)
+
+    def _command(self, command: str):
+        for conn in self._conns:
+            conn.send(command)
+        errors = [error for conn in self._conns if (error := conn.recv()) is not None]
+        if errors:
+            raise RuntimeError(f'Worker failed on {command}: {errors[0]}')
+
+    def reset(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        start a new game at every table
+        :return: observations, legal action masks
+        """
+        self._command('reset')
+        return self.observations, self.masks
+
+    def step(self, actions) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        play the learner's action at every table, then the opponents' moves until the learner's next turn.
+        Actions outside the mask draw. Tables whose round ended are reset, their observation is the first one of
+        the next round
+        :param actions: (n_tables,) action ids
+        :return: observations, legal action masks, rewards, done flags
+        """
+        self.actions[:] = actions
+        self._command('step')
+        return self.observations, self.masks, self.rewards, self.dones
+
+    def close(self):
+        if not getattr(self, '_processes', None):
+            return
+        for conn in self._conns:
+            try:
+                conn.send('close')
+            except OSError:
+                pass
+        for process in self._processes:
+            process.join(5)
+            if process.is_alive():
+                process.terminate()
+        for conn in self._conns:
+            conn.close()
+        self._processes.clear()
+        self._conns.clear()
+        for name in self._blocks:
+            setattr(self, name, None)
+        for block in self._blocks.values():
+            block.close()
+            block.unlink()
+        self._blocks.clear()
+
+    def __enter__(self) -> 'VectorEnv':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __del__(self):
+        self.close()
@@ -0,0 +1,178 @@
+"""
+Compact binary game records.
+
+A record file starts with `MAGIC` and a version byte, followed by game records:
+a `GAME_HEADER` (seed, player count, flags, move count) and two bytes per move, the card id in `base.CARD_INDEX`
+(`NO_CARD` to draw) and the color index in `base.COLORS` (`NO_COLOR` if none).
+Moves are stored as passed to `step`, so any state of a game can be rebuilt from its seed.
+"""
+import mmap
+import struct
+from collections.abc import Iterator, Sequence
+from os import PathLike
+from typing import BinaryIO, NamedTuple
+
+from .engine.context import Context, LAZY_SHUFFLE, ROUND_STREAMS
+from .engine.events import Sink
+from .engine.player import Move
+from .engine.rule import Rule
+from .rules import base
+
+MAGIC: bytes = b'UNOR'
+VERSION: int = 1
+FILE_HEADER: struct.Struct = struct.Struct('<4sB3x')
+GAME_HEADER: struct.Struct = struct.Struct('<qBBI')  # seed, player count, flags, move count
+NO_CARD: int = 0xFF
+NO_COLOR: int = 0xFF
+
+_COLOR_IDS: dict[str, int] = {color: idx for idx, color in enumerate(base.COLORS)}
+_CARDS: tuple = base.CARD_INDEX.cards + (None,) * (256 - len(base.CARD_INDEX))
+_COLORS: tuple = base.COLORS + (None,) * (256 - len(base.COLORS))
+
+
+def encode_move(move: Move) -> bytes:
+    """
+    :param move: (card or None, optional color)
+    :return: the two bytes of the move. Raises ValueError if the card is not in the id space
+    """
+    card = move[0]
+    try:
+        card_id = NO_CARD if card is None else base.CARD_INDEX.encode(card)
+    except KeyError:
+        raise ValueError(f'Cannot record card {card!r}') from None
+    color = _COLOR_IDS.get(move[1], NO_COLOR) if len(move) > 1 else NO_COLOR
+    return bytes((card_id, color))
+
+
+def decode_moves(data: bytes | memoryview) -> Iterator[Move]:
+    for card_id, color in zip(data[0::2], data[1::2]):
+        card = _CARDS[card_id]
+        yield (card,) if color == NO_COLOR else (card, _COLORS[color])
+
+
+class GameRecord(NamedTuple):
+    seed: int
+    n_players: int
+    flags: int
+    data: bytes | memoryview  # encoded moves
+
+    def __len__(self) -> int:
+        return len(self.data) // 2
+
+    def moves(self) -> Iterator[Move]:
+        return decode_moves(self.data)
+
+
+class RecordWriter:
+    """
+    Append-only writer. Moves of the current game are buffered and the game is written when it ends.
+    Can be passed to `Game(recorder=...)`.
+    """
+    _file: BinaryIO
+    _moves: bytearray
+    _header: tuple[int, int, int] | None
+
+    def __init__(self, path: str | PathLike):
+        self._file = open(path, 'ab')
+        if self._file.tell() == 0:
+            self._file.write(FILE_HEADER.pack(MAGIC, VERSION))
+        self._moves = bytearray()
+        self._header = None
+
+    def begin(self, seed: int | None, n_players: int, flags: int = 0):
+        """
+        start recording a game
+        :param seed: seed of the game's context, required to replay it
+        :param n_players:
+        :param flags: `Context.flags` of the game
+        :return:
+        """
+        if seed is None:
+            raise ValueError('Only seeded games can be recorded')
+        if not isinstance(seed, int) or not -2 ** 63 <= seed < 2 ** 63:
+            raise ValueError(f'Seed {seed!r} does not fit a signed 64-bit record field')
+        self._header = (seed, n_players, flags)
+        self._moves.clear()
+
+    def append(self, move: Move):
+        self._moves += encode_move(move)
+
+    def end(self):
+        """
+        write the game to the file
+        """
+        if self._header is None:
+            return
+        self._file.write(GAME_HEADER.pack(*self._header, len(self._moves) // 2))
+        self._file.write(self._moves)
+        self._header = None
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self) -> 'RecordWriter':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class RecordReader:
+    """
+    Iterate the games of a record file through a memory map, without loading the file.
+    The moves of yielded records are views into the map, drop them before `close`.
+    """
+    _file: BinaryIO
+    _map: mmap.mmap | None
+
+    def __init__(self, path: str | PathLike):
+        self._file = open(path, 'rb')
+        size = self._file.seek(0, 2)
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        if self._map is None or size < FILE_HEADER.size:
+            raise ValueError('Not a game record file')
+        magic, version = FILE_HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'Unsupported record file {magic!r} version {version}')
+
+    def __iter__(self) -> Iterator[GameRecord]:
+        view = memoryview(self._map)
+        offset, size = FILE_HEADER.size, len(view)
+        while offset < size:
+            seed, n_players, flags, n_moves = GAME_HEADER.unpack_from(view, offset)
+            offset += GAME_HEADER.size
+            yield GameRecord(seed, n_players, flags, view[offset:offset + 2 * n_moves])
+            offset += 2 * n_moves
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> 'RecordReader':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def replay(record: GameRecord, upto: int | None = None, rule: Rule = base.rule,
+           sinks: Sequence[Sink] = ()) -> Context:
+    """
+    rebuild the context of a recorded game by re-running the rule from its seed
+    :param record:
+    :param upto: number of moves to replay, None for all
+    :param rule: rule the game was played with
+    :param sinks: receive the game events emitted while replaying
+    :return: the context after the moves
+    """
+    ctx = Context(record.n_players, seed=record.seed, round_streams=bool(record.flags & ROUND_STREAMS),
+                  lazy_shuffle=bool(record.flags & LAZY_SHUFFLE))
+    for sink in sinks:
+        ctx.events.subscribe(sink)
+    rule.init_game(ctx)
+    step = rule.step
+    data = record.data if upto is None else record.data[:2 * upto]
+    for move in decode_moves(data):
+        step(ctx, move)
+    return ctx
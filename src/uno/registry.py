@@ -0,0 +1,111 @@
+"""
+Rules and players by name, imported only when selected.
+
+Packages register `Rule`s in the `uno.rules` entry point group and player factories, called with the seat name and
+the game's context like tournament entrants, in `uno.players`:
+
+    [project.entry-points."uno.players"]
+    mybot = "mypackage.bots:make_bot"
+
+Built-in names are resolved without reading the installed packages' metadata, which takes longer to import than
+the whole engine.
+"""
+from collections.abc import Callable
+from importlib import import_module
+from typing import Any
+
+from .engine.context import Context
+from .engine.player import Player
+from .engine.rule import Rule
+
+type PlayerFactory = Callable[[str, Context], Player]
+
+RULE_GROUP: str = 'uno.rules'
+PLAYER_GROUP: str = 'uno.players'
+
+# name -> 'module:attribute', also declared as entry points of this package
+BUILTIN_RULES: dict[str, str] = {
+    'standard': 'uno.rules.base:rule',
+    'stacking': 'uno.rules.base:stacking_rule',
+}
+BUILTIN_PLAYERS: dict[str, str] = {
+    'random': 'uno.engine.player:random_player',
+    'draw': 'uno.engine.player:draw_player',
+    'ismcts': 'uno.bots.ismcts:ISMCTSPlayer',
+    'endgame': 'uno.bots.endgame:endgame_player',
+}
+# built-in players that only play some rules, the search bots simulate with the standard one
+BUILTIN_PLAYER_RULES: dict[str, tuple[str, ...]] = {
+    'ismcts': ('standard',),
+    'endgame': ('standard',),
+}
+
+_BUILTINS: dict[str, dict[str, str]] = {RULE_GROUP: BUILTIN_RULES, PLAYER_GROUP: BUILTIN_PLAYERS}
+
+
+def _plugins(group: str) -> dict[str, Any]:
+    from importlib.metadata import entry_points  # slow to import, only needed for names that are not built in
+    return {entry_point.name: entry_point for entry_point in entry_points(group=group)}
+
+
+def _import(target: str) -> Any:
+    module, _, attribute = target.partition(':')
+    value = import_module(module)
+    for part in attribute.split('.'):
+        value = getattr(value, part)
+    return value
+
+
+def names(group: str) -> list[str]:
+    """
+    :param group: `RULE_GROUP` or `PLAYER_GROUP`
+    :return: names available in the group, built-in and installed, without importing any of them
+    """
+    return sorted(_BUILTINS[group].keys() | _plugins(group).keys())
+
+
+def load(group: str, name: str) -> Any:
+    """
+    import what is registered under the name
+    :param group: `RULE_GROUP` or `PLAYER_GROUP`
+    :param name:
+    :return:
+    """
+    target = _BUILTINS[group].get(name)
+    if target is not None:
+        return _import(target)
+    entry_point = _plugins(group).get(name)
+    if entry_point is None:
+        raise ValueError(f'Unknown name {name!r} in {group}, choose from {", ".join(names(group))}')
+    return entry_point.load()
+
+
+def load_rule(name: str) -> Rule:
+    rule = load(RULE_GROUP, name)
+    if not isinstance(rule, Rule):
+        raise TypeError(f'{RULE_GROUP} entry {name!r} is not a Rule')
+    return rule
+
+
+def supports(player: str, rule: str) -> bool:
+    """
+    :param player: registered player name
+    :param rule: registered rule name
+    :return: False if the player is known to play another rule than the one selected, without importing either
+    """
+    rules = BUILTIN_PLAYER_RULES.get(player)
+    return rules is None or rule in rules
+
+
+def load_player(name: str, rule: str | None = None) -> PlayerFactory:
+    """
+    :param name:
+    :param rule: name of the rule the player will play, to refuse players that cannot play it
+    :return:
+    """
+    if rule is not None and not supports(name, rule):
+        raise ValueError(f'Player {name!r} cannot play the {rule!r} rule, it supports {", ".join(BUILTIN_PLAYER_RULES[name])}')
+    factory = load(PLAYER_GROUP, name)
+    if not callable(factory):
+        raise TypeError(f'{PLAYER_GROUP} entry {name!r} is not callable')
+    return factory
@@ -3,16 +3,22 @@ Standard UNO rule, based on instruction sheet of 2008 version of the game
 The first player to reach 500 points wins
 """
 import random
-from functools import cache
+from functools import cache, partial
 
 from ..engine.rule import Rule
 from ..engine.context import Context, Round, Card
+from ..engine.events import (ROUND_STARTED, CARD_PLAYED, CARD_DRAWN, EFFECT_APPLIED, DECK_REPLENISHED,
+                             ROUND_SCORED)
+from ..engine.hand import CardIndex, CompactHand
+from .effects import KINDS, NORMAL_DRAW, REVERSED, STACKING_DRAW_2, STANDARD, EffectTable, effect_name
 
 COLORS: tuple[str, ...] = ('red', 'blue', 'green', 'yellow', 'wild')
 SYMBOLS: tuple[int, ...] = tuple(range(8))
 ACTIONS: tuple[str, ...] = ('draw_2', 'reverse', 'skip', 'wild', 'wild_draw_4')
 ACTION_VALUES: dict[str, int] = {'draw_2': 20, 'reverse': 20, 'skip': 20, 'wild': 50, 'wild_draw_4': 50}
+CARD_VALUES: dict[int | str, int] = {**{symbol: symbol for symbol in range(10)}, **ACTION_VALUES}  # symbol -> points
 HAND_SIZE: int = 7
+CARD_INDEX: CardIndex = CardIndex(COLORS, SYMBOLS + ACTIONS)  # covers recolored wild cards as well
 
 
 def build_deck() -> list[Card]:
@@ -31,37 +37,151 @@ def build_deck() -> list[Card]:
     )
 
 
+DECK_TEMPLATE: tuple[Card, ...] = tuple(build_deck())  # cards are immutable, rounds copy this instead of rebuilding
+
+
+def deal(ctx: Context, draw: list[Card], hands: list | None = None) -> list:
+    """
+    deal `HAND_SIZE` cards to each player from the top of the pile, one at a time round the table,
+    by slicing the pile instead of popping card by card
+    :param ctx:
+    :param draw: shuffled pile, the dealt cards are removed from it
+    :param hands: empty hands to deal into, new ones are made if None
+    :return: the hands
+    """
+    n = ctx.player_count
+    dealt = HAND_SIZE * n
+    top = len(draw) - 1
+    stop = top - dealt if top >= dealt else None
+    cards = [draw[top - idx:stop:-n] for idx in range(n)]
+    del draw[top + 1 - dealt:]
+    if hands is not None:
+        for hand, hand_cards in zip(hands, cards):
+            hand.extend(hand_cards)
+        return hands
+    if ctx.compact_hands:
+        return [CompactHand(CARD_INDEX, hand) for hand in cards]
+    return cards
+
+
 def init_round(ctx: Context):
     """
     initialize a new round
     :param ctx:
     :return:
     """
+    if HAND_SIZE * ctx.player_count >= len(DECK_TEMPLATE):
+        raise ValueError(f'A deck of {len(DECK_TEMPLATE)} cards cannot be dealt to {ctx.player_count} players')
     ctx.rounds += 1
+    if ctx.round_streams:  # rounds can be replayed from their own stream
+        ctx.rng = ctx.streams.round(ctx.rounds).random()
+    if ctx.lazy_shuffle:
+        init_round_lazy(ctx)
+        return
 
     # collect cards
-    draw = build_deck()
+    round_ = new_round(ctx)
+    draw = round_.draw
     shuffle(ctx, draw)
 
     # deal cards to players
-    hands = [[] for _ in range(ctx.player_count)]
-    for _ in range(HAND_SIZE):
-        for idx in range(ctx.player_count):
-            hands[idx].append(draw.pop())
+    round_.hands = deal(ctx, draw, round_.hands or None)
 
     # discard pile
     while draw[0].color == 'wild':
         shuffle(ctx, draw)
 
-    discard = [draw.pop(0)]
+    round_.discard.append(draw.pop(0))
 
     # finish building
-    ctx.current_round = Round(
-        draw= draw,
-        discard = discard,
-        hands = hands,
-    )
-    ctx.current_round.last_card = discard[-1]
+    ctx.current_round = round_
+    round_.last_card = round_.discard[-1]
+    value_hands(round_)
+    if ctx.events.mask & ROUND_STARTED:
+        ctx.events.emit(ROUND_STARTED, ctx.rounds, -1, round_.last_card)
+
+
+def new_round(ctx: Context) -> Round:
+    """
+    an empty round with the whole deck as its draw pile, in order: the current round reset in place if the
+    context reuses rounds and it has the hands of this game, else a new round without hands
+    :param ctx:
+    :return:
+    """
+    round_ = ctx.current_round
+    if ctx.reuse_rounds and round_ is not None and len(round_.hands) == ctx.player_count \
+            and all(isinstance(hand, CompactHand) == ctx.compact_hands for hand in round_.hands):
+        round_.reset(DECK_TEMPLATE)
+        return round_
+    return Round(draw=list(DECK_TEMPLATE))
+
+
+def init_round_lazy(ctx: Context):
+    """
+    initialize a new round without shuffling the deck up front: the pile is shuffled one card at a time as cards
+    are drawn, and the starting card is picked uniformly among the non-wild cards left.
+    Deals have the same distribution as `init_round`, but not the same rng sequence
+    :param ctx:
+    :return:
+    """
+    round_ = new_round(ctx)
+    if not round_.hands:
+        round_.hands = [CompactHand(CARD_INDEX) for _ in range(ctx.player_count)] if ctx.compact_hands else \
+            [[] for _ in range(ctx.player_count)]
+    draw, hands = round_.draw, round_.hands
+    round_.unshuffled = len(draw)
+    for _ in range(HAND_SIZE):
+        for idx in range(ctx.player_count):
+            hands[idx].append(take_top(ctx, round_))
+
+    # O(1) expected: wild cards are few, draw random positions until one is not wild
+    randrange = ctx.rng.randrange
+    pos = randrange(len(draw))
+    while draw[pos].color == 'wild':
+        pos = randrange(len(draw))
+    draw[pos], draw[-1] = draw[-1], draw[pos]
+    round_.discard.append(draw.pop())
+    round_.unshuffled = len(draw)
+
+    ctx.current_round = round_
+    round_.last_card = round_.discard[-1]
+    value_hands(round_)
+    if ctx.events.mask & ROUND_STARTED:
+        ctx.events.emit(ROUND_STARTED, ctx.rounds, -1, round_.last_card)
+
+
+def take_top(ctx: Context, round_: Round) -> Card:
+    """
+    take the top card of a non-empty draw pile. If the top card is not settled yet, it is picked at random among
+    the unshuffled cards first, a single step of Fisher-Yates
+    :param ctx:
+    :param round_:
+    :return: the card
+    """
+    draw = round_.draw
+    if round_.unshuffled >= len(draw):
+        pos = ctx.rng.randrange(len(draw))
+        draw[pos], draw[-1] = draw[-1], draw[pos]
+        round_.unshuffled = len(draw) - 1
+    return draw.pop()
+
+
+def hand_value(hand) -> int:
+    """
+    :param hand: list of cards or `CompactHand`
+    :return: points the hand is worth to the winner of the round
+    """
+    return sum(CARD_VALUES[card.symbol] for card in hand)
+
+
+def value_hands(round_: Round):
+    """
+    compute the value of every hand from scratch. Rules keep them up to date on every draw and play afterwards,
+    code replacing hands outside the rule calls it again
+    :param round_:
+    :return:
+    """
+    round_.hand_points = [hand_value(hand) for hand in round_.hands]
 
 
 def round_is_over(round_: Round) -> bool:
@@ -119,7 +239,12 @@ def replenish_draw(ctx: Context):
     last_card = round_.draw.pop()  # the top card is left in the discard
     round_.discard = [last_card]
 
-    shuffle(ctx, round_.draw)
+    if ctx.lazy_shuffle:  # cards are shuffled as they are drawn, often only a few before the round ends
+        round_.unshuffled = len(round_.draw)
+    else:
+        shuffle(ctx, round_.draw)
+    if ctx.events.mask & DECK_REPLENISHED:
+        ctx.events.emit(DECK_REPLENISHED, ctx.rounds, -1, len(round_.draw))
 
 
 def draw_card(ctx: Context, player: int) -> Card | None:
@@ -135,36 +260,76 @@ def draw_card(ctx: Context, player: int) -> Card | None:
     if len(round_.draw) == 0:  # no card left in either deck or discard
         return None
 
-    card = round_.draw.pop()
+    card = take_top(ctx, round_) if round_.unshuffled else round_.draw.pop()
     round_.hands[player].append(card)
+    round_.hand_points[player] += CARD_VALUES[card.symbol]
+    if ctx.events.mask & CARD_DRAWN:
+        ctx.events.emit(CARD_DRAWN, ctx.rounds, player, card)
     return card
 
 
-def is_playable(ctx: Context, card: Card) -> bool:
+def is_blocked(round_: Round, table: EffectTable = STANDARD) -> bool:
+    """
+    check if an effect prevents playing any card (must draw/resolve effect)
+    :param round_:
+    :param table: effect transitions of the rule variant
+    :return: True if no card can be played
+    """
+    return table.blocked[round_.effects]
+
+
+def matches(card: Card, last_card: Card) -> bool:
+    """
+    check if the card can go on top of the last card, ignoring effects
+    :param card:
+    :param last_card:
+    :return: True if the card matches
+    """
+    # Wild cards are always playable, otherwise match color or symbol
+    return card.color == 'wild' or card.color == last_card.color or card.symbol == last_card.symbol
+
+
+def is_playable(ctx: Context, card: Card, table: EffectTable = STANDARD) -> bool:
     """
     check if the card can be played
     :param ctx:
     :param card: the card to check
+    :param table: effect transitions of the rule variant
     :return: True if the card can be played
     """
     round_ = ctx.current_round
-    # If there are blocking effects, no card is playable (must draw/resolve effect)
-    blocking_effects = {'skip', 'draw_2', 'wild_draw_4'}
-    if any(eff in round_.active_effects for eff in blocking_effects):
-        return False
+    return table.play[round_.effects][KINDS[card.symbol]] >= 0 and matches(card, round_.last_card)
+
 
+def legal_moves(ctx: Context, player: int, table: EffectTable = STANDARD) -> list[Card]:
+    """
+    list the cards the player can play now. Compact hands are looked up by color and symbol buckets,
+    other hands are scanned once
+    :param ctx:
+    :param player: index of the player
+    :param table: effect transitions of the rule variant
+    :return: playable cards, in hand order for list hands
+    """
+    round_ = ctx.current_round
+    state = round_.effects
+    if table.blocked[state]:
+        return []
+    hand = round_.hands[player]
     last_card = round_.last_card
-    # Wild cards are always playable
-    if card.color == 'wild':
-        return True
-    # Otherwise match color or symbol
-    return card.color == last_card.color or card.symbol == last_card.symbol
+    if isinstance(hand, CompactHand):
+        legal = hand.matching(last_card.color, last_card.symbol, 'wild')
+    else:
+        legal = [card for card in hand if matches(card, last_card)]
+    if not table.any_kind[state]:
+        allowed = table.play[state]
+        legal = [card for card in legal if allowed[KINDS[card.symbol]] >= 0]
+    return legal
 
 
 def update_score(ctx: Context):
     """
     Calculate scores at the end of a round and update scoreboard.
-    Winner gets sum of values of cards in other players' hands.
+    Winner gets sum of values of cards in other players' hands, read from the hand values kept by the rule.
     """
     round_ = ctx.current_round
     if round_ is None:
@@ -175,24 +340,22 @@ def update_score(ctx: Context):
         if len(hand) == 0:
             winner_idx = idx
             break
-    
+
     if winner_idx != -1:
-        points = 0
-        for hand in round_.hands:
-            for card in hand:
-                if isinstance(card.symbol, int):
-                    points += card.symbol
-                elif str(card.symbol) in ACTION_VALUES:
-                    points += ACTION_VALUES[str(card.symbol)]
-        
+        if len(round_.hand_points) != len(round_.hands):  # round built outside the rule
+            value_hands(round_)
+        points = sum(round_.hand_points)
         ctx.scoreboard[winner_idx] += points
+        if ctx.events.mask & ROUND_SCORED:
+            ctx.events.emit(ROUND_SCORED, ctx.rounds, winner_idx, points, round_.turns)
 
 
-def step(ctx: Context, move: tuple):
+def step(ctx: Context, move: tuple, table: EffectTable = STANDARD):
     """
     main logic of the game. handle the last action and wait for the next one
     :param ctx:
     :param move: tuple where first element is Card or None (to draw), second is color (if wild)
+    :param table: effect transitions of the rule variant
     :return:
     """
     round_ = ctx.current_round
@@ -203,13 +366,13 @@ def step(ctx: Context, move: tuple):
         init_round(ctx)
         return move
 
-    effects = round_.active_effects
+    state = round_.effects
     
     card = move[0]
     color_chosen = move[1] if len(move) > 1 else None
 
     # Validate move
-    if card is not None and not is_playable(ctx, card):
+    if card is not None and not is_playable(ctx, card, table):
         # Invalid move, treat as draw/pass
         card = None
 
@@ -217,28 +380,24 @@ def step(ctx: Context, move: tuple):
     round_.turns += 1
 
     if card is None:  # player decided to not play (draw)
-        match effects:
-            case _ if 'skip' in effects:
-                effects.remove('skip')
-            case _ if 'draw_2' in effects:
-                for _ in range(2):
-                    _ = draw_card(ctx, round_.current_player)
-                effects.remove('draw_2')
-            case _ if 'wild_draw_4' in effects:
-                for _ in range(4):
-                    _ = draw_card(ctx, round_.current_player)
-                effects.remove('wild_draw_4')
-            case _:
-                # player decided to draw
-                # newly drawn card will be played if possible
-                new_card = draw_card(ctx, round_.current_player)
-                if new_card and is_playable(ctx, new_card):
-                    # Auto-play drawn card if playable
-                    # If it's wild, we default to 'red' since we can't ask player again in this flow
-                    # This is a limitation of the current synchronous engine
-                    card = new_card
-                    if card.color == 'wild':
-                        color_chosen = 'red' 
+        after, draws = table.draw[state]
+        if draws == NORMAL_DRAW:
+            # player decided to draw
+            # newly drawn card will be played if possible
+            new_card = draw_card(ctx, round_.current_player)
+            if new_card and is_playable(ctx, new_card, table):
+                # Auto-play drawn card if playable
+                # If it's wild, we default to 'red' since we can't ask player again in this flow
+                # This is a limitation of the current synchronous engine
+                card = new_card
+                if card.color == 'wild':
+                    color_chosen = 'red'
+        else:  # resolve the pending effect
+            if ctx.events.mask & EFFECT_APPLIED:
+                ctx.events.emit(EFFECT_APPLIED, ctx.rounds, round_.current_player, effect_name(state))
+            for _ in range(draws):
+                draw_card(ctx, round_.current_player)
+            state = after
 
     if card is not None:  # player decided to play a card (or auto-played)
         # Update last_card for playability checks
@@ -251,15 +410,16 @@ def step(ctx: Context, move: tuple):
             
         round_.discard.append(card)
         round_.hands[round_.current_player].remove(card)
-        
-        match card.symbol:  # update active effects
-            case 'reverse' if 'reverse' in effects:
-                effects.remove('reverse')
-            case symbol if symbol in ACTIONS:
-                effects.append(symbol)
+        round_.hand_points[round_.current_player] -= CARD_VALUES[card.symbol]
+        if ctx.events.mask & CARD_PLAYED:
+            ctx.events.emit(CARD_PLAYED, ctx.rounds, round_.current_player, card,
+                            color_chosen if card.color == 'wild' else None)
+
+        state = table.play[state][KINDS[card.symbol]]  # update active effects
+    round_.effects = state
 
     # update current player
-    if 'reverse' in effects:
+    if state & REVERSED:
         round_.current_player = (round_.current_player - 1) % ctx.player_count
     else:
         round_.current_player = (round_.current_player + 1) % ctx.player_count
@@ -270,4 +430,14 @@ def step(ctx: Context, move: tuple):
     return final_move
 
 
-rule: Rule = Rule(init_game, step, game_is_over)
\ No newline at end of file
+def make_rule(table: EffectTable) -> Rule:
+    """
+    build a variant of the standard rule with other effect transitions, e.g. `make_rule(effects.STACKING_DRAW_2)`
+    :param table:
+    :return:
+    """
+    return Rule(init_game, partial(step, table=table), game_is_over, partial(legal_moves, table=table))
+
+
+rule: Rule = Rule(init_game, step, game_is_over, legal_moves)
+stacking_rule: Rule = make_rule(STACKING_DRAW_2)  # draw 2 cards can be stacked on each other
@@ -0,0 +1,340 @@
+"""
+Lockstep engine advancing many games of the standard rule at once.
+State is kept as struct-of-arrays NumPy buffers, cards are ids of `base.CARD_INDEX`.
+
+Every game owns a `random.Random` seeded like `Context.rng`, used only for shuffling,
+so that a game stays bit-for-bit identical to `base.step` applied to a `Context` with the same seed and moves.
+Requires NumPy.
+"""
+import random
+
+import numpy as np
+
+from ..engine.context import Context, Round
+from ..engine.hand import CompactHand
+from .base import CARD_INDEX, CARD_VALUES, COLORS, HAND_SIZE, build_deck, value_hands
+from .effects import REVERSED, SKIP_PENDING, with_draws
+
+# effect flags
+SKIP: int = 1
+DRAW_2: int = 2
+WILD_DRAW_4: int = 4
+REVERSE: int = 8
+BLOCKING: int = SKIP | DRAW_2 | WILD_DRAW_4
+
+NO_CARD: int = -1
+N_CARDS: int = len(CARD_INDEX)
+DECK: np.ndarray = np.array([CARD_INDEX.encode(card) for card in build_deck()], dtype=np.int16)
+
+# per card id tables
+CARD_COLOR: np.ndarray = np.array([COLORS.index(card.color) for card in CARD_INDEX.cards], dtype=np.int8)
+CARD_SYMBOL: np.ndarray = np.array([CARD_INDEX.symbols.index(card.symbol) for card in CARD_INDEX.cards],
+                                   dtype=np.int8)
+CARD_IS_WILD: np.ndarray = np.array([card.color == 'wild' for card in CARD_INDEX.cards])
+CARD_VALUE: np.ndarray = np.array([CARD_VALUES[card.symbol] for card in CARD_INDEX.cards], dtype=np.int32)
+_EFFECT_OF_SYMBOL: dict[str, int] = {'skip': SKIP, 'draw_2': DRAW_2, 'wild_draw_4': WILD_DRAW_4, 'reverse': REVERSE}
+CARD_EFFECT: np.ndarray = np.array([_EFFECT_OF_SYMBOL.get(card.symbol, 0) for card in CARD_INDEX.cards],
+                                   dtype=np.uint8)
+# id of the card once a wild card took the chosen color, indexed by (card id, color index)
+RECOLORED: np.ndarray = np.array([
+    [CARD_INDEX.encode(card._replace(color=color)) for color in COLORS[:-1]]
+    for card in CARD_INDEX.cards
+], dtype=np.int16)
+
+
+def effect_state(flags: int) -> int:
+    """
+    convert effect flags of the batch engine to the effect state of `effects.STANDARD`
+    :param flags:
+    :return:
+    """
+    state = REVERSED if flags & REVERSE else 0
+    if flags & SKIP:
+        state |= SKIP_PENDING
+    draws = 2 if flags & DRAW_2 else 4 if flags & WILD_DRAW_4 else 0
+    return with_draws(state, draws)
+
+
+class BatchEngine:
+    """
+    N independent games of the standard rule with the same player count.
+    """
+    n_games: int
+    n_players: int
+    rngs: list[random.Random]
+
+    draw: np.ndarray  # (N, deck) stack of card ids, top at draw_len - 1
+    draw_len: np.ndarray
+    discard: np.ndarray  # (N, deck) stack of card ids
+    discard_len: np.ndarray
+    hands: np.ndarray  # (N, players, card ids) counts
+    hand_len: np.ndarray  # (N, players)
+    last_card: np.ndarray
+    current_player: np.ndarray
+    effects: np.ndarray  # effect flags
+    turns: np.ndarray
+    rounds: np.ndarray
+    scoreboard: np.ndarray  # (N, players)
+
+    def __init__(self, n_games: int, n_players: int, seeds: list[int | None] | None = None):
+        if not 2 <= n_players <= 10:
+            raise RuntimeError('Player count must be between 2 and 10')
+        if HAND_SIZE * n_players >= len(DECK):
+            raise ValueError(f'A deck of {len(DECK)} cards cannot be dealt to {n_players} players')
+        if seeds is None:
+            seeds = [None] * n_games
+        if len(seeds) != n_games:
+            raise ValueError('Need one seed per game')
+
+        self.n_games = n_games
+        self.n_players = n_players
+        self.rngs = [random.Random(seed) for seed in seeds]
+
+        n, deck = n_games, len(DECK)
+        self.draw = np.zeros((n, deck), dtype=np.int16)
+        self.draw_len = np.zeros(n, dtype=np.int32)
+        self.discard = np.zeros((n, deck), dtype=np.int16)
+        self.discard_len = np.zeros(n, dtype=np.int32)
+        self.hands = np.zeros((n, n_players, N_CARDS), dtype=np.uint8)
+        self.hand_len = np.zeros((n, n_players), dtype=np.int32)
+        self.last_card = np.zeros(n, dtype=np.int16)
+        self.current_player = np.zeros(n, dtype=np.int32)
+        self.effects = np.zeros(n, dtype=np.uint8)
+        self.turns = np.zeros(n, dtype=np.int32)
+        self.rounds = np.zeros(n, dtype=np.int32)
+        self.scoreboard = np.zeros((n, n_players), dtype=np.int32)
+
+        self.init_game(np.arange(n))
+
+    def init_game(self, games: np.ndarray):
+        """
+        vectorized `base.init_game` for the given games
+        :param games: indices of the games
+        :return:
+        """
+        self.scoreboard[games] = 0
+        self.rounds[games] = -1
+        self.init_round(games)
+
+    def init_round(self, games: np.ndarray):
+        """
+        vectorized `base.init_round` for the given games.
+        only the shuffles run per game, to consume each game's rng exactly like the reference rule
+        :param games: indices of the games
+        :return:
+        """
+        if len(games) == 0:
+            return
+        n_players, deck_size = self.n_players, len(DECK)
+        dealt = HAND_SIZE * n_players
+
+        decks = np.empty((len(games), deck_size), dtype=np.int16)
+        template = DECK.tolist()
+        for row, game in enumerate(games.tolist()):
+            rng = self.rngs[game]
+            deck = template[:]
+            rng.shuffle(deck)
+            rest = deck[:deck_size - dealt]
+            while CARD_IS_WILD[rest[0]]:
+                rng.shuffle(rest)
+            deck[:deck_size - dealt] = rest
+            decks[row] = deck
+
+        # cards are popped from the top of the deck, one per player in turn
+        positions = deck_size - 1 - (np.arange(HAND_SIZE)[:, None] * n_players + np.arange(n_players)[None, :])
+        cards = decks[:, positions]  # (games, HAND_SIZE, players)
+        self.hands[games] = 0
+        np.add.at(self.hands, (games[:, None, None], np.arange(n_players)[None, None, :], cards), 1)
+        self.hand_len[games] = HAND_SIZE
+
+        remaining = deck_size - dealt
+        self.discard[games, 0] = decks[:, 0]
+        self.discard_len[games] = 1
+        self.draw[games, :remaining - 1] = decks[:, 1:remaining]
+        self.draw_len[games] = remaining - 1
+
+        self.last_card[games] = decks[:, 0]
+        self.current_player[games] = 0
+        self.effects[games] = 0
+        self.turns[games] = 0
+        self.rounds[games] += 1
+
+    def replenish_draw(self, game: int):
+        """
+        `base.replenish_draw` for a single game, the top card stays in the discard pile
+        """
+        size = int(self.discard_len[game])
+        pile = self.discard[game, :size - 1].tolist()
+        self.rngs[game].shuffle(pile)
+        self.draw[game, :size - 1] = pile
+        self.draw_len[game] = size - 1
+        self.discard[game, 0] = self.discard[game, size - 1]
+        self.discard_len[game] = 1
+
+    def draw_cards(self, games: np.ndarray, count: int) -> np.ndarray:
+        """
+        vectorized `base.draw_card`, each of the games' current player draws `count` cards
+        :param games: indices of the games
+        :param count:
+        :return: the last card drawn in each game, NO_CARD if none left
+        """
+        drawn = np.full(len(games), NO_CARD, dtype=np.int16)
+        players = self.current_player[games]
+        for _ in range(count):
+            for game in games[self.draw_len[games] == 0].tolist():
+                self.replenish_draw(game)
+            has_card = self.draw_len[games] > 0
+            sub, sub_players = games[has_card], players[has_card]
+            top = self.draw_len[sub] - 1
+            cards = self.draw[sub, top]
+            self.draw_len[sub] = top
+            self.hands[sub, sub_players, cards] += 1
+            self.hand_len[sub, sub_players] += 1
+            drawn[:] = NO_CARD
+            drawn[has_card] = cards
+        return drawn
+
+    def is_playable(self, games: np.ndarray, cards: np.ndarray) -> np.ndarray:
+        """
+        vectorized `base.is_playable`
+        :param games: indices of the games
+        :param cards: card id for each game, must be valid ids
+        :return:
+        """
+        last = self.last_card[games]
+        return (self.effects[games] & BLOCKING == 0) & (
+            CARD_IS_WILD[cards] | (CARD_COLOR[cards] == CARD_COLOR[last]) | (CARD_SYMBOL[cards] == CARD_SYMBOL[last])
+        )
+
+    def legal_mask(self) -> np.ndarray:
+        """
+        :return: (N, card ids) mask of the cards the current player holds and can play
+        """
+        games = np.arange(self.n_games)
+        held = self.hands[games, self.current_player] > 0
+        last = self.last_card[:, None]
+        matches = CARD_IS_WILD[None, :] | (CARD_COLOR[None, :] == CARD_COLOR[last]) | (
+            CARD_SYMBOL[None, :] == CARD_SYMBOL[last])
+        return held & matches & (self.effects[:, None] & BLOCKING == 0)
+
+    def round_over(self) -> np.ndarray:
+        return (self.hand_len == 0).any(axis=1)
+
+    def game_over(self) -> np.ndarray:
+        return (self.scoreboard >= 500).any(axis=1)
+
+    def update_score(self, games: np.ndarray):
+        """
+        vectorized `base.update_score`, the first player with an empty hand gets the value of all hands
+        """
+        if len(games) == 0:
+            return
+        winners = np.argmax(self.hand_len[games] == 0, axis=1)
+        points = (self.hands[games].astype(np.int32) * CARD_VALUE).sum(axis=(1, 2))
+        self.scoreboard[games, winners] += points
+
+    def step_batch(self, cards: np.ndarray, colors: np.ndarray | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        vectorized `base.step`, every game takes one step.
+        Games whose round is over score and start a new round, ignoring their action, like the reference rule.
+        Games that are over afterwards are reset with `init_game` and flagged in the returned mask.
+        :param cards: (N,) card id to play per game, NO_CARD to draw
+        :param colors: (N,) color index chosen for wild cards, anything else than a valid color means red
+        :return: the card id played in each game (NO_CARD if none), mask of the games that finished
+        """
+        n = self.n_games
+        cards = np.asarray(cards, dtype=np.int16).copy()
+        colors = np.full(n, NO_CARD, dtype=np.int8) if colors is None else np.asarray(colors, dtype=np.int8).copy()
+        played = np.full(n, NO_CARD, dtype=np.int16)
+
+        over = self.round_over()
+        active = np.flatnonzero(~over)
+
+        # invalid moves are treated as draws, playing a valid card that is not in hand is an error
+        act_cards = cards[active]
+        chosen = act_cards >= 0
+        valid = np.zeros(len(active), dtype=bool)
+        valid[chosen] = self.is_playable(active[chosen], act_cards[chosen])
+        act_cards[~valid] = NO_CARD
+        held = self.hands[active[valid], self.current_player[active[valid]], act_cards[valid]] > 0
+        if not held.all():
+            raise ValueError(f'Cards not in hand in games {active[valid][~held].tolist()}')
+        self.turns[active] += 1
+
+        # draw branch
+        effects = self.effects[active]
+        drawing = act_cards < 0
+        skip = drawing & (effects & SKIP != 0)
+        draw_2 = drawing & ~skip & (effects & DRAW_2 != 0)
+        draw_4 = drawing & ~skip & ~draw_2 & (effects & WILD_DRAW_4 != 0)
+        plain = drawing & (effects & BLOCKING == 0)
+        self.effects[active[skip]] &= ~np.uint8(SKIP)
+        self.draw_cards(active[draw_2], 2)
+        self.effects[active[draw_2]] &= ~np.uint8(DRAW_2)
+        self.draw_cards(active[draw_4], 4)
+        self.effects[active[draw_4]] &= ~np.uint8(WILD_DRAW_4)
+
+        # the card drawn is played right away if possible, wild cards then take red
+        new_cards = self.draw_cards(active[plain], 1)
+        auto = new_cards >= 0
+        auto[auto] = self.is_playable(active[plain][auto], new_cards[auto])
+        plain_idx = np.flatnonzero(plain)[auto]
+        act_cards[plain_idx] = new_cards[auto]
+        act_colors = colors[active]
+        act_colors[plain_idx[CARD_IS_WILD[new_cards[auto]]]] = 0
+
+        # play branch
+        playing = act_cards >= 0
+        games, card = active[playing], act_cards[playing]
+        color = act_colors[playing]
+        color[(color < 0) | (color >= len(COLORS) - 1)] = 0
+        self.last_card[games] = np.where(CARD_IS_WILD[card], RECOLORED[card, color], card)
+        self.discard[games, self.discard_len[games]] = card
+        self.discard_len[games] += 1
+        players = self.current_player[games]
+        self.hands[games, players, card] -= 1
+        self.hand_len[games, players] -= 1
+        card_effects = CARD_EFFECT[card]
+        self.effects[games] ^= card_effects & REVERSE
+        self.effects[games] |= card_effects & BLOCKING
+        played[games] = card
+
+        # next player
+        step = np.where(self.effects[active] & REVERSE != 0, -1, 1)
+        self.current_player[active] = (self.current_player[active] + step) % self.n_players
+
+        # finished rounds
+        finished = np.flatnonzero(over)
+        self.update_score(finished)
+        self.init_round(finished)
+        done = self.game_over()
+        self.init_game(np.flatnonzero(done))
+        return played, done
+
+    def to_context(self, game: int) -> Context:
+        """
+        export one game as a reference `Context` with compact hands
+        :param game: index of the game
+        :return:
+        """
+        ctx = Context(self.n_players, compact_hands=True)
+        ctx.rng.setstate(self.rngs[game].getstate())
+        ctx.scoreboard = self.scoreboard[game].tolist()
+        ctx.rounds = int(self.rounds[game])
+
+        decode = CARD_INDEX.decode
+        hands = []
+        for counts in self.hands[game]:
+            hands.append(CompactHand(CARD_INDEX, [decode(card) for card in np.repeat(np.arange(N_CARDS), counts)]))
+        round_ = Round(
+            draw=[decode(card) for card in self.draw[game, :self.draw_len[game]].tolist()],
+            discard=[decode(card) for card in self.discard[game, :self.discard_len[game]].tolist()],
+            hands=hands,
+        )
+        round_.turns = int(self.turns[game])
+        round_.last_card = decode(int(self.last_card[game]))
+        round_.current_player = int(self.current_player[game])
+        round_.effects = effect_state(int(self.effects[game]))
+        value_hands(round_)
+        ctx.current_round = round_
+        return ctx
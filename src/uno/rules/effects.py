@@ -0,0 +1,127 @@
+"""
+Compiled effect state machine of the standard rule and its variants.
+
+The effect state of a round is a small int: the play direction, a pending skip and the number of pending draws.
+Rule variants are written as plain functions describing one transition, and compiled once into tables indexed by
+state and card kind, so `step` only does list lookups whatever the house rules are.
+"""
+from collections.abc import Callable
+from typing import NamedTuple
+
+# state bits
+REVERSED: int = 1  # play goes to the previous player
+SKIP_PENDING: int = 2  # the next player loses the turn
+DRAWS_SHIFT: int = 2  # state >> DRAWS_SHIFT is the number of cards the next player must draw
+MAX_PENDING_DRAWS: int = 32  # pending draws are capped so the tables stay small
+
+# card kinds
+NUMBER, SKIP, REVERSE, DRAW_2, WILD, WILD_DRAW_4 = range(6)
+KINDS: dict[int | str, int] = {
+    **{symbol: NUMBER for symbol in range(10)},
+    'skip': SKIP, 'reverse': REVERSE, 'draw_2': DRAW_2, 'wild': WILD, 'wild_draw_4': WILD_DRAW_4,
+}
+
+N_STATES: int = (MAX_PENDING_DRAWS << DRAWS_SHIFT) + REVERSED + SKIP_PENDING + 1
+NORMAL_DRAW: int = -1  # no effect is pending: draw one card, which is played if possible
+
+type PlayTransition = Callable[[int, int], int | None]
+type DrawTransition = Callable[[int], tuple[int, int]]
+
+
+def pending_draws(state: int) -> int:
+    return state >> DRAWS_SHIFT
+
+
+def is_blocking(state: int) -> bool:
+    """
+    :return: True if an effect is pending, in the standard rule no card can be played then
+    """
+    return state > REVERSED
+
+
+def with_draws(state: int, draws: int) -> int:
+    return (state & (REVERSED | SKIP_PENDING)) | (min(draws, MAX_PENDING_DRAWS) << DRAWS_SHIFT)
+
+
+def effect_name(state: int) -> str | None:
+    """
+    :return: name of the pending effect, None if none
+    """
+    if state & SKIP_PENDING:
+        return 'skip'
+    if draws := pending_draws(state):
+        return f'draw_{draws}'
+    return None
+
+
+class EffectTable(NamedTuple):
+    """
+    Transitions of every state, `play[state][kind]` is the state after playing a card of that kind (-1 if not
+    allowed), `draw[state]` the state after not playing and the number of cards to draw (`NORMAL_DRAW` for a
+    normal draw), `blocked[state]` whether only drawing is possible, `any_kind[state]` whether cards of all kinds
+    can be played
+    """
+    play: list[list[int]]
+    draw: list[tuple[int, int]]
+    blocked: list[bool]
+    any_kind: list[bool]
+
+
+def compile_table(play: PlayTransition, draw: DrawTransition) -> EffectTable:
+    """
+    evaluate a variant on every state
+    :param play: (state, kind) -> state after playing a card of that kind, None if such a card cannot be played
+    :param draw: state -> (state after not playing, cards to draw or `NORMAL_DRAW`)
+    :return:
+    """
+    play_table = []
+    for state in range(N_STATES):
+        row = []
+        for kind in range(WILD_DRAW_4 + 1):
+            after = play(state, kind)
+            row.append(-1 if after is None else after)
+        play_table.append(row)
+    draw_table = [draw(state) for state in range(N_STATES)]
+    return EffectTable(play_table, draw_table, [all(after < 0 for after in row) for row in play_table],
+                       [all(after >= 0 for after in row) for row in play_table])
+
+
+def standard_play(state: int, kind: int) -> int | None:
+    if is_blocking(state):
+        return None
+    return _apply_card(state, kind)
+
+
+def _apply_card(state: int, kind: int) -> int:
+    if kind == REVERSE:
+        return state ^ REVERSED
+    if kind == SKIP:
+        return state | SKIP_PENDING
+    if kind == DRAW_2:
+        return with_draws(state, pending_draws(state) + 2)
+    if kind == WILD_DRAW_4:
+        return with_draws(state, pending_draws(state) + 4)
+    return state
+
+
+def standard_draw(state: int) -> tuple[int, int]:
+    if state & SKIP_PENDING:
+        return state & ~SKIP_PENDING, 0
+    if draws := pending_draws(state):
+        return with_draws(state, 0), draws
+    return state, NORMAL_DRAW
+
+
+def stacking_play(state: int, kind: int) -> int | None:
+    """
+    house rule: a pending draw can be passed on to the next player by playing a draw 2 on it
+    """
+    if state & SKIP_PENDING:
+        return None
+    if pending_draws(state):
+        return _apply_card(state, kind) if kind == DRAW_2 else None
+    return _apply_card(state, kind)
+
+
+STANDARD: EffectTable = compile_table(standard_play, standard_draw)
+STACKING_DRAW_2: EffectTable = compile_table(stacking_play, standard_draw)
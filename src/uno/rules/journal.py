@@ -0,0 +1,128 @@
+"""
+Make/unmake support for search: apply `base.step` and revert it, touching only what the step changed.
+"""
+from collections.abc import Callable
+from typing import Any
+
+from ..engine.context import Context, Round
+from ..engine.player import Move
+from . import base
+from .effects import pending_draws
+
+MAX_DRAWS: int = 4  # most cards a step of the standard rule can take from the draw pile
+
+
+class Journal:
+    """
+    What a single step changed, enough to restore the context as it was before.
+    A step that may reshuffle (round end, or a draw pile too short to serve the step) also saves
+    the piles and the rng state, as does a step on a lazily shuffled pile, where every draw uses the rng.
+    Otherwise the rng is not used and only pile tails move.
+    """
+    __slots__ = (
+        'round', 'turns', 'last_card', 'current_player', 'effects', 'player', 'hand', 'hand_points',
+        'draw_len', 'draw_tail', 'discard_len', 'draw', 'discard', 'unshuffled', 'rng_state', 'scoreboard', 'rounds',
+    )
+
+    round: Round | None
+    turns: int
+    last_card: Any
+    current_player: int
+    effects: int
+    player: int
+    hand: Any  # copy of the current player's hand
+    hand_points: int  # its value
+    draw_len: int
+    draw_tail: list | None  # top cards of the draw pile, when piles are not saved
+    discard_len: int
+    draw: list | None  # saved piles, when the step may reshuffle
+    discard: list | None
+    unshuffled: int
+    rng_state: tuple | None
+    scoreboard: list[int] | None  # saved on round end
+    rounds: int
+
+    def __init__(self, ctx: Context):
+        round_ = ctx.current_round
+        self.round = round_
+        self.rounds = ctx.rounds
+        self.draw = self.discard = self.draw_tail = None
+        self.scoreboard = self.rng_state = None
+        if round_ is None or base.round_is_over(round_):
+            # the step scores and deals a new round, which replaces `current_round`, or resets it in place
+            if round_ is not None and ctx.reuse_rounds:
+                self.round = round_.clone()
+            self.scoreboard = None if ctx.scoreboard is None else ctx.scoreboard[:]
+            self.rng_state = ctx.rng.getstate()
+            return
+
+        self.turns = round_.turns
+        self.last_card = round_.last_card
+        self.current_player = round_.current_player
+        self.effects = round_.effects
+        self.player = round_.current_player
+        self.hand = round_.hands[self.player].copy()
+        self.hand_points = round_.hand_points[self.player]
+        self.draw_len = len(round_.draw)
+        self.discard_len = len(round_.discard)
+        self.unshuffled = round_.unshuffled
+        # stacked draws of rule variants can take more than `MAX_DRAWS`, plus the card played after a normal draw
+        draws = max(MAX_DRAWS, pending_draws(round_.effects) + 1)
+        if self.draw_len < draws or self.unshuffled:  # the draw pile may be replenished or shuffled
+            self.draw = round_.draw[:]
+            self.discard = round_.discard[:]
+            self.rng_state = ctx.rng.getstate()
+        else:
+            self.draw_tail = round_.draw[-draws:]
+
+    def undo(self, ctx: Context):
+        """
+        revert the context to the state it had when the journal was created
+        :param ctx:
+        :return:
+        """
+        ctx.rounds = self.rounds
+        if self.rng_state is not None:
+            ctx.rng.setstate(self.rng_state)
+        if self.round is None or ctx.current_round is not self.round:
+            ctx.current_round = self.round
+            if self.scoreboard is not None:
+                ctx.scoreboard[:] = self.scoreboard
+            return
+
+        round_ = self.round
+        round_.turns = self.turns
+        round_.last_card = self.last_card
+        round_.current_player = self.current_player
+        round_.effects = self.effects
+        round_.hands[self.player] = self.hand
+        round_.hand_points[self.player] = self.hand_points
+        if self.draw is not None:
+            round_.draw = self.draw
+            round_.discard = self.discard
+            round_.unshuffled = self.unshuffled
+        else:
+            round_.draw[self.draw_len - len(self.draw_tail):] = self.draw_tail
+            del round_.discard[self.discard_len:]
+
+
+def make_move(ctx: Context, move: Move, step: Callable[[Context, Move], Any] = base.step) -> tuple[Any, Journal]:
+    """
+    apply the move, keeping what is needed to take it back
+    :param ctx:
+    :param move:
+    :param step: the rule's step function, must have the same effects as `base.step`
+    :return: result of the step, journal to pass to `unmake_move`
+    """
+    journal = Journal(ctx)
+    return step(ctx, move), journal
+
+
+def unmake_move(ctx: Context, journal: Journal):
+    """
+    take back the move recorded by the journal. Moves must be taken back in reverse order
+    :param ctx:
+    :param journal:
+    :return:
+    """
+    journal.undo(ctx)
@@ -0,0 +1,6 @@
+from .net import GameServer, RemotePlayer, play_remote
+from .store import StoreStats, TableStore
+from .tables import AsyncPlayer, ServerStats, SyncPlayerAdapter, TableRunner
+
+__all__ = ['AsyncPlayer', 'GameServer', 'RemotePlayer', 'ServerStats', 'StoreStats', 'SyncPlayerAdapter',
+           'TableRunner', 'TableStore', 'play_remote']
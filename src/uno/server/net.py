@@ -0,0 +1,222 @@
+"""
+TCP front end of the table runner. Remote clients take seats at tables and exchange newline-delimited JSON:
+
+    client -> {"op": "join", "table": 1}
+    server -> {"op": "joined", "table": 1, "seat": 0}
+    server -> {"op": "request", "id": 3, "hand": [[color, symbol], ...], "top_card": ..., "hand_sizes": [...],
+               "scores": [...], "legal_moves": [...]}
+    client -> {"op": "move", "id": 3, "card": [color, symbol] or null, "color": "red" or null}
+    server -> {"op": "end", "scores": [...]}
+
+Replies to a request whose deadline passed are ignored.
+"""
+import asyncio
+import json
+from collections.abc import Callable
+from typing import Any
+
+from ..engine.context import Card
+from ..engine.game import Game
+from ..engine.player import Move, Player, Request
+from ..rules.base import rule as standard_rule
+from .tables import DRAW, TableRunner
+
+
+def _card(data: Any) -> Card | None:
+    return None if data is None else Card(*data)
+
+
+def encode_request(request_id: int, request: Request) -> dict:
+    return {
+        'op': 'request',
+        'id': request_id,
+        'hand': list(request.hand),
+        'top_card': request.top_card,
+        'hand_sizes': list(request.hand_sizes),
+        'scores': request.scores,
+        'legal_moves': request.legal_moves,
+        'hand_points': None if request.hand_points is None else list(request.hand_points),
+        'effects': request.effects,
+    }
+
+
+def decode_request(message: dict) -> Request:
+    legal = message.get('legal_moves')
+    return Request(
+        [Card(*card) for card in message['hand']],
+        message['hand_sizes'],
+        message['scores'],
+        [],
+        _card(message['top_card']),
+        None if legal is None else [Card(*card) for card in legal],
+        message.get('hand_points'),
+        message.get('effects'),
+    )
+
+
+class Connection:
+    """
+    A line-based JSON stream
+    """
+    reader: asyncio.StreamReader
+    writer: asyncio.StreamWriter
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    async def send(self, message: dict):
+        self.writer.write(json.dumps(message).encode() + b'\n')
+        await self.writer.drain()
+
+    async def receive(self) -> dict | None:
+        line = await self.reader.readline()
+        return json.loads(line) if line else None
+
+    async def close(self):
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+class RemotePlayer:
+    """
+    Async player at the other end of a connection
+    """
+    connection: Connection
+    _next_id: int
+
+    def __init__(self, connection: Connection):
+        self.connection = connection
+        self._next_id = 0
+
+    async def play(self, request: Request) -> Move:
+        self._next_id += 1
+        await self.connection.send(encode_request(self._next_id, request))
+        while True:
+            message = await self.connection.receive()
+            if message is None:  # disconnected
+                return DRAW
+            if message.get('op') == 'move' and message.get('id') == self._next_id:
+                card = _card(message.get('card'))
+                color = message.get('color')
+                return (card,) if color is None else (card, color)
+
+
+class Table:
+    game: Game
+    seats: list[Player | RemotePlayer | None]  # None for seats waiting for a remote player
+    ready: asyncio.Event
+    task: asyncio.Task | None
+
+    def __init__(self, game: Game, seats: list[Player | None]):
+        self.game = game
+        self.seats = seats
+        self.ready = asyncio.Event()
+        self.task = None
+        if None not in seats:
+            self.ready.set()
+
+
+class GameServer:
+    """
+    Serves tables over TCP (or a Unix socket). Tables start once all their remote seats are taken.
+    """
+    runner: TableRunner
+    tables: dict[int, Table]
+    _server: asyncio.Server | None
+
+    def __init__(self, runner: TableRunner | None = None):
+        self.runner = TableRunner() if runner is None else runner
+        self.tables = {}
+        self._server = None
+
+    def create_table(self, n_players: int, remote_seats: int = 1, seed: int | None = None,
+                     bot_factory: Callable[[str], Player] | None = None, rule=standard_rule) -> int:
+        """
+        :param n_players:
+        :param remote_seats: number of seats for remote clients, the first ones
+        :param seed:
+        :param bot_factory: builds the players of the other seats, `RandomPlayer` by default
+        :param rule:
+        :return: table id
+        """
+        from ..engine.player import RandomPlayer
+        bot_factory = RandomPlayer if bot_factory is None else bot_factory
+        game = Game(rule, n_players=n_players, seed=seed)
+        seats = [None if idx < remote_seats else bot_factory(str(idx)) for idx in range(n_players)]
+        table_id = len(self.tables) + 1
+        table = self.tables[table_id] = Table(game, seats)
+        table.task = asyncio.get_running_loop().create_task(self._run_when_ready(table))
+        return table_id
+
+    async def _run_when_ready(self, table: Table):
+        await table.ready.wait()
+        game = await self.runner.run_table(table.game, table.seats)
+        for seat in table.seats:
+            if isinstance(seat, RemotePlayer):
+                try:
+                    await seat.connection.send({'op': 'end', 'scores': game.context.scoreboard})
+                except ConnectionError:
+                    pass
+                await seat.connection.close()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        connection = Connection(reader, writer)
+        message = await connection.receive()
+        table = self.tables.get(message.get('table')) if message and message.get('op') == 'join' else None
+        if table is None or None not in table.seats:
+            await connection.send({'op': 'error', 'reason': 'no free seat'})
+            await connection.close()
+            return
+        seat = table.seats.index(None)
+        table.seats[seat] = RemotePlayer(connection)
+        await connection.send({'op': 'joined', 'table': message['table'], 'seat': seat})
+        if None not in table.seats:
+            table.ready.set()
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0, path: str | None = None) -> tuple:
+        """
+        start listening, on a Unix socket if `path` is given
+        :return: the bound address
+        """
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self._handle, path)
+        else:
+            self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server.sockets[0].getsockname()
+
+    async def close(self):
+        for table in self.tables.values():
+            for seat in table.seats:
+                if isinstance(seat, RemotePlayer):
+                    await seat.connection.close()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self.runner.close()
+
+
+async def play_remote(host: str, port: int, table: int, player: Player) -> list[int] | None:
+    """
+    client side: take a seat at a table and let a local player play it
+    :return: final scores, None if the server refused the seat
+    """
+    connection = Connection(*await asyncio.open_connection(host, port))
+    try:
+        await connection.send({'op': 'join', 'table': table})
+        message = await connection.receive()
+        if message is None or message['op'] != 'joined':
+            return None
+        while (message := await connection.receive()) is not None:
+            if message['op'] == 'end':
+                return message['scores']
+            if message['op'] == 'request':
+                move = player.play(decode_request(message))
+                await connection.send({'op': 'move', 'id': message['id'], 'card': move[0],
+                                       'color': move[1] if len(move) > 1 else None})
+        return None
+    finally:
+        await connection.close()
@@ -0,0 +1,181 @@
+"""
+Table store for servers hosting many slow tables, e.g. people playing move by move: recently used contexts stay
+live, the others are suspended as `Context.snapshot`s, in memory or in files, and restored on their next move.
+Not thread-safe, use it from the event loop.
+"""
+import os
+import re
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from dataclasses import dataclass
+from os import PathLike
+from pathlib import Path
+from typing import Any
+
+from ..engine.context import Context
+from ..engine.player import Move
+from ..engine.rule import Rule
+from ..rules import base
+
+SUFFIX: str = '.unoc'
+
+_TABLE_NAME = re.compile(r'[\w-]+')
+
+
+@dataclass(slots=True)
+class StoreStats:
+    hits: int = 0  # tables found live
+    restores: int = 0
+    suspends: int = 0
+
+
+class TableStore:
+    """
+    Contexts of the tables by table id. At most `capacity` are live, using one suspends the least recently
+    used one over that. `suspend_idle` suspends the tables left alone for a while.
+    Event sinks are not kept: a restored context has none, subscribe them again after `context` if needed
+    """
+    rule: Rule
+    capacity: int
+    directory: Path | None
+    stats: StoreStats
+
+    _live: OrderedDict[Hashable, Context]  # least recently used first
+    _used: dict[Hashable, float]  # last use of the live tables
+    _suspended: dict[Hashable, bytes]  # snapshots kept in memory, when there is no directory
+
+    def __init__(self, rule: Rule = base.rule, capacity: int = 1024, directory: str | PathLike | None = None):
+        """
+        :param rule: steps the tables
+        :param capacity: live tables
+        :param directory: write snapshots there, one file per table, instead of keeping them in memory.
+            Tables suspended in it by a previous store are found again. Table ids must then be names made of
+            letters, digits, `_` and `-`, or ints
+        """
+        if capacity < 1:
+            raise ValueError('A store needs room for at least one live table')
+        self.rule = rule
+        self.capacity = capacity
+        self.directory = None if directory is None else Path(directory)
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        self.stats = StoreStats()
+        self._live = OrderedDict()
+        self._used = {}
+        self._suspended = {}
+
+    def _path(self, table_id: Hashable) -> Path:
+        name = str(table_id)
+        if not _TABLE_NAME.fullmatch(name):
+            raise ValueError(f'Table id {table_id!r} is not a valid file name')
+        return self.directory / (name + SUFFIX)
+
+    def add(self, table_id: Hashable, context: Context):
+        """
+        host a table, replacing the one with the same id
+        """
+        self.remove(table_id)
+        self._live[table_id] = context
+        self._used[table_id] = time.monotonic()
+        self._shrink()
+
+    def remove(self, table_id: Hashable):
+        """
+        forget a table, live or suspended. Does nothing for unknown ids
+        """
+        if self._live.pop(table_id, None) is not None:
+            del self._used[table_id]
+        self._suspended.pop(table_id, None)
+        if self.directory is not None:
+            self._path(table_id).unlink(missing_ok=True)
+
+    def context(self, table_id: Hashable) -> Context:
+        """
+        the live context of the table, restored if it was suspended
+        :raise KeyError: unknown table
+        """
+        ctx = self._live.get(table_id)
+        if ctx is not None:
+            self.stats.hits += 1
+            self._live.move_to_end(table_id)
+        else:
+            ctx = Context.restore(self._take(table_id))
+            self.stats.restores += 1
+            self._live[table_id] = ctx
+            self._shrink()
+        self._used[table_id] = time.monotonic()
+        return ctx
+
+    def step(self, table_id: Hashable, move: Move) -> Any:
+        """
+        play the move of the current player of the table
+        :return: what the rule returned
+        """
+        return self.rule.step(self.context(table_id), move)
+
+    def suspend(self, table_id: Hashable):
+        """
+        snapshot a live table and drop its context. Does nothing if it is already suspended
+        """
+        ctx = self._live.pop(table_id, None)
+        if ctx is None:
+            return
+        del self._used[table_id]
+        data = ctx.snapshot()
+        if self.directory is None:
+            self._suspended[table_id] = data
+        else:
+            path = self._path(table_id)
+            partial = path.with_suffix('.tmp')
+            partial.write_bytes(data)
+            os.replace(partial, path)  # a crash leaves the previous snapshot, never half of one
+        self.stats.suspends += 1
+
+    def suspend_idle(self, max_idle: float) -> int:
+        """
+        suspend the tables not used for `max_idle` seconds
+        :return: number of tables suspended
+        """
+        deadline = time.monotonic() - max_idle
+        idle = [table_id for table_id in self._live if self._used[table_id] <= deadline]
+        for table_id in idle:
+            self.suspend(table_id)
+        return len(idle)
+
+    def close(self):
+        """
+        suspend every live table, so that a store on the same directory resumes them
+        """
+        for table_id in list(self._live):
+            self.suspend(table_id)
+
+    def is_live(self, table_id: Hashable) -> bool:
+        return table_id in self._live
+
+    def __contains__(self, table_id: Hashable) -> bool:
+        if table_id in self._live or table_id in self._suspended:
+            return True
+        return self.directory is not None and self._path(table_id).exists()
+
+    def __len__(self) -> int:
+        """
+        live tables and those suspended in memory, tables in the directory are not counted
+        """
+        return len(self._live) + len(self._suspended)
+
+    def _take(self, table_id: Hashable) -> bytes:
+        data = self._suspended.pop(table_id, None)
+        if data is not None:
+            return data
+        if self.directory is not None:
+            path = self._path(table_id)
+            try:
+                return path.read_bytes()  # the file stays until the next suspend replaces it, in case of a crash
+            except FileNotFoundError:
+                pass
+        raise KeyError(table_id)
+
+    def _shrink(self):
+        while len(self._live) > self.capacity:
+            self.suspend(next(iter(self._live)))
@@ -0,0 +1,160 @@
+"""
+Asyncio table runner: many games in one event loop, with async players and per-move deadlines.
+"""
+import asyncio
+import logging
+import time
+from collections.abc import Sequence
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Protocol, runtime_checkable
+
+from ..engine.game import Game
+from ..engine.instrument import LatencyHistogram
+from ..engine.player import Move, Player, Request
+
+logger = logging.getLogger(__name__)
+
+DRAW: Move = (None,)
+
+
+def is_valid_move(request: Request, move: Move) -> bool:
+    """
+    check a move from an untrusted player before it reaches the rule: a draw, or a card of the hand that is
+    legal if the rule lists legal moves
+    :param request: what the player was shown
+    :param move:
+    :return: True if the move can be applied
+    """
+    if not isinstance(move, tuple) or not move:
+        return False
+    card = move[0]
+    if card is None:
+        return True
+    try:
+        if card not in request.hand:
+            return False
+        return request.legal_moves is None or card in request.legal_moves
+    except TypeError:  # unhashable or uncomparable garbage
+        return False
+
+
+@runtime_checkable
+class AsyncPlayer(Protocol):
+    async def play(self, request: Request) -> Move:
+        ...
+
+
+class SyncPlayerAdapter:
+    """
+    Run a blocking `Player` without blocking the event loop: in the given executor, or inline if None
+    (only for bots that answer in microseconds)
+    """
+    player: Player
+    executor: Executor | None
+
+    def __init__(self, player: Player, executor: Executor | None = None):
+        self.player = player
+        self.executor = executor
+
+    async def play(self, request: Request) -> Move:
+        if self.executor is None:
+            return self.player.play(request)
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self.player.play, request)
+
+
+@dataclass(slots=True)
+class ServerStats:
+    tables_started: int = 0
+    tables_finished: int = 0
+    moves: int = 0
+    timeouts: int = 0
+    errors: int = 0
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)  # time to get each move
+
+
+class TableRunner:
+    """
+    Hosts tables in the running event loop. Sync players go through a bounded thread pool.
+    A player that misses the deadline, fails or sends an invalid move draws instead.
+    """
+    move_timeout: float | None
+    stats: ServerStats
+
+    _executor: ThreadPoolExecutor
+    _inline_sync: bool
+    _tasks: set[asyncio.Task]
+
+    def __init__(self, move_timeout: float | None = 10.0, max_threads: int = 32, inline_sync: bool = False):
+        """
+        :param move_timeout: seconds a player has to move, None for no deadline
+        :param max_threads: size of the thread pool running sync players
+        :param inline_sync: call sync players on the event loop thread instead, for fast bots
+        """
+        self.move_timeout = move_timeout
+        self.stats = ServerStats()
+        self._executor = ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix='uno-player')
+        self._inline_sync = inline_sync
+        self._tasks = set()
+
+    def adapt(self, player: Player | AsyncPlayer) -> AsyncPlayer:
+        if isinstance(player, Player):
+            return SyncPlayerAdapter(player, None if self._inline_sync else self._executor)
+        return player
+
+    async def run_table(self, game: Game, players: Sequence[Player | AsyncPlayer] | None = None) -> Game:
+        """
+        play a game to the end
+        :param game:
+        :param players: one per seat, defaults to `game.players`
+        :return: the finished game
+        """
+        seats = [self.adapt(player) for player in (game.players if players is None else players)]
+        stats, clock, timeout = self.stats, time.perf_counter, self.move_timeout
+        stats.tables_started += 1
+        game.begin()
+        try:
+            while not game.rule.is_over(game.context):
+                cur_player = game.context.current_round.current_player
+                request = game.build_request(cur_player)
+                started = clock()
+                try:
+                    move = await asyncio.wait_for(seats[cur_player].play(request), timeout)
+                except TimeoutError:
+                    stats.timeouts += 1
+                    move = DRAW
+                except Exception:
+                    logger.exception('Player %s failed to move', cur_player)
+                    stats.errors += 1
+                    move = DRAW
+                stats.latency.add(clock() - started)
+                if not is_valid_move(request, move):
+                    logger.warning('Player %s sent an invalid move %r', cur_player, move)
+                    stats.errors += 1
+                    move = DRAW
+                stats.moves += 1
+                game.apply(cur_player, move)
+        finally:
+            game.end()
+        stats.tables_finished += 1
+        return game
+
+    def spawn(self, game: Game, players: Sequence[Player | AsyncPlayer] | None = None) -> asyncio.Task:
+        """
+        start a table in the background
+        :return: the task running the table, its result is the finished game
+        """
+        task = asyncio.get_running_loop().create_task(self.run_table(game, players))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def join(self):
+        """
+        wait for all running tables
+        """
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
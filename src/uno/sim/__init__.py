@@ -0,0 +1,3 @@
+from .runner import SimStats, derive_seed, iter_chunks, play_game, reproduce_game, simulate
+
+__all__ = ['SimStats', 'derive_seed', 'iter_chunks', 'play_game', 'reproduce_game', 'simulate']
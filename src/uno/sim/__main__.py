@@ -0,0 +1,38 @@
+"""
+Console entry point of the batch simulator: `python -m uno.sim` or `uno-sim`
+"""
+import argparse
+import time
+
+from .. import registry
+from .runner import CHUNK_SIZE, SimStats, iter_chunks
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(prog='uno-sim', description='Run bot-vs-bot UNO games in parallel.')
+    parser.add_argument('-n', '--games', type=int, default=1000, help='number of games to play')
+    parser.add_argument('-p', '--players', type=int, default=4, help='players per game (2-10)')
+    parser.add_argument('-s', '--seed', type=int, default=0, help='master seed')
+    parser.add_argument('-w', '--workers', type=int, default=None, help='worker processes, default one per core')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='games per work unit')
+    parser.add_argument('--rule', default='standard', help='registered rule to play, see `uno.registry`')
+    args = parser.parse_args(argv)
+    try:
+        rule = registry.load_rule(args.rule)
+    except ValueError as e:
+        parser.error(str(e))
+
+    stats = SimStats(args.players)
+    started = time.perf_counter()
+    for chunk in iter_chunks(args.games, args.players, args.seed, args.workers, args.chunk_size, rule):
+        stats.merge(chunk)
+    elapsed = time.perf_counter() - started
+
+    print(f'games: {stats.games}  rounds: {stats.rounds}  turns: {stats.turns}')
+    print(f'elapsed: {elapsed:.2f}s  ({stats.games / elapsed:.1f} games/s)')
+    for seat in range(args.players):
+        print(f'  seat {seat}: wins {stats.wins[seat]} ({stats.win_rates[seat]:.1%})  score {stats.scores[seat]}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+"""
+Batch self-play: play many seeded games across a process pool and merge the results
+"""
+from collections.abc import Callable, Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+
+from ..engine.game import Game, GamePool
+from ..engine.player import Player, RandomPlayer
+from ..engine.rng import derive_seed
+from ..engine.rule import Rule
+from ..rules.base import rule as standard_rule
+
+type PlayerFactory = Callable[[str], Player]
+
+CHUNK_SIZE: int = 64
+
+
+@dataclass(slots=True)
+class SimStats:
+    """
+    Aggregated results of a batch of games. Stats of disjoint batches can be merged in any order.
+    """
+    n_players: int
+    games: int = 0
+    rounds: int = 0
+    turns: int = 0
+    wins: list[int] = field(default_factory=list)
+    scores: list[int] = field(default_factory=list)  # sum of final scoreboards, per seat
+
+    def __post_init__(self):
+        if not self.wins:
+            self.wins = [0] * self.n_players
+        if not self.scores:
+            self.scores = [0] * self.n_players
+
+    def add_game(self, game: Game, turns: int):
+        """
+        account a finished game
+        :param game:
+        :param turns: number of turns played in the game
+        :return:
+        """
+        scoreboard = game.context.scoreboard
+        self.games += 1
+        self.rounds += game.context.rounds
+        self.turns += turns
+        self.wins[scoreboard.index(max(scoreboard))] += 1
+        for idx, score in enumerate(scoreboard):
+            self.scores[idx] += score
+
+    def merge(self, other: 'SimStats') -> 'SimStats':
+        """
+        merge another batch into this one
+        :param other:
+        :return: self
+        """
+        if other.n_players != self.n_players:
+            raise ValueError('Cannot merge stats of games with different player counts')
+        self.games += other.games
+        self.rounds += other.rounds
+        self.turns += other.turns
+        for idx in range(self.n_players):
+            self.wins[idx] += other.wins[idx]
+            self.scores[idx] += other.scores[idx]
+        return self
+
+    @property
+    def win_rates(self) -> list[float]:
+        return [wins / self.games if self.games else 0.0 for wins in self.wins]
+
+
+def play_game(rule: Rule, n_players: int, seed: int, player_factory: PlayerFactory = RandomPlayer,
+              pool: GamePool | None = None) -> tuple[Game, int]:
+    """
+    play a single game to the end
+    :param rule:
+    :param n_players:
+    :param seed: seed of the game, players get streams derived from it
+    :param player_factory: called with the seat name to build each player
+    :param pool: take the game from this pool instead of building one, release it once done with the result
+    :return: the finished game and the number of turns played
+    """
+    game = Game(rule, n_players=n_players, seed=seed) if pool is None else pool.acquire(seed)
+    game.players = [player_factory(str(idx)) for idx in range(n_players)]
+    game.start()
+    # every round transition consumes one step without being a turn
+    return game, game.history.total - game.context.rounds
+
+
+def reproduce_game(master_seed: int, game_index: int, n_players: int = 4, rule: Rule = standard_rule,
+                   player_factory: PlayerFactory = RandomPlayer) -> Game:
+    """
+    replay one game of a run on its own, without the games before it
+    :param master_seed: master seed of the run
+    :param game_index: index of the game in the run
+    :return: the finished game
+    """
+    return play_game(rule, n_players, derive_seed(master_seed, game_index), player_factory)[0]
+
+
+def run_chunk(rule: Rule, n_players: int, master_seed: int, start: int, stop: int,
+              player_factory: PlayerFactory = RandomPlayer) -> SimStats:
+    """
+    play the games with index in [start, stop). Runs inside a worker process
+    :return: aggregated stats of the chunk
+    """
+    stats = SimStats(n_players)
+    pool = GamePool(rule, n_players)
+    for game_index in range(start, stop):
+        game, turns = play_game(rule, n_players, derive_seed(master_seed, game_index), player_factory, pool)
+        stats.add_game(game, turns)
+        pool.release(game)
+    return stats
+
+
+def iter_chunks(n_games: int, n_players: int = 4, master_seed: int = 0, workers: int | None = None,
+                chunk_size: int = CHUNK_SIZE, rule: Rule = standard_rule,
+                player_factory: PlayerFactory = RandomPlayer) -> Iterator[SimStats]:
+    """
+    play games over a process pool, yielding the stats of each chunk as soon as it is done.
+    chunks are yielded in completion order, which is fine since merging is order independent
+    :param n_games: total number of games to play
+    :param n_players:
+    :param master_seed: seed from which the seed of every game is derived
+    :param workers: number of worker processes, None for one per core. 1 plays in the current process
+    :param chunk_size: number of games sent to a worker at once
+    :param rule:
+    :param player_factory: must be picklable (e.g. a module-level class) when using more than one worker.
+        Games are pooled, players must not keep requests after `play` returns
+    :return:
+    """
+    bounds = [(start, min(start + chunk_size, n_games)) for start in range(0, n_games, chunk_size)]
+    if workers == 1:
+        for start, stop in bounds:
+            yield run_chunk(rule, n_players, master_seed, start, stop, player_factory)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(run_chunk, rule, n_players, master_seed, start, stop, player_factory)
+            for start, stop in bounds
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def simulate(n_games: int, n_players: int = 4, master_seed: int = 0, workers: int | None = None,
+             chunk_size: int = CHUNK_SIZE, rule: Rule = standard_rule,
+             player_factory: PlayerFactory = RandomPlayer) -> SimStats:
+    """
+    play `n_games` games and merge their stats. Same master seed gives same stats regardless of `workers`
+    :return: aggregated stats of all games
+    """
+    stats = SimStats(n_players)
+    for chunk in iter_chunks(n_games, n_players, master_seed, workers, chunk_size, rule, player_factory):
+        stats.merge(chunk)
+    return stats
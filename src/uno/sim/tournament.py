@@ -0,0 +1,342 @@
+"""
+Head-to-head tournaments between bots: round-robin or gauntlet pairings played as mirrored game pairs,
+Elo ratings, SPRT early stopping, a process pool and an NDJSON results file to resume from.
+
+Each pair of games uses the same seed twice with the seats swapped, so both entrants get the same deals and the
+luck of the deck cancels out.
+"""
+import json
+import math
+import os
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+from functools import partial
+from os import PathLike
+
+from ..engine.context import Context
+from ..engine.game import Game
+from ..engine.player import Player
+from ..engine.rng import derive_seed
+from ..engine.rule import Rule
+from ..rules.base import rule as standard_rule
+
+type EntrantFactory = Callable[[str, Context], Player]
+
+BATCH_PAIRS: int = 16
+ELO_K: float = 16.0
+MAX_TURNS: int = 5000  # steps before a game is called a draw, some bots can stall a game forever
+MIN_VARIANCE: float = 1e-3  # floor of the pair score variance, so a few identical pairs do not decide alone
+INITIAL_ELO: float = 1500.0
+
+
+def _simple_player(cls: Callable[[str], Player], name: str, context: Context) -> Player:
+    return cls(name)
+
+
+def entrant(cls: Callable[[str], Player]) -> EntrantFactory:
+    """
+    wrap a player class that only takes a name, e.g. `entrant(RandomPlayer)`. Bots that read the game's
+    context are passed as is, e.g. `partial(ISMCTSPlayer, iterations=200)`
+    """
+    return partial(_simple_player, cls)
+
+
+def expected_score(elo_diff: float) -> float:
+    """
+    :param elo_diff: rating of the player minus rating of the opponent
+    :return: expected score of the player
+    """
+    return 1 / (1 + 10 ** (-elo_diff / 400))
+
+
+def sprt_llr(pair_scores: list[float], elo0: float, elo1: float) -> float:
+    """
+    log-likelihood ratio of H1 (the first entrant is `elo1` stronger) against H0 (`elo0` stronger).
+    The two games of a mirrored pair share their deals, so they are not independent: the test runs on pair scores,
+    with the normal approximation of the generalized SPRT
+    :param pair_scores: score of the first entrant in each pair, in [0, 1]
+    :param elo0:
+    :param elo1:
+    :return:
+    """
+    n = len(pair_scores)
+    if n < 2:
+        return 0.0
+    mean = sum(pair_scores) / n
+    var = sum((score - mean) ** 2 for score in pair_scores) / n
+    var = max(var, MIN_VARIANCE)
+    s0, s1 = expected_score(elo0), expected_score(elo1)
+    return n * (s1 - s0) * (2 * mean - s0 - s1) / (2 * var)
+
+
+def sprt_bounds(alpha: float, beta: float) -> tuple[float, float]:
+    """
+    :param alpha: false positive rate
+    :param beta: false negative rate
+    :return: LLR bounds (accept H0 below, accept H1 above)
+    """
+    return math.log(beta / (1 - alpha)), math.log((1 - beta) / alpha)
+
+
+def play_game(first: EntrantFactory, second: EntrantFactory, seed: int, first_seat: int,
+              rule: Rule = standard_rule, max_turns: int = MAX_TURNS) -> int:
+    """
+    play one game of a pair
+    :param first:
+    :param second:
+    :param seed:
+    :param first_seat: seat of the first entrant
+    :param rule:
+    :param max_turns: steps before the game is called a draw
+    :return: half-points of the first entrant: 2 for a win, 1 for a draw, 0 for a loss
+    """
+    game = Game(rule, n_players=2, seed=seed, history_window=1)
+    factories = (first, second) if first_seat == 0 else (second, first)
+    game.players = [factory(str(seat), game.context) for seat, factory in enumerate(factories)]
+    ctx = game.context
+    game.begin()
+    try:
+        for _ in range(max_turns):
+            if rule.is_over(ctx):
+                break
+            cur_player = ctx.current_round.current_player
+            game.apply(cur_player, game.players[cur_player].play(game.build_request(cur_player)))
+    finally:
+        game.end()
+        for player in game.players:
+            if hasattr(player, 'close'):
+                player.close()
+    if not rule.is_over(ctx):
+        return 1
+    scoreboard = ctx.scoreboard
+    return 2 if scoreboard.index(max(scoreboard)) == first_seat else 0
+
+
+def play_pair_batch(first: EntrantFactory, second: EntrantFactory, seeds: list[int],
+                    rule: Rule = standard_rule, max_turns: int = MAX_TURNS) -> list[list[int]]:
+    """
+    play mirrored game pairs. Runs inside a worker process
+    :param first:
+    :param second:
+    :param seeds: one per pair
+    :param rule:
+    :param max_turns: steps before a game is called a draw
+    :return: half-points of the first entrant in both games of each pair
+    """
+    return [[play_game(first, second, seed, first_seat, rule, max_turns) for first_seat in (0, 1)]
+            for seed in seeds]
+
+
+@dataclass(slots=True)
+class PairingResult:
+    """
+    Results of a pairing, from the first entrant's point of view
+    """
+    first: str
+    second: str
+    pairs: dict[int, list[list[int]]] = field(default_factory=dict)  # batch index -> half-points per pair
+    decision: str | None = None  # 'H1' (first is stronger), 'H0', or None while running / undecided
+
+    @property
+    def games(self) -> int:
+        return 2 * sum(len(batch) for batch in self.pairs.values())
+
+    @property
+    def points(self) -> float:
+        """
+        points of the first entrant, 1 per win and 0.5 per draw
+        """
+        return sum(sum(pair) for batch in self.pairs.values() for pair in batch) / 2
+
+    @property
+    def score(self) -> float:
+        return self.points / self.games if self.games else 0.5
+
+    def pair_scores(self) -> list[float]:
+        """
+        :return: score of the first entrant in each pair, in [0, 1], in seed order
+        """
+        return [sum(pair) / 4 for batch in sorted(self.pairs) for pair in self.pairs[batch]]
+
+    def games_in_order(self) -> Iterator[float]:
+        """
+        :return: score of the first entrant, game by game in seed order
+        """
+        for batch in sorted(self.pairs):
+            for pair in self.pairs[batch]:
+                for half_points in pair:
+                    yield half_points / 2
+
+
+class Tournament:
+    """
+    Plays pairings until their SPRT decides or `max_pairs` mirrored pairs are played.
+
+    :param entrants: name -> factory called with the seat name and the game's context, picklable for more than
+        one worker (module-level callables, `functools.partial`, `entrant(...)`)
+    :param mode: 'round-robin' plays every pairing, 'gauntlet' plays the first entrant against all others
+    """
+    entrants: dict[str, EntrantFactory]
+    mode: str
+    master_seed: int
+    max_pairs: int
+    batch_pairs: int
+    elo0: float
+    elo1: float
+    alpha: float
+    beta: float
+    rule: Rule
+    max_turns: int
+    path: str | PathLike | None
+    results: dict[tuple[str, str], PairingResult]
+
+    def __init__(self, entrants: dict[str, EntrantFactory], mode: str = 'round-robin', master_seed: int = 0,
+                 max_pairs: int = 1000, batch_pairs: int = BATCH_PAIRS, elo0: float = 0.0, elo1: float = 20.0,
+                 alpha: float = 0.05, beta: float = 0.05, rule: Rule = standard_rule, max_turns: int = MAX_TURNS,
+                 path: str | PathLike | None = None):
+        """
+        :param master_seed: seeds of every pair are derived from it and the entrant names
+        :param max_pairs: pairs played at most per pairing
+        :param batch_pairs: pairs sent to a worker at once, SPRT is checked after each batch
+        :param elo0: Elo difference under H0
+        :param elo1: Elo difference under H1
+        :param alpha: false positive rate
+        :param beta: false negative rate
+        :param max_turns: steps before a game is called a draw
+        :param path: NDJSON file results are appended to, and read back from to resume
+        """
+        if len(entrants) < 2:
+            raise ValueError('A tournament needs at least two entrants')
+        if mode not in ('round-robin', 'gauntlet'):
+            raise ValueError(f'Unknown tournament mode {mode!r}')
+        self.entrants = entrants
+        self.mode = mode
+        self.master_seed = master_seed
+        self.max_pairs = max_pairs
+        self.batch_pairs = batch_pairs
+        self.elo0 = elo0
+        self.elo1 = elo1
+        self.alpha = alpha
+        self.beta = beta
+        self.rule = rule
+        self.max_turns = max_turns
+        self.path = path
+        self.results = {pairing: PairingResult(*pairing) for pairing in self.pairings()}
+        if path is not None:
+            self._load(path)
+
+    def pairings(self) -> list[tuple[str, str]]:
+        names = list(self.entrants)
+        if self.mode == 'gauntlet':
+            return [(names[0], other) for other in names[1:]]
+        return [(first, second) for idx, first in enumerate(names) for second in names[idx + 1:]]
+
+    def seeds(self, pairing: tuple[str, str], batch: int) -> list[int]:
+        start = batch * self.batch_pairs
+        stop = min(start + self.batch_pairs, self.max_pairs)
+        return [derive_seed(self.master_seed, *pairing, idx) for idx in range(start, stop)]
+
+    def _load(self, path: str | PathLike):
+        try:
+            file = open(path, encoding='utf-8')
+        except FileNotFoundError:
+            return
+        with file:
+            for line in file:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                result = self.results.get((entry['first'], entry['second']))
+                if result is not None:
+                    result.pairs[entry['batch']] = entry['pairs']
+        for result in self.results.values():
+            self._decide(result)
+
+    def _save(self, result: PairingResult, batch: int):
+        if self.path is None:
+            return
+        entry = {'first': result.first, 'second': result.second, 'batch': batch, 'pairs': result.pairs[batch]}
+        with open(self.path, 'a', encoding='utf-8') as file:
+            file.write(json.dumps(entry) + '\n')
+
+    def _decide(self, result: PairingResult):
+        lower, upper = sprt_bounds(self.alpha, self.beta)
+        llr = sprt_llr(result.pair_scores(), self.elo0, self.elo1)
+        if llr >= upper:
+            result.decision = 'H1'
+        elif llr <= lower:
+            result.decision = 'H0'
+
+    def _pending(self) -> Iterator[tuple[PairingResult, int]]:
+        """
+        batches still to play, interleaving pairings so early stops free the pool for the others
+        """
+        n_batches = math.ceil(self.max_pairs / self.batch_pairs)
+        for batch in range(n_batches):
+            for result in self.results.values():
+                if result.decision is None and batch not in result.pairs:
+                    yield result, batch
+
+    def run(self, workers: int | None = None) -> dict[tuple[str, str], PairingResult]:
+        """
+        play the pairings, skipping batches already in the results file
+        :param workers: number of worker processes, None for one per core. 1 plays in the current process
+        :return: results per pairing
+        """
+        if workers == 1:
+            for result, batch in self._pending():
+                if result.decision is None:
+                    self._record(result, batch, play_pair_batch(
+                        self.entrants[result.first], self.entrants[result.second],
+                        self.seeds((result.first, result.second), batch), self.rule, self.max_turns))
+            return self.results
+
+        limit = 2 * (workers or os.cpu_count() or 1)  # batches in flight, so a decision stops its pairing soon
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = self._pending()
+            running: dict[Future, tuple[PairingResult, int]] = {}
+            while True:
+                for result, batch in pending:
+                    if result.decision is not None:
+                        continue
+                    future = executor.submit(play_pair_batch, self.entrants[result.first],
+                                             self.entrants[result.second],
+                                             self.seeds((result.first, result.second), batch), self.rule,
+                                             self.max_turns)
+                    running[future] = (result, batch)
+                    if len(running) >= limit:
+                        break
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result, batch = running.pop(future)
+                    self._record(result, batch, future.result())
+        return self.results
+
+    def _record(self, result: PairingResult, batch: int, pairs: list[list[int]]):
+        result.pairs[batch] = pairs
+        self._save(result, batch)
+        self._decide(result)
+
+    def ratings(self, k: float = ELO_K) -> dict[str, float]:
+        """
+        Elo ratings from all games played, updated game by game in a fixed order so they do not depend on
+        completion order
+        :param k: update factor
+        :return: rating per entrant
+        """
+        ratings = dict.fromkeys(self.entrants, INITIAL_ELO)
+        streams = {pairing: result.games_in_order() for pairing, result in self.results.items()}
+        while streams:
+            for pairing, games in list(streams.items()):
+                score = next(games, None)
+                if score is None:
+                    del streams[pairing]
+                    continue
+                first, second = pairing
+                delta = k * (score - expected_score(ratings[first] - ratings[second]))
+                ratings[first] += delta
+                ratings[second] -= delta
+        return ratings
@@ -0,0 +1,124 @@
+"""
+Compact binary snapshots of a `Context`, to suspend tables and resume them later, without pickle.
+
+A snapshot is a `HEADER` (magic, version, player count, options, parts present, round counter, stream seed),
+the Mersenne Twister state of the rng, then the scoreboard and the round if present. Cards are one byte each,
+their id in `base.CARD_INDEX`. Event sinks are not part of the state, a restored context has none.
+"""
+import random
+import struct
+
+from .engine.context import Context, Round
+from .engine.events import EventEmitter
+from .engine.hand import CardIndex, CompactHand
+from .engine.rng import RngStream
+from .rules import base
+
+MAGIC: bytes = b'UNOC'
+VERSION: int = 1
+HEADER: struct.Struct = struct.Struct('<4sBBBBiQ')  # magic, version, player count, options, parts, rounds, seed
+RNG: struct.Struct = struct.Struct('<625I')  # Mersenne Twister state and position
+GAUSS: struct.Struct = struct.Struct('<d')
+ROUND: struct.Struct = struct.Struct('<IBBHH')  # turns, last card, current player, effects, unshuffled
+PILE: struct.Struct = struct.Struct('<H')  # pile length, followed by its card ids
+
+# options
+COMPACT_HANDS: int = 1
+ROUND_STREAMS: int = 2
+LAZY_SHUFFLE: int = 4
+REUSE_ROUNDS: int = 8
+# parts present
+HAS_SCOREBOARD: int = 1
+HAS_ROUND: int = 2
+HAS_GAUSS: int = 4
+
+
+def snapshot(ctx: Context, index: CardIndex = base.CARD_INDEX) -> bytes:
+    """
+    :param ctx:
+    :param index: card id space of the rule
+    :return: the snapshot
+    """
+    round_ = ctx.current_round
+    options = ((COMPACT_HANDS if ctx.compact_hands else 0) | (ROUND_STREAMS if ctx.round_streams else 0)
+               | (LAZY_SHUFFLE if ctx.lazy_shuffle else 0) | (REUSE_ROUNDS if ctx.reuse_rounds else 0))
+    _, state, gauss = ctx.rng.getstate()
+    parts = ((HAS_SCOREBOARD if ctx.scoreboard is not None else 0) | (HAS_ROUND if round_ is not None else 0)
+             | (HAS_GAUSS if gauss is not None else 0))
+    chunks = [HEADER.pack(MAGIC, VERSION, ctx.player_count, options, parts, ctx.rounds, ctx.streams.seed),
+              RNG.pack(*state)]
+    if gauss is not None:
+        chunks.append(GAUSS.pack(gauss))
+    if ctx.scoreboard is not None:
+        chunks.append(struct.pack(f'<{ctx.player_count}i', *ctx.scoreboard))
+    if round_ is not None:
+        ids = index.ids.__getitem__
+        chunks.append(ROUND.pack(round_.turns, ids(round_.last_card), round_.current_player, round_.effects,
+                                 round_.unshuffled))
+        for pile in (round_.draw, round_.discard, *round_.hands):
+            chunks.append(PILE.pack(len(pile)))
+            chunks.append(bytes(map(ids, pile)))
+    return b''.join(chunks)
+
+
+def restore(data: bytes | memoryview, index: CardIndex = base.CARD_INDEX) -> Context:
+    """
+    rebuild a context from a snapshot. It continues exactly like the context the snapshot was taken from
+    :param data:
+    :param index: card id space of the rule
+    :return: a new context
+    """
+    data = memoryview(data)
+    magic, version, n_players, options, parts, rounds, seed = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f'Unsupported context snapshot {bytes(magic)!r} version {version}')
+    ctx = Context.__new__(Context)
+    ctx.player_count = n_players
+    ctx.compact_hands = bool(options & COMPACT_HANDS)
+    ctx.round_streams = bool(options & ROUND_STREAMS)
+    ctx.lazy_shuffle = bool(options & LAZY_SHUFFLE)
+    ctx.reuse_rounds = bool(options & REUSE_ROUNDS)
+    ctx.rounds = rounds
+    ctx.streams = RngStream(seed)
+    ctx.events = EventEmitter()
+
+    offset = HEADER.size
+    state = RNG.unpack_from(data, offset)
+    offset += RNG.size
+    gauss = None
+    if parts & HAS_GAUSS:
+        gauss, = GAUSS.unpack_from(data, offset)
+        offset += GAUSS.size
+    ctx.rng = random.Random.__new__(random.Random)  # skips seeding from the OS, the state is set right after
+    ctx.rng.setstate((3, state, gauss))
+
+    ctx.scoreboard = None
+    if parts & HAS_SCOREBOARD:
+        ctx.scoreboard = list(struct.unpack_from(f'<{n_players}i', data, offset))
+        offset += 4 * n_players
+
+    ctx.current_round = None
+    if parts & HAS_ROUND:
+        turns, last_card, current_player, effects, unshuffled = ROUND.unpack_from(data, offset)
+        offset += ROUND.size
+        cards = index.cards.__getitem__
+        piles = []
+        for _ in range(2 + n_players):
+            size, = PILE.unpack_from(data, offset)
+            offset += PILE.size
+            piles.append(list(map(cards, data[offset:offset + size])))
+            offset += size
+        hands = piles[2:]
+        if ctx.compact_hands:
+            hands = [CompactHand(index, hand) for hand in hands]
+        round_ = Round(piles[0], piles[1], hands)
+        round_.turns = turns
+        round_.last_card = index.cards[last_card]
+        round_.current_player = current_player
+        round_.effects = effects
+        round_.unshuffled = unshuffled
+        base.value_hands(round_)
+        ctx.current_round = round_
+    if offset != len(data):
+        raise ValueError('Trailing data after the context snapshot')
+    return ctx
@@ -0,0 +1,35 @@
+"""
+Helpers shared by the tests that play random moves and compare whole contexts
+"""
+import random
+
+from uno.engine.context import Context
+from uno.rules import base
+
+COLORS: tuple[str, ...] = ('red', 'blue', 'green', 'yellow')
+
+
+def context_state(ctx: Context, settings: bool = False) -> tuple:
+    """
+    everything a step can change, comparable with `==`
+    :param settings: also compare what the context was created with, e.g. after a snapshot restore
+    """
+    round_ = ctx.current_round
+    created = (ctx.player_count, ctx.compact_hands, ctx.round_streams, ctx.lazy_shuffle, ctx.reuse_rounds,
+               ctx.streams.seed) if settings else ()
+    return created + (
+        ctx.scoreboard[:], ctx.rounds, ctx.rng.getstate(),
+        round_.draw[:], round_.discard[:], [list(hand) for hand in round_.hands],
+        round_.turns, round_.last_card, round_.current_player, round_.effects, round_.unshuffled,
+        round_.hand_points[:],
+    )
+
+
+def random_move(ctx: Context, rng: random.Random, legal_moves=base.legal_moves):
+    """
+    a legal card 70% of the time when there is one, a draw otherwise
+    """
+    legal = legal_moves(ctx, ctx.current_round.current_player)
+    if legal and rng.random() < 0.7:
+        return (rng.choice(legal), rng.choice(COLORS))
+    return (None,)
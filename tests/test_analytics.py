@@ -0,0 +1,102 @@
+import pickle
+import random
+import statistics
+
+import pytest
+
+from uno.analytics import (Counts, EventStats, Histogram, Mean, QuantileSketch, analyze, collect, live_events,
+                           ndjson_events, only, record_events, seeded_games)
+from uno.engine.events import CARD_PLAYED, ROUND_SCORED, NDJSONSink
+from uno.engine.game import Game
+from uno.engine.player import RandomPlayer
+from uno.record import RecordWriter
+from uno.rules.base import rule
+from uno.sim import simulate
+
+
+def test_mean_merge_matches_single_pass():
+    rng = random.Random(0)
+    values = [rng.gauss(10, 3) for _ in range(1000)]
+    parts = [Mean(), Mean(), Mean()]
+    for idx, value in enumerate(values):
+        parts[idx % 3].add(value)
+    merged = parts[0].merge(parts[1]).merge(parts[2])
+    assert merged.count == 1000
+    assert abs(merged.mean - statistics.fmean(values)) < 1e-9
+    assert abs(merged.variance - statistics.pvariance(values)) < 1e-6
+
+
+def test_quantile_sketch_relative_error():
+    rng = random.Random(1)
+    values = [rng.expovariate(0.01) for _ in range(20000)] + [0] * 100
+    first, second = QuantileSketch(0.01), QuantileSketch(0.01)
+    for idx, value in enumerate(values):
+        (first if idx % 2 else second).add(value)
+    sketch = pickle.loads(pickle.dumps(first)).merge(second)
+    ordered = sorted(values)
+    for q in (0.1, 0.5, 0.9, 0.99):
+        exact = ordered[int(q * (len(ordered) - 1))]
+        assert abs(sketch.quantile(q) - exact) <= 0.02 * exact
+    assert len(sketch.buckets) < 2000
+
+
+def test_counts_and_histogram_merge():
+    counts, other = Counts(), Counts()
+    counts.add('a')
+    other.add('a', 2)
+    other.add('b')
+    assert counts.merge(other)['a'] == 3 and counts.total == 4
+    histogram = Histogram([1, 2, 4])
+    for value in (0, 1, 1.5, 3, 10):
+        histogram.add(value)
+    assert histogram.merge(Histogram([1, 2, 4])).counts == [1, 2, 1, 1]
+
+
+def test_event_stats_agree_with_simulator():
+    stats = collect(live_events(seeded_games(6, 3, master_seed=2)), 3)
+    expected = simulate(6, 3, master_seed=2, workers=1)
+    assert stats.games == 6
+    assert stats.rounds == expected.rounds
+    assert stats.game_wins == expected.wins
+    assert abs(stats.turns.mean * stats.rounds - expected.turns) < 1e-6
+    assert stats.plays.total > 0 and stats.chains.counts[1:] != [0] * 8
+
+
+def test_analyze_merges_across_workers():
+    single = analyze(8, 2, master_seed=5, workers=1, chunk_size=3)
+    pooled = analyze(8, 2, master_seed=5, workers=2, chunk_size=3)
+    assert pooled.summary()['win_rates'] == single.summary()['win_rates']
+    assert pooled.plays.counts == single.plays.counts
+    assert pooled.turns_quantiles.buckets == single.turns_quantiles.buckets
+    assert pooled.chains.counts == single.chains.counts
+
+
+def test_stored_sources(tmp_path):
+    events_path, record_path = tmp_path / 'events.ndjson', tmp_path / 'games.unor'
+    with RecordWriter(record_path) as writer:
+        for seed in range(3):
+            sink = NDJSONSink(events_path)
+            game = Game(rule, n_players=2, seed=seed, recorder=writer, sinks=[sink])
+            game.players = [RandomPlayer('0'), RandomPlayer('1')]
+            game.start()
+            sink.close()
+    live = collect(live_events(seeded_games(0, 2)), 2)
+    assert live.games == 0
+    from_log = collect(ndjson_events([events_path]), 2)
+    from_records = collect(record_events(record_path), 2)
+    assert from_log.games == from_records.games == 3
+    assert from_log.game_wins == from_records.game_wins
+    assert from_log.plays.counts == from_records.plays.counts
+    assert all(event.kind == ROUND_SCORED for event in only(record_events(record_path), ROUND_SCORED))
+    assert next(only(ndjson_events([events_path], kinds=CARD_PLAYED), CARD_PLAYED)).kind == CARD_PLAYED
+
+
+def test_event_stats_pickle_and_reject_unfinished_merge():
+    stats = EventStats(2)
+    restored = pickle.loads(pickle.dumps(collect(live_events(seeded_games(2, 2)), 2)))
+    assert stats.merge(restored).games == 2
+    unfinished = EventStats(2)
+    for event in live_events(seeded_games(1, 2)):
+        unfinished.add(event)
+    with pytest.raises(ValueError):
+        stats.merge(unfinished)
@@ -0,0 +1,77 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from uno.engine.context import Context
+from uno.rules.base import CARD_INDEX, COLORS, game_is_over, init_game, is_playable, step
+from uno.rules.batch import NO_CARD, BatchEngine
+
+
+def _assert_same(batch, game, ctx):
+    exported = batch.to_context(game)
+    expected, actual = ctx.current_round, exported.current_round
+    assert actual.draw == expected.draw
+    assert actual.discard == expected.discard
+    assert actual.hands == expected.hands
+    assert actual.last_card == expected.last_card
+    assert actual.current_player == expected.current_player
+    assert actual.turns == expected.turns
+    assert actual.effects == expected.effects
+    assert exported.scoreboard == ctx.scoreboard
+    assert exported.rounds == ctx.rounds
+    assert exported.rng.getstate() == ctx.rng.getstate()
+
+
+@pytest.mark.parametrize('n_players', [2, 4])
+def test_batch_matches_reference(n_players):
+    seeds = list(range(6))
+    batch = BatchEngine(len(seeds), n_players, seeds)
+    contexts = [Context(n_players, seed=seed, compact_hands=True) for seed in seeds]
+    for ctx in contexts:
+        init_game(ctx)
+    choice = np.random.default_rng(0)
+
+    for turn in range(3000):
+        # play any held card, playable or not, or draw
+        held = batch.hands[np.arange(batch.n_games), batch.current_player] > 0
+        cards = np.full(batch.n_games, NO_CARD)
+        for game in range(batch.n_games):
+            options = np.flatnonzero(held[game])
+            if len(options) and choice.random() < 0.8:
+                cards[game] = choice.choice(options)
+        colors = choice.integers(0, 4, batch.n_games)
+
+        batch.step_batch(cards, colors)
+        for game, ctx in enumerate(contexts):
+            move = (None,) if cards[game] == NO_CARD else (CARD_INDEX.decode(int(cards[game])), COLORS[colors[game]])
+            step(ctx, move)
+            if game_is_over(ctx):
+                init_game(ctx)
+
+        if turn % 97 == 0:
+            for game, ctx in enumerate(contexts):
+                _assert_same(batch, game, ctx)
+    assert batch.rounds.sum() > 0
+
+
+def test_legal_mask_matches_reference():
+    batch = BatchEngine(4, 3, [1, 2, 3, 4])
+    for _ in range(50):
+        mask = batch.legal_mask()
+        for game in range(batch.n_games):
+            ctx = batch.to_context(game)
+            round_ = ctx.current_round
+            expected = {CARD_INDEX.encode(card) for card in round_.hands[round_.current_player]
+                        if is_playable(ctx, card)}
+            assert set(np.flatnonzero(mask[game]).tolist()) == expected
+        cards = np.array([np.flatnonzero(row)[0] if row.any() else NO_CARD for row in mask])
+        batch.step_batch(cards)
+
+
+def test_rejects_cards_not_in_hand():
+    batch = BatchEngine(1, 2, [0])
+    held = batch.hands[0, batch.current_player[0]]
+    missing = np.flatnonzero(held == 0)[0]
+    batch.last_card[0] = missing  # make the card playable
+    with pytest.raises(ValueError):
+        batch.step_batch(np.array([missing]))
@@ -0,0 +1,261 @@
+import random
+import threading
+
+import pytest
+from uno.bots import EndgamePlayer, EndgameSolver, ISMCTSPlayer, MoveAnalyzer, TranspositionTable, determinize
+from uno.bots.analysis import wilson_interval
+from uno.bots.ismcts import available_moves, round_winner
+from uno.engine.context import Card, Context
+from uno.engine.game import Game
+from uno.engine.player import RandomPlayer
+from uno.rules.base import build_deck, init_game, legal_moves, rule, step, value_hands
+from uno.rules.journal import make_move, unmake_move
+
+
+def test_determinize_keeps_public_state():
+    ctx = Context(3, seed=2)
+    init_game(ctx)
+    world = determinize(ctx, 1, random.Random(0))
+    real, sampled = ctx.current_round, world.current_round
+    assert sampled.hands[1] == real.hands[1]
+    assert sampled.discard == real.discard
+    assert [len(hand) for hand in sampled.hands] == [len(hand) for hand in real.hands]
+    assert len(sampled.draw) == len(real.draw)
+    cards = sampled.draw + sampled.discard + [card for hand in sampled.hands for card in hand]
+    assert sorted(cards, key=str) == sorted(build_deck(), key=str)
+    assert sampled.hands[0] != real.hands[0] or sampled.draw != real.draw
+
+
+def _play(bot_factory, seed=0):
+    game = Game(rule, n_players=2, seed=seed)
+    bot = bot_factory(game.context)
+    game.players = [bot, RandomPlayer('1')]
+    game.rule.init_game(game.context)
+    for _ in range(30):
+        request = game.build_request(game.context.current_round.current_player)
+        player = game.players[game.context.current_round.current_player]
+        game.history.append(game.context.current_round.current_player, game.context.rounds,
+                            game.rule.step(game.context, player.play(request)))
+    return bot
+
+
+def test_ismcts_iteration_budget_and_reuse():
+    bot = _play(lambda ctx: ISMCTSPlayer('0', ctx, iterations=30, seed=1))
+    assert bot.telemetry
+    assert all(stats.iterations == 30 for stats in bot.telemetry)
+    assert all(stats.nodes > 0 for stats in bot.telemetry)
+    assert any(stats.reused for stats in bot.telemetry)
+
+
+def test_ismcts_time_budget():
+    bot = _play(lambda ctx: ISMCTSPlayer('0', ctx, iterations=None, time_limit=0.01, seed=1))
+    assert all(stats.elapsed < 0.1 for stats in bot.telemetry)
+    assert all(stats.iterations > 0 for stats in bot.telemetry)
+
+
+def test_ismcts_root_parallel():
+    bot = _play(lambda ctx: ISMCTSPlayer('0', ctx, iterations=20, workers=2, seed=1))
+    bot.close()
+    assert all(stats.iterations == 20 for stats in bot.telemetry)
+
+
+def test_ismcts_drops_tree_after_auto_played_draw():
+    for seed in range(50):
+        game = Game(rule, n_players=2, seed=seed)
+        bot = ISMCTSPlayer('0', game.context, iterations=20, seed=1)
+        game.players = [bot, RandomPlayer('1')]
+        game.rule.init_game(game.context)
+        if game.context.current_round.current_player != 0:
+            continue
+        game.apply(0, bot.play(game.build_request(0)))
+        hand_size = len(game.context.current_round.hands[1])
+        result = game.apply(1, (None,))
+        if result[0] is None or len(game.context.current_round.hands[1]) != hand_size:
+            continue  # not an auto-played draw
+        bot.play(game.build_request(0))
+        assert not bot.last_stats.reused
+        return
+    raise AssertionError('no auto-played draw found')
+
+
+def test_ismcts_root_parallel_time_budget():
+    bot = _play(lambda ctx: ISMCTSPlayer('0', ctx, iterations=None, time_limit=0.05, workers=2, seed=1))
+    bot.close()
+    # the first move includes starting the pool, it still has to fit in the budget
+    assert all(stats.elapsed < 0.05 + 0.05 for stats in bot.telemetry)
+
+
+def _endgame(seed, limit=2):
+    """
+    play random moves until every hand holds at most `limit` cards, None if the round ends first
+    """
+    ctx = Context(2, seed=seed)
+    init_game(ctx)
+    rng = random.Random(seed)
+    while round_winner(ctx) is None:
+        round_ = ctx.current_round
+        if max(len(hand) for hand in round_.hands) <= limit:
+            return ctx
+        legal = legal_moves(ctx, round_.current_player)
+        step(ctx, (rng.choice(legal), 'red') if legal else (None,))
+    return None
+
+
+def _minimax(ctx, root, depth):
+    winner = round_winner(ctx)
+    if winner is not None:
+        return 1.0 if winner == root else -1.0
+    if depth == 0:
+        hands = ctx.current_round.hands
+        mine, other = len(hands[root]), len(hands[1 - root])
+        return 0.5 * (other - mine) / (other + mine + 1)
+    values = []
+    for move in available_moves(ctx):
+        _, journal = make_move(ctx, move)
+        values.append(_minimax(ctx, root, depth - 1))
+        unmake_move(ctx, journal)
+    return max(values) if ctx.current_round.current_player == root else min(values)
+
+
+def test_endgame_solver_finds_winning_card():
+    ctx = Context(2, seed=0)
+    init_game(ctx)
+    round_ = ctx.current_round
+    round_.hands[0] = [Card('blue', 3)]
+    round_.hands[1] = [Card('green', 1), Card('yellow', 2)]
+    round_.last_card = Card('blue', 7)
+    round_.current_player = 0
+    value_hands(round_)
+    move, stats = EndgameSolver(2).solve(ctx)
+    assert move == (Card('blue', 3),)
+    assert stats.solved and stats.value == 1.0
+
+
+def test_endgame_solver_agrees_with_minimax():
+    solved = 0
+    for seed in range(40):
+        ctx = _endgame(seed)
+        if ctx is None:
+            continue
+        before = [list(hand) for hand in ctx.current_round.hands], ctx.current_round.draw[:]
+        move, stats = EndgameSolver(2).solve(ctx, node_budget=20_000)
+        assert ([list(hand) for hand in ctx.current_round.hands], ctx.current_round.draw) == before
+        assert move in available_moves(ctx)
+        if stats.solved:
+            solved += 1
+            assert _minimax(ctx, ctx.current_round.current_player, stats.depth) == stats.value
+    assert solved >= 5
+
+
+def test_endgame_solver_budgets():
+    ctx = next(ctx for seed in range(100) if (ctx := _endgame(seed, limit=3)) is not None)
+    solver = EndgameSolver(2)
+    _, stats = solver.solve(ctx, node_budget=500)
+    assert stats.nodes <= 501
+    assert stats.probes >= stats.hits
+    _, stats = solver.solve(ctx, node_budget=None, time_limit=0.02)
+    assert stats.elapsed < 0.1
+    assert stats.node_rate > 0
+
+
+def test_transposition_table_replacement():
+    table = TranspositionTable(4)
+    table.store(1, 5, 0.5, 0, None)
+    table.store(5, 2, 0.1, 0, None)  # same slot, shallower: kept out
+    assert table.probe(1)[1] == 5 and table.probe(5) is None
+    table.new_search()
+    table.store(5, 2, 0.1, 0, None)  # the deep entry is from an older search
+    assert table.probe(5) is not None and table.probe(1) is None
+
+
+def test_endgame_player_switches_to_solver():
+    for seed in range(20):
+        game = Game(rule, n_players=2, seed=seed)
+        bot = EndgamePlayer('0', game.context, RandomPlayer('0', seed=1), threshold=3, node_budget=2000, seed=1)
+        game.players = [bot, RandomPlayer('1', seed=2)]
+        game.begin()
+        while game.context.rounds == 0:
+            idx = game.context.current_round.current_player
+            game.apply(idx, game.players[idx].play(game.build_request(idx)))
+        if bot.telemetry:
+            assert all(stats.nodes > 0 and 0 <= stats.hit_rate <= 1 for stats in bot.telemetry)
+            return
+    raise AssertionError('the solver was never used')
+
+
+def test_wilson_interval():
+    assert wilson_interval(0, 0) == (0.0, 1.0)
+    low, high = wilson_interval(5, 10)
+    assert low == pytest.approx(1 - high) and low < 0.5 < high
+    low, high = wilson_interval(8, 10)
+    assert low == pytest.approx(0.490, abs=1e-3) and high == pytest.approx(0.943, abs=1e-3)
+    assert wilson_interval(0, 20)[0] == pytest.approx(0.0) and wilson_interval(20, 20)[1] == pytest.approx(1.0)
+    assert wilson_interval(30, 100, 0.99)[0] < wilson_interval(30, 100, 0.9)[0]
+
+
+def test_analyzer_finds_winning_card():
+    ctx = Context(2, seed=0)
+    init_game(ctx)
+    round_ = ctx.current_round
+    round_.hands[0] = [Card('blue', 3), Card('red', 5)]
+    round_.hands[1] = [Card('green', 1), Card('yellow', 2)]
+    round_.last_card = Card('blue', 7)
+    round_.current_player = 0
+    value_hands(round_)
+    with MoveAnalyzer() as analyzer:
+        analysis = analyzer.analyze(ctx, 0, worlds=40, seed=1)
+    assert analysis.complete and analysis.worlds == 40
+    assert {estimate.move for estimate in analysis.estimates} == set(available_moves(ctx))
+    assert all(estimate.rollouts == 40 for estimate in analysis.estimates)
+    best = analysis.best
+    assert best.move == (Card('blue', 3),)
+    assert best.low <= best.win_rate <= best.high
+    with pytest.raises(ValueError):
+        MoveAnalyzer().analyze(ctx, 1)
+
+
+def test_analyzer_is_reproducible_across_workers():
+    ctx = _endgame(3, limit=5)
+    observer = ctx.current_round.current_player
+    with MoveAnalyzer() as analyzer:
+        serial = analyzer.analyze(ctx, observer, worlds=24, seed=7)
+        assert [(e.move, e.wins) for e in analyzer.analyze(ctx, observer, worlds=24, seed=7).estimates] == \
+            [(e.move, e.wins) for e in serial.estimates]
+    with MoveAnalyzer(workers=2, batch=5) as analyzer:
+        parallel = analyzer.analyze(ctx, observer, worlds=24, seed=7)
+    assert parallel.complete
+    assert [(e.move, e.wins) for e in parallel.estimates] == [(e.move, e.wins) for e in serial.estimates]
+
+
+def test_analyzer_stops_anytime():
+    ctx = _endgame(3, limit=5)
+    observer = ctx.current_round.current_player
+    cancel = threading.Event()
+    cancel.set()
+    with MoveAnalyzer() as analyzer:
+        analysis = analyzer.analyze(ctx, observer, worlds=100, cancel=cancel)
+        assert analysis.worlds == 0 and not analysis.complete
+        assert all((e.low, e.high) == (0.0, 1.0) for e in analysis.estimates)
+        analysis = analyzer.analyze(ctx, observer, worlds=10 ** 6, time_limit=0.05)
+        assert 0 < analysis.worlds < 10 ** 6 and analysis.elapsed < 1.0
+    with MoveAnalyzer(workers=2) as analyzer:
+        analysis = analyzer.analyze(ctx, observer, worlds=10 ** 6, time_limit=0.1)
+        assert not analysis.complete and analysis.elapsed < 2.0
+
+
+def test_ismcts_drops_tree_of_reused_round():
+    game = Game(rule, 2, seed=1, reuse_rounds=True)
+    bot = ISMCTSPlayer('0', game.context, iterations=50, seed=0)
+    game.players = [bot, RandomPlayer('1')]
+    game.begin()
+    ctx = game.context
+    round_ = ctx.current_round
+    while ctx.current_round.current_player != 0:
+        game.apply(1, (None,))
+    game.apply(0, bot.play(game.build_request(0)))
+    ctx.rounds += 1  # as if a new round had been dealt into the same object
+    while ctx.current_round.current_player != 0:
+        game.apply(1, (None,))
+    bot.play(game.build_request(0))
+    assert ctx.current_round is round_
+    assert not bot.last_stats.reused
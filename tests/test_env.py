@@ -0,0 +1,102 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from uno.engine.context import Card
+from uno.engine.game import Game
+from uno.engine.player import Request
+from uno.env import DRAW_ACTION, N_ACTIONS, ObservationEncoder, VectorEnv, decode_action, encode_action
+from uno.rules.base import CARD_INDEX, rule
+from uno.env.encoding import WILD_SYMBOLS
+from uno.rules.effects import REVERSED, SKIP_PENDING, with_draws
+
+
+WILD_CARDS = {('wild', symbol) for symbol in WILD_SYMBOLS}
+
+
+def test_encode_request_features():
+    encoder = ObservationEncoder(3)
+    hand = [Card('red', 5), Card('blue', 'skip'), Card('wild', 'wild')]
+    request = Request(hand, [3, 7, 4], [0, 0, 0], [], Card('red', 2), [Card('red', 5), Card('wild', 'wild')],
+                      effects=with_draws(REVERSED, 2))
+    observation, mask = encoder.encode(request, 1)
+    assert observation[encoder.hand:encoder.top_card].sum() == 3
+    assert observation[encoder.hand + CARD_INDEX.encode(Card('blue', 'skip'))] == 1
+    assert observation[encoder.top_card + CARD_INDEX.encode(Card('red', 2))] == 1
+    assert observation[encoder.top_card:encoder.hand_sizes].sum() == 1
+    assert observation[encoder.hand_sizes:encoder.skip].tolist() == [4, 3]  # seats 2 then 0
+    assert observation[encoder.skip] == 0 and observation[encoder.draws] == 2 and observation[encoder.reversed] == 1
+    assert mask.sum() == 1 + 4 + 1  # the red 5, the wild card once per color, drawing
+    green_wild = encode_action((Card('wild', 'wild'), 'green'))
+    assert mask[green_wild] and mask[DRAW_ACTION] and mask[CARD_INDEX.encode(Card('red', 5))]
+    assert decode_action(green_wild) == (Card('wild', 'wild'), 'green')
+    assert decode_action(DRAW_ACTION) == (None,)
+    for action in range(N_ACTIONS):
+        card = decode_action(action)[0]
+        assert encode_action(decode_action(action)) == action or (card.color, card.symbol) in WILD_CARDS
+
+
+def test_encode_batch_matches_single_requests():
+    games = [Game(rule, n_players=4, seed=seed) for seed in range(8)]
+    requests, seats = [], []
+    for game in games:
+        game.begin()
+        seat = game.context.current_round.current_player
+        requests.append(game.build_request(seat))
+        seats.append(seat)
+    batch_encoder, single_encoder = ObservationEncoder(4, capacity=8), ObservationEncoder(4)
+    observations, masks = batch_encoder.encode_batch(requests, seats)
+    assert observations.shape == (8, batch_encoder.n_features) and masks.shape == (8, N_ACTIONS)
+    assert np.shares_memory(observations, batch_encoder.observations)
+    for row, (request, seat) in enumerate(zip(requests, seats)):
+        observation, mask = single_encoder.encode(request, seat)
+        assert (observation == observations[row]).all() and (mask == masks[row]).all()
+    with pytest.raises(ValueError):
+        ObservationEncoder(4, capacity=2).encode_batch(requests, seats)
+
+
+def test_masked_actions_are_legal():
+    game = Game(rule, n_players=2, seed=3)
+    game.begin()
+    encoder = ObservationEncoder(2)
+    for _ in range(200):
+        seat = game.context.current_round.current_player
+        request = game.build_request(seat)
+        _, mask = encoder.encode(request, seat)
+        actions = np.flatnonzero(mask)
+        assert all(decode_action(action)[0] in request.legal_moves for action in actions if action != DRAW_ACTION)
+        if request.effects & SKIP_PENDING:
+            assert actions.tolist() == [DRAW_ACTION]
+        game.apply(seat, decode_action(int(actions[0])))
+
+
+def _run_env(env, steps, seed=0):
+    rng = np.random.default_rng(seed)
+    observations, masks = env.reset()
+    trace = [observations.copy()]
+    rewards_seen, dones_seen = [], 0
+    for _ in range(steps):
+        actions = np.array([rng.choice(np.flatnonzero(mask)) for mask in masks])
+        observations, masks, rewards, dones = env.step(actions)
+        assert masks[:, DRAW_ACTION].all()
+        assert (rewards[~dones] == 0).all()
+        rewards_seen.extend(rewards[dones].tolist())
+        dones_seen += int(dones.sum())
+        trace.append(observations.copy())
+    return trace, rewards_seen, dones_seen
+
+
+def test_vector_env_plays_and_resets_rounds():
+    with VectorEnv(6, n_players=3, workers=2, seed=4, seat=1) as env:
+        assert env.observations.shape == (6, env.n_features)
+        _, rewards, dones = _run_env(env, 150)
+        assert dones > 0
+        assert set(rewards) <= {-1.0, 0.0, 1.0} and {-1.0, 1.0} & set(rewards)
+        env.step(np.full(6, -1))  # invalid actions draw
+
+
+def test_vector_env_is_reproducible_across_worker_counts():
+    with VectorEnv(4, seed=9, workers=1) as first, VectorEnv(4, seed=9, workers=2) as second:
+        first_trace, _, _ = _run_env(first, 40)
+        second_trace, _, _ = _run_env(second, 40)
+    assert all((a == b).all() for a, b in zip(first_trace, second_trace))
@@ -0,0 +1,68 @@
+import json
+import pickle
+
+from uno.engine.events import (ALL_EVENTS, CARD_DRAWN, CARD_PLAYED, ROUND_SCORED, ROUND_STARTED, EventEmitter,
+                               NDJSONSink, NullSink, RingSink)
+from uno.engine.game import Game
+from uno.engine.player import RandomPlayer
+from uno.rules.base import rule
+
+
+def play(seed, sinks):
+    game = Game(rule, n_players=3, seed=seed, sinks=sinks)
+    game.players = [RandomPlayer(str(i)) for i in range(3)]
+    game.start()
+    return game
+
+
+def test_ring_sink_collects_game_events():
+    ring = RingSink(capacity=None)
+    game = play(4, [ring])
+    kinds = {event.kind for event in ring}
+    assert {ROUND_STARTED, CARD_PLAYED, CARD_DRAWN, ROUND_SCORED} <= kinds
+    scored = [event for event in ring if event.kind == ROUND_SCORED]
+    totals = [0] * 3
+    for event in scored:
+        totals[event.player] += event.data[0]
+    assert totals == game.context.scoreboard
+    assert 'played' in next(event for event in ring if event.kind == CARD_PLAYED).render()
+
+
+def test_subscription_mask():
+    emitter = EventEmitter()
+    assert emitter.mask == 0
+    drawn = RingSink(kinds=CARD_DRAWN)
+    emitter.subscribe(drawn)
+    emitter.subscribe(NullSink(kinds=CARD_PLAYED))
+    assert emitter.mask == CARD_DRAWN | CARD_PLAYED
+    emitter.emit(CARD_PLAYED, 0, 1, None, None)
+    assert len(drawn) == 0
+    emitter.unsubscribe(drawn)
+    assert emitter.mask == CARD_PLAYED
+
+
+def test_ndjson_sink_batches(tmp_path):
+    path = tmp_path / 'events.ndjson'
+    sink = NDJSONSink(path, kinds=ALL_EVENTS, batch_size=1000)
+    ring = RingSink(capacity=None)
+    play(2, [sink, ring])
+    sink.close()
+    lines = path.read_text().splitlines()
+    assert len(lines) == len(ring)
+    assert json.loads(lines[0])[0] == 'round_started'
+
+
+def test_events_do_not_change_the_game():
+    with_sink = play(6, [RingSink()]).context.scoreboard
+    assert with_sink == play(6, []).context.scoreboard
+
+
+def test_context_pickles_without_sinks(tmp_path):
+    sink = NDJSONSink(tmp_path / 'events.ndjson')
+    game = Game(rule, n_players=2, seed=1, sinks=[sink])
+    game.rule.init_game(game.context)
+    copy = pickle.loads(pickle.dumps(game.context))
+    sink.close()
+    assert copy.current_round == game.context.current_round
+    assert copy.rng.getstate() == game.context.rng.getstate()
+    assert copy.events.mask == 0
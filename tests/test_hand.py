@@ -0,0 +1,44 @@
+import pytest
+from uno.engine.context import Context, Card
+from uno.engine.hand import CompactHand
+from uno.rules.base import CARD_INDEX, build_deck, init_game, is_playable, step
+
+
+def test_card_index_round_trip():
+    for card in build_deck():
+        assert CARD_INDEX.decode(CARD_INDEX.encode(card)) == card
+    # recolored wild cards (the effective last card) are encodable as well
+    assert CARD_INDEX.decode(CARD_INDEX.encode(Card('blue', 'wild'))) == Card('blue', 'wild')
+
+
+def test_compact_hand_list_interface():
+    hand = CompactHand(CARD_INDEX, [Card('red', 1), Card('blue', 'skip'), Card('red', 1)])
+    assert len(hand) == 3
+    assert Card('red', 1) in hand
+    hand.remove(Card('red', 1))
+    assert hand.count(Card('red', 1)) == 1
+    assert len(hand) == 2
+    with pytest.raises(ValueError):
+        hand.remove(Card('green', 3))
+    assert sorted(hand.to_list()) == sorted([Card('red', 1), Card('blue', 'skip')])
+
+
+def _first_playable(ctx):
+    round_ = ctx.current_round
+    playable = sorted((card for card in round_.hands[round_.current_player] if is_playable(ctx, card)),
+                      key=CARD_INDEX.encode)
+    return (playable[0], 'green') if playable else (None,)
+
+
+def test_compact_hands_play_like_lists():
+    plain = Context(3, seed=11)
+    compact = Context(3, seed=11, compact_hands=True)
+    init_game(plain)
+    init_game(compact)
+    for _ in range(500):
+        move = _first_playable(plain)
+        assert move == _first_playable(compact)
+        assert step(plain, move) == step(compact, move)
+        assert plain.current_round.draw == compact.current_round.draw
+        for plain_hand, compact_hand in zip(plain.current_round.hands, compact.current_round.hands):
+            assert sorted(plain_hand, key=CARD_INDEX.encode) == compact_hand.to_list()
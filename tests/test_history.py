@@ -0,0 +1,48 @@
+import json
+
+from uno.engine.game import Game
+from uno.engine.history import History, HistoryEntry
+from uno.engine.player import RandomPlayer
+from uno.rules.base import rule
+
+
+def test_history_keeps_window():
+    history = History(window=3)
+    for turn in range(5):
+        history.append(turn % 2, 0, (None,))
+    assert history.total == 5
+    assert len(history) == 3
+    assert list(history)[0] == HistoryEntry(0, 0, (None,))
+    assert history.view()[-1] == HistoryEntry(0, 0, (None,))
+
+
+def test_untagged_history():
+    history = History(window=None, tagged=False)
+    history.append(1, 2, (None,))
+    assert list(history.view()) == [(None,)]
+
+
+def test_history_archive(tmp_path):
+    path = tmp_path / 'moves.ndjson'
+    game = Game(rule, n_players=2, seed=3, history_window=8, archive=path)
+    game.players = [RandomPlayer(str(i)) for i in range(2)]
+    game.start()
+    lines = path.read_text().splitlines()
+    assert len(lines) == game.history.total
+    assert len(game.history) == 8
+    player, round_, _ = json.loads(lines[-1])
+    assert (player, round_) == (game.history[-1].player, game.history[-1].round)
+
+
+def test_requests_show_views():
+    game = Game(rule, n_players=2, seed=1, history_window=4)
+    game.rule.init_game(game.context)
+    request = game.build_request(0)
+    assert list(request.hand_sizes) == [7, 7]
+    assert len(request.latest_moves) == 0
+    assert not hasattr(request.latest_moves, 'append')
+
+    game.history.append(0, 0, game.rule.step(game.context, (None,)))
+    # views are live
+    assert len(request.latest_moves) == 1
+    assert sum(request.hand_sizes) in (14, 15)
@@ -0,0 +1,74 @@
+import pstats
+
+from uno.engine.game import Game
+from uno.engine.instrument import Hook, Instrumentation, LatencyHistogram, ProfilerHook
+from uno.engine.player import Player, RandomPlayer
+from uno.rules.base import rule
+
+
+class CountingHook(Hook):
+    def __init__(self):
+        self.events = []
+
+    def on_start(self, game):
+        self.events.append('start')
+
+    def on_turn(self, game, player, move, result, latency):
+        self.events.append('turn')
+
+    def on_finish(self, game, instrumentation):
+        self.events.append('finish')
+
+
+class CheatingPlayer(Player):
+    """always tries to play the first card of the hand"""
+    def play(self, request):
+        return (request.hand[0],)
+
+
+def test_instrumented_game_counts():
+    hook = CountingHook()
+    instrumentation = Instrumentation([hook])
+    game = Game(rule, n_players=3, seed=5, instrumentation=instrumentation)
+    game.players = [RandomPlayer('0'), RandomPlayer('1'), CheatingPlayer('2')]
+    game.start()
+
+    counters = instrumentation.counters
+    assert counters['turns'] + counters['rounds'] == game.history.total
+    assert counters['rounds'] == game.context.rounds
+    assert counters['draws'] > 0
+    assert counters['refills'] > 0
+    assert counters['invalid_moves'] > 0
+    assert all(seconds > 0 for seconds in instrumentation.phase_time.values())
+    assert sum(hist.count for hist in instrumentation.latency) == game.history.total
+    assert hook.events[0] == 'start' and hook.events[-1] == 'finish'
+    assert hook.events.count('turn') == game.history.total
+    assert len(instrumentation.summary()['latency']) == 3
+
+
+def test_same_game_with_and_without_instrumentation():
+    games = []
+    for instrumentation in (None, Instrumentation()):
+        game = Game(rule, n_players=2, seed=8, instrumentation=instrumentation)
+        game.players = [RandomPlayer('0'), RandomPlayer('1')]
+        game.start()
+        games.append(game)
+    assert games[0].context.scoreboard == games[1].context.scoreboard
+    assert list(games[0].history) == list(games[1].history)
+
+
+def test_latency_histogram():
+    hist = LatencyHistogram()
+    for micros in (1, 3, 3, 100):
+        hist.add(micros / 1e6)
+    assert hist.count == 4
+    assert hist.quantile(0.5) == 4 / 1e6
+    assert hist.quantile(1.0) == 128 / 1e6
+
+
+def test_profiler_hook(tmp_path):
+    path = tmp_path / 'table.prof'
+    game = Game(rule, n_players=2, seed=1, instrumentation=Instrumentation([ProfilerHook(path)]))
+    game.players = [RandomPlayer('0'), RandomPlayer('1')]
+    game.start()
+    assert pstats.Stats(str(path)).total_calls > 0
@@ -0,0 +1,69 @@
+import random
+
+import pytest
+from uno.engine.context import Context
+from uno.rules.base import init_game, stacking_rule, step
+from uno.rules.effects import pending_draws
+from uno.rules.journal import make_move, unmake_move
+
+from helpers import context_state, random_move
+
+
+def test_clone_is_independent():
+    ctx = Context(3, seed=4)
+    init_game(ctx)
+    before = context_state(ctx)
+    clone = ctx.clone()
+    assert context_state(clone) == before
+    for _ in range(200):
+        step(clone, (None,))
+    assert context_state(ctx) == before
+    # same rng state, same future
+    step(ctx, (None,))
+    other = Context(3, seed=4)
+    init_game(other)
+    step(other, (None,))
+    assert context_state(ctx) == context_state(other)
+
+
+@pytest.mark.parametrize('compact_hands, lazy_shuffle', [(False, False), (True, False), (False, True)])
+def test_make_unmake_restores_state(compact_hands, lazy_shuffle):
+    ctx = Context(3, seed=9, compact_hands=compact_hands, lazy_shuffle=lazy_shuffle)
+    init_game(ctx)
+    rng = random.Random(0)
+    for _ in range(300):
+        before = context_state(ctx)
+        journals = []
+        for _ in range(rng.randint(1, 12)):
+            result, journal = make_move(ctx, random_move(ctx, rng))
+            journals.append(journal)
+        for journal in reversed(journals):
+            unmake_move(ctx, journal)
+        assert context_state(ctx) == before
+        # move the game forward so that round ends and replenishing are covered
+        for _ in range(3):
+            step(ctx, random_move(ctx, rng))
+    assert ctx.rounds > 0
+
+
+def test_make_unmake_restores_stacked_draws():
+    # stacks of draw 2 cards take more cards from the pile in one step than the standard rule ever does
+    deepest = 0
+    for seed in range(20):
+        ctx = Context(4, seed=seed)
+        init_game(ctx)
+        rng = random.Random(seed)
+        for _ in range(400):
+            round_ = ctx.current_round
+            legal = stacking_rule.legal_moves(ctx, round_.current_player)
+            stacking = [card for card in legal if card.symbol == 'draw_2']
+            move = (rng.choice(stacking or legal), 'red') if legal else (None,)
+            deepest = max(deepest, pending_draws(round_.effects))
+            before = context_state(ctx)
+            _, journal = make_move(ctx, move, stacking_rule.step)
+            after = context_state(ctx)
+            unmake_move(ctx, journal)
+            assert context_state(ctx) == before
+            stacking_rule.step(ctx, move)
+            assert context_state(ctx) == after
+    assert deepest >= 6
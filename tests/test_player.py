@@ -41,3 +41,19 @@ def test_random_player_plays_wild(player):
     assert move[0].color == 'wild'
     assert len(move) == 2
     assert move[1] in ('red', 'blue', 'green', 'yellow')
+
+def test_random_player_uses_legal_moves(player):
+    hand = [Card('red', 1), Card('blue', 5)]
+    req = Request(hand=hand, hand_sizes=[], scores=[], latest_moves=[], top_card=Card('red', 5),
+                  legal_moves=[Card('blue', 5)])
+    assert player.play(req) == (Card('blue', 5),)
+
+    req.legal_moves = []
+    assert player.play(req) == (None,)
+
+
+def test_request_projected_score():
+    req = Request(hand=[], hand_sizes=[], scores=[], latest_moves=[], hand_points=[10, 25, 40])
+    assert req.projected_score(0) == 65
+    assert req.projected_score(2) == 35
+    assert Request(hand=[], hand_sizes=[], scores=[], latest_moves=[]).projected_score(0) is None
@@ -0,0 +1,118 @@
+import os
+import random
+import tracemalloc
+
+import pytest
+import uno
+from uno.engine.context import Context
+from uno.engine.game import Game, GamePool
+from uno.engine.player import RandomPlayer
+from uno.rules.base import init_game, legal_moves, rule, step
+from uno.rules.journal import make_move, unmake_move
+from uno.sim.runner import play_game
+
+from helpers import context_state, random_move
+
+SRC = os.path.dirname(uno.__file__)
+
+
+@pytest.mark.parametrize('compact_hands, lazy_shuffle', [(False, False), (True, False), (False, True)])
+def test_reused_rounds_play_like_new_ones(compact_hands, lazy_shuffle):
+    contexts = [Context(3, seed=7, compact_hands=compact_hands, lazy_shuffle=lazy_shuffle, reuse_rounds=reuse)
+                for reuse in (False, True)]
+    for ctx in contexts:
+        init_game(ctx)
+    fresh, reused = contexts
+    round_, hands = reused.current_round, reused.current_round.hands[:]
+    rng = random.Random(1)
+    while fresh.rounds < 5:
+        move = random_move(fresh, rng)
+        step(fresh, move)
+        step(reused, move)
+        assert context_state(reused) == context_state(fresh)
+    assert reused.current_round is round_
+    assert all(hand is before for hand, before in zip(reused.current_round.hands, hands))
+
+
+def test_journal_undoes_reused_round_ends():
+    ctx = Context(2, seed=3, reuse_rounds=True)
+    init_game(ctx)
+    rng = random.Random(2)
+    for _ in range(3000):
+        before = context_state(ctx)
+        move = random_move(ctx, rng)
+        _, journal = make_move(ctx, move)
+        after = context_state(ctx)
+        unmake_move(ctx, journal)
+        assert context_state(ctx) == before
+        step(ctx, move)
+        assert context_state(ctx) == after
+        if ctx.rounds >= 3:
+            break
+    assert ctx.rounds >= 3
+
+
+def test_pooled_games_match_new_games():
+    pool = GamePool(rule, 3, history_window=1)
+    games = set()
+    for seed in range(6):
+        pooled, pooled_turns = play_game(rule, 3, seed, RandomPlayer, pool)
+        games.add(id(pooled))
+        fresh, fresh_turns = play_game(rule, 3, seed)
+        assert pooled.context.scoreboard == fresh.context.scoreboard
+        assert pooled.context.rounds == fresh.context.rounds
+        assert pooled_turns == fresh_turns
+        pool.release(pooled)
+    assert len(games) == 1
+
+
+def test_recycled_requests():
+    game = Game(rule, 2, seed=4, recycle_requests=True)
+    game.begin()
+    ctx = game.context
+    first = game.build_request(0)
+    assert first.hand is ctx.current_round.hands[0]
+    assert game.build_request(1) is not first
+    game.apply(0, (None,))
+    again = game.build_request(0)
+    assert again is first
+    assert again.top_card == ctx.current_round.last_card
+    assert again.legal_moves == legal_moves(ctx, 0)
+    with pytest.raises(AttributeError):
+        again.extra = 1  # slotted
+
+
+def _new_blocks_per_turn(game: Game, turns: int) -> float:
+    """
+    memory blocks allocated by the package per turn. The previous turn's request and round are kept alive
+    while measuring, so that objects made anew show up instead of replacing freed ones
+    """
+    game.players = [RandomPlayer(str(seat)) for seat in range(game.context.player_count)]
+    game.begin()
+    ctx = game.context
+    filters = [tracemalloc.Filter(True, os.path.join(SRC, '*'))]
+    total = played = 0
+    request = None
+    tracemalloc.start()
+    try:
+        while played < turns and not rule.is_over(ctx):
+            kept = (request, ctx.current_round)
+            before = tracemalloc.take_snapshot().filter_traces(filters)
+            idx = ctx.current_round.current_player
+            request = game.build_request(idx)
+            game.apply(idx, game.players[idx].play(request))
+            after = tracemalloc.take_snapshot().filter_traces(filters)
+            total += sum(max(0, stat.count_diff) for stat in after.compare_to(before, 'lineno'))
+            played += 1
+            del kept
+    finally:
+        tracemalloc.stop()
+    return total / played
+
+
+def test_reuse_cuts_allocations_per_turn():
+    fresh = _new_blocks_per_turn(Game(rule, 4, seed=1, history_window=1), 300)
+    reused = _new_blocks_per_turn(Game(rule, 4, seed=1, history_window=1, reuse_rounds=True,
+                                       recycle_requests=True), 300)
+    assert reused < 1.0
+    assert reused < fresh / 3
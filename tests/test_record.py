@@ -0,0 +1,54 @@
+import pytest
+from uno.engine.context import Card
+from uno.engine.game import Game
+from uno.engine.player import RandomPlayer
+from uno.record import RecordReader, RecordWriter, decode_moves, encode_move, replay
+from uno.rules.base import rule
+
+
+def test_move_encoding():
+    moves = [(None,), (Card('red', 3),), (Card('yellow', 'wild'), 'blue')]
+    data = b''.join(encode_move(move) for move in moves)
+    assert len(data) == 2 * len(moves)
+    assert list(decode_moves(data)) == moves
+    with pytest.raises(ValueError):
+        encode_move(('red_3',))
+
+
+def test_record_and_replay(tmp_path):
+    path = tmp_path / 'games.unor'
+    games = []
+    with RecordWriter(path) as writer:
+        for seed in range(3):
+            game = Game(rule, n_players=3, seed=seed, recorder=writer)
+            game.players = [RandomPlayer(str(i)) for i in range(3)]
+            game.start()
+            games.append(game)
+
+    with RecordReader(path) as reader:
+        records = list(reader)
+        assert [record.seed for record in records] == [0, 1, 2]
+        for record, game in zip(records, games):
+            assert len(record) == game.history.total
+            ctx = replay(record)
+            assert ctx.scoreboard == game.context.scoreboard
+            assert ctx.rounds == game.context.rounds
+            assert ctx.current_round == game.context.current_round
+        partial = replay(records[0], upto=10)
+        assert partial.current_round.turns == 10
+        del records, record
+
+
+def test_unseeded_games_are_rejected(tmp_path):
+    with RecordWriter(tmp_path / 'games.unor') as writer:
+        with pytest.raises(ValueError):
+            Game(rule, n_players=2, recorder=writer).start()
+
+
+@pytest.mark.parametrize('seed', [2 ** 64, -2 ** 63 - 1, 1.5])
+def test_seeds_out_of_range_are_rejected(tmp_path, seed):
+    with RecordWriter(tmp_path / 'games.unor') as writer:
+        game = Game(rule, n_players=2, seed=seed, recorder=writer)
+        with pytest.raises(ValueError):
+            game.start()
+        assert game.history.total == 0
@@ -0,0 +1,77 @@
+import json
+import os
+import subprocess
+import sys
+from importlib.metadata import EntryPoint
+
+import pytest
+import cli
+from uno import registry
+from uno.engine.context import Context
+from uno.engine.player import DrawPlayer, RandomPlayer
+from uno.rules import base
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+IMPORT_BUDGET: float = 0.5  # seconds to import an entry point module, far above what it takes today
+HEAVY: tuple[str, ...] = ('numpy', 'uno.bots', 'uno.env', 'uno.rules.batch', 'uno.server', 'importlib.metadata')
+
+
+def test_builtins():
+    assert registry.load_rule('standard') is base.rule
+    assert registry.load_rule('stacking') is base.stacking_rule
+    ctx = Context(2, seed=0)
+    assert isinstance(registry.load_player('random')('a', ctx), RandomPlayer)
+    assert isinstance(registry.load_player('draw')('b', ctx), DrawPlayer)
+    bot = registry.load_player('endgame')('c', ctx)
+    assert bot.name == 'c' and bot.context is ctx
+    assert {'standard', 'stacking'} <= set(registry.names(registry.RULE_GROUP))
+    with pytest.raises(ValueError):
+        registry.load_rule('nope')
+
+
+def test_search_bots_refuse_other_rules():
+    assert registry.supports('random', 'stacking') and registry.supports('ismcts', 'standard')
+    assert registry.load_player('endgame', 'standard') is registry.load_player('endgame')
+    for bot in ('ismcts', 'endgame'):
+        assert not registry.supports(bot, 'stacking')
+        with pytest.raises(ValueError):
+            registry.load_player(bot, 'stacking')
+    assert registry.load_player('draw', 'stacking') is registry.load_player('draw')
+    with pytest.raises(SystemExit):
+        cli.main(['--rule', 'stacking', '--bot', 'ismcts'])
+
+
+def test_plugins(monkeypatch):
+    plugins = {
+        'mine': EntryPoint('mine', 'uno.engine.player:draw_player', registry.PLAYER_GROUP),
+        'broken': EntryPoint('broken', 'uno.rules.base:CARD_VALUES', registry.RULE_GROUP),
+    }
+    monkeypatch.setattr(registry, '_plugins', lambda group: plugins)
+    assert registry.load_player('mine') is registry.load_player('draw')
+    assert 'mine' in registry.names(registry.PLAYER_GROUP)
+    with pytest.raises(TypeError):
+        registry.load_rule('broken')
+
+
+_PROBE = '''
+import json, sys, time
+before = set(sys.modules)
+started = time.perf_counter()
+import {module}
+{code}
+print(json.dumps([time.perf_counter() - started, sorted(set(sys.modules) - before)]))
+'''
+
+
+@pytest.mark.parametrize('module, code', [
+    ('cli', "cli.registry.load_rule('standard'); cli.registry.load_player('random')"),
+    ('uno.sim.__main__', ''),
+    ('uno.sim.runner', 'uno.sim.runner.run_chunk'),  # what pool workers import to run chunks
+])
+def test_cold_start(module, code):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [SRC, os.environ.get('PYTHONPATH')])))
+    out = subprocess.run([sys.executable, '-c', _PROBE.format(module=module, code=code)], env=env,
+                         capture_output=True, text=True, check=True).stdout
+    elapsed, imported = json.loads(out.splitlines()[-1])
+    assert not [name for name in imported if any(name == heavy or name.startswith(heavy + '.') for heavy in HEAVY)]
+    assert elapsed < IMPORT_BUDGET
@@ -0,0 +1,60 @@
+from uno.engine.context import Context
+from uno.engine.game import Game
+from uno.engine.player import RandomPlayer
+from uno.engine.rng import RngStream, derive_seed
+from uno.record import RecordReader, RecordWriter, replay
+from uno.rules.base import init_game, rule
+from uno.sim import reproduce_game, simulate
+
+
+def test_streams_are_derived_directly():
+    master = RngStream(5)
+    assert master.game(3).seed == derive_seed(5, 3)
+    assert master.game(3).player(1) == RngStream(derive_seed(5, 3)).player(1)
+    assert master.game(3).player(1) != master.game(3).player(2)
+    assert master.round(1).random().random() == master.round(1).random().random()
+
+
+def test_players_get_seat_streams():
+    game = Game(rule, n_players=2, seed=8)
+    game.players = [RandomPlayer(str(i)) for i in range(2)]
+    game.begin()
+    assert game.players[1].rng.random() == RngStream(8).player(1).random().random()
+
+
+def test_reproduce_game_from_master_seed():
+    stats = simulate(5, n_players=3, master_seed=11, workers=1, chunk_size=2)
+    games = [reproduce_game(11, idx, n_players=3) for idx in range(5)]
+    assert stats.rounds == sum(game.context.rounds for game in games)
+    assert reproduce_game(11, 4, n_players=3).context.scoreboard == games[4].context.scoreboard
+
+
+def test_round_streams():
+    ctx = Context(3, seed=1, round_streams=True)
+    init_game(ctx)
+    other = Context(3, seed=2, round_streams=True)
+    other.streams = ctx.streams
+    init_game(other)
+    assert ctx.current_round.hands == other.current_round.hands
+
+
+def test_round_streams_are_recorded(tmp_path):
+    path = tmp_path / 'games.unor'
+    with RecordWriter(path) as writer:
+        game = Game(rule, n_players=3, seed=4, recorder=writer, round_streams=True)
+        game.players = [RandomPlayer(str(i)) for i in range(3)]
+        game.start()
+    with RecordReader(path) as reader:
+        records = list(reader)
+        assert records[0].flags == game.context.flags
+        assert replay(records[0]).scoreboard == game.context.scoreboard
+        del records
+
+
+def test_seeded_players_keep_their_rng():
+    game = Game(rule, n_players=2, seed=8)
+    seeded = RandomPlayer('0', seed=3)
+    game.players = [seeded, RandomPlayer('1')]
+    game.begin()
+    assert seeded.rng.random() == RandomPlayer('x', seed=3).rng.random()
+    assert game.players[1].rng.random() == RngStream(8).player(1).random().random()
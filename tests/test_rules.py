@@ -1,7 +1,10 @@
 
+import random
+
 import pytest
 from uno.engine.context import Context, Card, Round
-from uno.rules.base import is_playable, step, init_round, COLORS, SYMBOLS
+from uno.rules.effects import SKIP_PENDING
+from uno.rules.base import is_playable, step, init_game, init_round, build_deck, draw_card, COLORS, SYMBOLS, HAND_SIZE
 
 @pytest.fixture
 def ctx():
@@ -10,7 +13,7 @@ def ctx():
     # Force a known state
     c.current_round.last_card = Card('red', 5)
     c.current_round.current_player = 0
-    c.current_round.active_effects = []
+    c.current_round.effects = 0
     c.scoreboard = [0] * 4
     return c
 
@@ -63,7 +66,7 @@ def test_wild_color_choice(ctx):
     assert ctx.current_round.last_card.symbol == 'wild'
 
 def test_update_score(ctx):
-    from uno.rules.base import update_score
+    from uno.rules.base import update_score, value_hands
     
     # Setup: Player 0 wins (empty hand)
     ctx.current_round.hands[0] = []
@@ -76,7 +79,8 @@ def test_update_score(ctx):
     
     # Player 3 has nothing (shouldn't happen if game continues but for test ok)
     ctx.current_round.hands[3] = []
-    
+    value_hands(ctx.current_round)  # hands were replaced outside the rule
+
     update_score(ctx)
     
     # Player 0 should get 25 + 50 = 75 points
@@ -94,3 +98,140 @@ def test_init_round_no_wild_start():
         init_round(c)
         assert c.current_round.last_card.color != 'wild'
 
+
+def test_legal_moves(ctx):
+    from uno.rules.base import legal_moves
+    ctx.current_round.hands[0] = [Card('blue', 1), Card('red', 2), Card('green', 5), Card('wild', 'wild')]
+    assert legal_moves(ctx, 0) == [Card('red', 2), Card('green', 5), Card('wild', 'wild')]
+
+    ctx.current_round.effects = SKIP_PENDING
+    assert legal_moves(ctx, 0) == []
+
+def test_legal_moves_compact_hand(ctx):
+    from uno.engine.hand import CompactHand
+    from uno.rules.base import CARD_INDEX, legal_moves
+    cards = [Card('blue', 1), Card('red', 2), Card('green', 5), Card('wild', 'wild'), Card('red', 5)]
+    ctx.current_round.hands[0] = CompactHand(CARD_INDEX, cards)
+    legal = legal_moves(ctx, 0)
+    assert sorted(legal, key=CARD_INDEX.encode) == sorted(
+        [card for card in cards if is_playable(ctx, card)], key=CARD_INDEX.encode)
+    assert len(legal) == 4
+
+
+def _legacy_round(n_players, seed):
+    # how rounds were set up before the deck template and slice dealing
+    rng = random.Random(seed)
+    draw = build_deck()
+    rng.shuffle(draw)
+    hands = [[] for _ in range(n_players)]
+    for _ in range(HAND_SIZE):
+        for idx in range(n_players):
+            hands[idx].append(draw.pop())
+    while draw[0].color == 'wild':
+        rng.shuffle(draw)
+    return draw[1:], [draw[0]], hands
+
+
+@pytest.mark.parametrize('n_players', [2, 3, 6])
+def test_init_round_keeps_legacy_sequence(n_players):
+    for seed in range(20):
+        c = Context(n_players, seed=seed)
+        init_round(c)
+        round_ = c.current_round
+        assert (round_.draw, round_.discard, round_.hands) == _legacy_round(n_players, seed)
+
+
+@pytest.mark.parametrize('n_players', [7, 10])
+@pytest.mark.parametrize('lazy_shuffle', [False, True])
+def test_init_round_rejects_more_hands_than_the_deck_holds(n_players, lazy_shuffle):
+    c = Context(n_players, seed=0, lazy_shuffle=lazy_shuffle)
+    with pytest.raises(ValueError):
+        init_game(c)
+    assert c.current_round is None
+
+
+def test_lazy_shuffle_deals_valid_rounds():
+    starts = set()
+    for seed in range(300):
+        c = Context(3, seed=seed, lazy_shuffle=True)
+        init_round(c)
+        round_ = c.current_round
+        assert round_.last_card.color != 'wild'
+        assert all(len(hand) == HAND_SIZE for hand in round_.hands)
+        cards = round_.draw + round_.discard + [card for hand in round_.hands for card in hand]
+        assert sorted(cards, key=str) == sorted(build_deck(), key=str)
+        starts.add(round_.last_card)
+    # every non-wild card can start a round
+    assert len(starts) == sum(card.color != 'wild' for card in set(build_deck()))
+
+
+def test_lazy_replenish_shuffles_on_draw():
+    c = Context(2, seed=1, lazy_shuffle=True)
+    init_round(c)
+    round_ = c.current_round
+    round_.discard.extend(round_.draw)
+    round_.draw.clear()
+    round_.unshuffled = 0
+    assert draw_card(c, 0) is not None
+    assert round_.unshuffled == len(round_.draw)
+
+
+def test_effect_state_transitions(ctx):
+    from uno.rules.effects import REVERSED, pending_draws
+    round_ = ctx.current_round
+    round_.hands[0] = [Card('red', 'reverse'), Card('red', 3)]
+    step(ctx, (Card('red', 'reverse'),))
+    assert round_.effects == REVERSED
+    assert round_.current_player == 3
+
+    round_.hands[3] = [Card('red', 'draw_2'), Card('blue', 3)]
+    step(ctx, (Card('red', 'draw_2'),))
+    assert pending_draws(round_.effects) == 2
+    hand_size = len(round_.hands[2])
+    step(ctx, (Card('red', 3),))  # blocked, treated as drawing the penalty
+    assert len(round_.hands[2]) == hand_size + 2
+    assert round_.effects == REVERSED
+
+
+def test_stacking_draw_2_variant(ctx):
+    from uno.rules.base import make_rule
+    from uno.rules.effects import STACKING_DRAW_2, pending_draws
+    variant = make_rule(STACKING_DRAW_2)
+    round_ = ctx.current_round
+    round_.hands[0] = [Card('red', 'draw_2'), Card('red', 3)]
+    round_.hands[1] = [Card('blue', 'draw_2'), Card('blue', 3), Card('red', 4)]
+    variant.step(ctx, (Card('red', 'draw_2'),))
+    assert variant.legal_moves(ctx, 1) == [Card('blue', 'draw_2')]
+    assert not is_playable(ctx, Card('blue', 'draw_2'))  # the standard table does not stack
+    variant.step(ctx, (Card('blue', 'draw_2'),))
+    assert pending_draws(round_.effects) == 4
+    hand_size = len(round_.hands[2])
+    variant.step(ctx, (None,))
+    assert len(round_.hands[2]) == hand_size + 4
+
+
+@pytest.mark.parametrize('compact_hands', [False, True])
+def test_hand_points_follow_draws_and_plays(compact_hands):
+    from uno.rules.base import hand_value, init_game, legal_moves
+    c = Context(3, seed=11, compact_hands=compact_hands, lazy_shuffle=compact_hands)
+    init_game(c)
+    rng = random.Random(3)
+    for _ in range(3000):
+        round_ = c.current_round
+        assert round_.hand_points == [hand_value(hand) for hand in round_.hands]
+        legal = legal_moves(c, round_.current_player)
+        step(c, (rng.choice(legal), 'blue') if legal and rng.random() < 0.8 else (None,))
+
+
+def test_update_score_uses_hand_points():
+    from uno.rules.base import hand_value, init_game, legal_moves, round_is_over
+    c = Context(4, seed=5)
+    init_game(c)
+    while not round_is_over(c.current_round):
+        cur = c.current_round.current_player
+        legal = legal_moves(c, cur)
+        step(c, (legal[0], 'green') if legal else (None,))
+    expected = sum(hand_value(hand) for hand in c.current_round.hands)
+    winner = [len(hand) for hand in c.current_round.hands].index(0)
+    step(c, (None,))
+    assert c.scoreboard[winner] == expected
@@ -0,0 +1,105 @@
+import asyncio
+
+from uno.engine.context import Card
+from uno.engine.game import Game
+from uno.engine.player import Player, RandomPlayer, Request
+from uno.rules.base import rule
+from uno.server import GameServer, TableRunner, play_remote
+
+
+def make_game(seed):
+    game = Game(rule, n_players=3, seed=seed)
+    game.players = [RandomPlayer(str(i)) for i in range(3)]
+    return game
+
+
+def test_runner_matches_sync_game():
+    async def main():
+        runner = TableRunner(inline_sync=True)
+        game = await runner.run_table(make_game(5))
+        runner.close()
+        return game, runner.stats
+
+    sync = make_game(5)
+    sync.start()
+    game, stats = asyncio.run(main())
+    assert game.context.scoreboard == sync.context.scoreboard
+    assert stats.moves == game.history.total
+    assert stats.tables_finished == 1
+
+
+def test_runner_many_tables():
+    async def main():
+        runner = TableRunner()
+        tasks = [runner.spawn(make_game(seed)) for seed in range(20)]
+        await runner.join()
+        runner.close()
+        return [task.result() for task in tasks], runner.stats
+
+    games, stats = asyncio.run(main())
+    assert all(rule.is_over(game.context) for game in games)
+    assert stats.tables_finished == 20
+    assert stats.latency.count == stats.moves
+
+
+class SlowPlayer:
+    async def play(self, request: Request):
+        await asyncio.sleep(1)
+        return request.hand[0], 'red'
+
+
+def test_deadline_draws():
+    async def main():
+        runner = TableRunner(move_timeout=0.001, inline_sync=True)
+        game = make_game(1)
+        players = [SlowPlayer()] + game.players[1:]
+        await runner.run_table(game, players)
+        runner.close()
+        return game, runner.stats
+
+    game, stats = asyncio.run(main())
+    assert stats.timeouts > 0
+    assert rule.is_over(game.context)
+
+
+def test_remote_player():
+    async def main():
+        server = GameServer(TableRunner(move_timeout=5))
+        host, port = await server.start()
+        table = server.create_table(3, remote_seats=1, seed=9)
+        scores = await play_remote(host, port, table, RandomPlayer('remote'))
+        refused = await play_remote(host, port, table, RandomPlayer('late'))
+        await server.close()
+        return server, table, scores, refused
+
+    server, table, scores, refused = asyncio.run(main())
+    assert scores == server.tables[table].game.context.scoreboard
+    assert refused is None
+    assert server.runner.stats.tables_finished == 1
+
+
+class CheatingPlayer:
+    """
+    Plays a card it does not hold whenever it can
+    """
+    async def play(self, request: Request):
+        held = set(request.hand)
+        for color in ('red', 'blue', 'green', 'yellow'):
+            for symbol in range(8):
+                card = Card(color, symbol)
+                if card not in held and (card.color == request.top_card.color or card.symbol == request.top_card.symbol):
+                    return (card,)
+        return 'not a move'
+
+
+def test_invalid_moves_draw():
+    async def main():
+        runner = TableRunner(inline_sync=True)
+        game = make_game(2)
+        await runner.run_table(game, [CheatingPlayer()] + game.players[1:])
+        runner.close()
+        return game, runner.stats
+
+    game, stats = asyncio.run(main())
+    assert rule.is_over(game.context)
+    assert stats.errors > 0
@@ -0,0 +1,27 @@
+import pytest
+from uno.sim import SimStats, derive_seed, simulate
+
+
+def test_derive_seed_is_stable():
+    assert derive_seed(42, 7) == derive_seed(42, 7)
+    assert derive_seed(42, 7) != derive_seed(42, 8)
+    assert derive_seed(42, 7) != derive_seed(43, 7)
+
+
+def test_simulate_aggregates():
+    stats = simulate(6, n_players=3, master_seed=1, workers=1, chunk_size=4)
+    assert stats.games == 6
+    assert sum(stats.wins) == 6
+    assert stats.turns > stats.rounds > 0
+    assert max(stats.scores) >= 500
+
+
+def test_simulate_independent_of_workers():
+    serial = simulate(8, n_players=2, master_seed=5, workers=1, chunk_size=3)
+    parallel = simulate(8, n_players=2, master_seed=5, workers=2, chunk_size=3)
+    assert serial == parallel
+
+
+def test_merge_rejects_mismatched_players():
+    with pytest.raises(ValueError):
+        SimStats(2).merge(SimStats(3))
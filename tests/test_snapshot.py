@@ -0,0 +1,109 @@
+import random
+import time
+
+import pytest
+from uno.engine.context import Context
+from uno.engine.hand import CompactHand
+from uno.rules.base import init_game, step
+from uno.server import TableStore
+from uno.snapshot import HEADER, restore, snapshot
+
+from helpers import context_state, random_move
+
+
+@pytest.mark.parametrize('options', [{}, {'compact_hands': True, 'reuse_rounds': True},
+                                     {'lazy_shuffle': True, 'round_streams': True}])
+def test_restored_context_continues_identically(options):
+    ctx = Context(3, seed=12, **options)
+    init_game(ctx)
+    rng = random.Random(0)
+    for _ in range(150):
+        step(ctx, random_move(ctx, rng))
+    ctx.rng.gauss(0, 1)  # leaves a cached value in the rng state
+    restored = Context.restore(ctx.snapshot())
+    assert context_state(restored, settings=True) == context_state(ctx, settings=True)
+    if ctx.compact_hands:
+        assert all(isinstance(hand, CompactHand) for hand in restored.current_round.hands)
+    for _ in range(500):
+        move = random_move(ctx, rng)
+        step(ctx, move)
+        step(restored, move)
+        assert context_state(restored, settings=True) == context_state(ctx, settings=True)
+
+
+def test_snapshot_before_the_game():
+    ctx = Context(2, seed=1)
+    restored = restore(snapshot(ctx))
+    assert restored.scoreboard is None and restored.current_round is None
+    assert restored.rng.getstate() == ctx.rng.getstate()
+
+
+def test_snapshot_is_validated():
+    ctx = Context(2, seed=1)
+    init_game(ctx)
+    data = bytearray(ctx.snapshot())
+    with pytest.raises(ValueError):
+        restore(b'PKL!' + data[4:])
+    data[4] += 1  # version
+    with pytest.raises(ValueError):
+        restore(data)
+    data[4] -= 1
+    with pytest.raises(ValueError):
+        restore(data + b'\0')
+    assert restore(data).current_round.turns == 0
+    assert len(data) > HEADER.size
+
+
+def test_snapshot_is_fast():
+    ctx = Context(4, seed=3)
+    init_game(ctx)
+    data = ctx.snapshot()
+    started = time.perf_counter()
+    for _ in range(200):
+        Context.restore(ctx.snapshot())
+    assert (time.perf_counter() - started) / 200 < 0.002
+    assert len(data) < 3000
+
+
+@pytest.mark.parametrize('on_disk', [False, True])
+def test_store_restores_suspended_tables(tmp_path, on_disk):
+    store = TableStore(capacity=2, directory=tmp_path if on_disk else None)
+    reference = {}
+    for table_id in range(5):
+        ctx = Context(2, seed=table_id)
+        init_game(ctx)
+        store.add(table_id, ctx)
+        reference[table_id] = ctx.clone()
+    assert sum(store.is_live(table_id) for table_id in reference) == 2
+    assert all(table_id in store for table_id in reference)
+
+    rng = random.Random(5)
+    for _ in range(300):
+        table_id = rng.randrange(5)
+        move = random_move(reference[table_id], rng)
+        step(reference[table_id], move)
+        store.step(table_id, move)
+    assert store.stats.restores > 0 and store.stats.suspends > 0
+    for table_id, ctx in reference.items():
+        assert context_state(store.context(table_id), settings=True) == context_state(ctx, settings=True)
+
+    store.close()
+    if on_disk:
+        resumed = TableStore(directory=tmp_path)
+        for table_id, ctx in reference.items():
+            assert context_state(resumed.context(str(table_id)), settings=True) == context_state(ctx, settings=True)
+    store.remove(3)
+    assert 3 not in store
+    with pytest.raises(KeyError):
+        store.context(3)
+
+
+def test_store_suspends_idle_tables():
+    store = TableStore()
+    ctx = Context(2, seed=0)
+    init_game(ctx)
+    store.add('a', ctx)
+    assert store.suspend_idle(60) == 0
+    assert store.suspend_idle(0) == 1
+    assert not store.is_live('a') and 'a' in store and len(store) == 1
+    assert context_state(store.context('a'), settings=True) == context_state(ctx, settings=True)
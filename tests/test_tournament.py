@@ -0,0 +1,55 @@
+from uno.engine.player import DrawPlayer, RandomPlayer, Request
+from uno.sim.tournament import Tournament, entrant, play_game, play_pair_batch, sprt_bounds, sprt_llr
+
+
+class HesitantPlayer(RandomPlayer):
+    """
+    Weaker than `RandomPlayer`: often draws although it could play
+    """
+    def play(self, request: Request):
+        if self.rng.random() < 0.6:
+            return (None,)
+        return super().play(request)
+
+
+def test_sprt_on_pairs():
+    lower, upper = sprt_bounds(0.05, 0.05)
+    assert sprt_llr([1.0] * 30 + [0.5] * 10, 0, 20) > upper
+    assert sprt_llr([0.0] * 30 + [0.5] * 10, 0, 20) < lower
+    assert lower < sprt_llr([1.0, 0.0] * 5, 0, 20) < upper
+
+
+def test_mirrored_pairs():
+    random_bot = entrant(RandomPlayer)
+    assert play_pair_batch(random_bot, random_bot, [3, 4, 5]) == play_pair_batch(random_bot, random_bot, [3, 4, 5])
+
+
+def test_stalled_games_are_draws():
+    assert play_game(entrant(DrawPlayer), entrant(DrawPlayer), 3, 0, max_turns=200) == 1
+
+
+def test_gauntlet_stops_early_and_resumes(tmp_path):
+    path = tmp_path / 'results.ndjson'
+    entrants = {'random': entrant(RandomPlayer), 'hesitant': entrant(HesitantPlayer),
+                'random2': entrant(RandomPlayer)}
+    tournament = Tournament(entrants, mode='gauntlet', max_pairs=40, batch_pairs=4, elo0=0, elo1=100, path=path)
+    results = tournament.run(workers=1)
+    assert set(results) == {('random', 'hesitant'), ('random', 'random2')}
+    against_hesitant = results['random', 'hesitant']
+    assert against_hesitant.decision == 'H1'
+    assert against_hesitant.games < 80
+    ratings = tournament.ratings()
+    assert ratings['random'] > ratings['hesitant']
+
+    resumed = Tournament(entrants, mode='gauntlet', max_pairs=40, batch_pairs=4, elo0=0, elo1=100, path=path)
+    assert {key: result.games for key, result in resumed.results.items()} == \
+        {key: result.games for key, result in results.items()}
+    assert resumed.run(workers=1)['random', 'hesitant'].games == against_hesitant.games
+    assert resumed.ratings() == ratings
+
+
+def test_round_robin_pool():
+    entrants = {'a': entrant(RandomPlayer), 'b': entrant(HesitantPlayer), 'c': entrant(RandomPlayer)}
+    results = Tournament(entrants, max_pairs=4, batch_pairs=2, master_seed=1).run(workers=2)
+    assert len(results) == 3
+    assert all(result.games == 8 or result.decision for result in results.values())